@@ -0,0 +1,302 @@
+"""
+合成 Word 表格生成器
+
+按参数生成 document.xml 或最小可用的 .docx，同时给出每个表格对应的分割结果，
+供基准测试在没有模型的情况下跑通 MapVerifier、TableSplitter 与 Core 全流程。
+
+表格由区块依次拼成：表单区块（横向合并按 span_density 随机出现）、
+重复表区块（表头 + 空白数据行），以及按 vmerge_density 比例出现的左重复表区块
+（首列纵向合并）。
+
+用法：
+    python benchmarks/generator.py out.docx --rows 500 --cols 8 --tables 10
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import zipfile
+from pathlib import Path
+
+sys.path.insert(
+    0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+)
+
+from lxml import etree  # noqa: E402
+from pydantic import BaseModel  # noqa: E402
+
+from word_xml_python.core.query import (  # noqa: E402
+    W_P,
+    W_R,
+    W_T,
+    W_TBL,
+    W_TC,
+    W_TC_PR,
+    W_TR,
+    W_VAL,
+    qn,
+)
+from word_xml_python.core.constants import WORD_NS_URI  # noqa: E402
+
+W_BODY = qn("w:body")
+W_DOCUMENT = qn("w:document")
+W_TBL_PR = qn("w:tblPr")
+W_TBL_GRID = qn("w:tblGrid")
+W_GRID_COL = qn("w:gridCol")
+W_TC_W = qn("w:tcW")
+W_GRID_SPAN = qn("w:gridSpan")
+W_V_MERGE = qn("w:vMerge")
+W_R_PR = qn("w:rPr")
+W_COLOR = qn("w:color")
+W_SECT_PR = qn("w:sectPr")
+
+_CONTENT_TYPES = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types"><Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/><Default Extension="xml" ContentType="application/xml"/><Override PartName="/word/document.xml" ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.document.main+xml"/></Types>"""
+
+_RELS = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships"><Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" Target="word/document.xml"/></Relationships>"""
+
+
+class TableSpec(BaseModel):
+    """单个表格的生成参数"""
+
+    rows: int = 50
+    cols: int = 6
+    span_density: float = 0.3  # 表单区块中单元格与右侧单元格横向合并的概率
+    vmerge_density: float = 0.3  # 重复区块中左重复表（首列纵向合并）的比例
+    form_rows: int = 3  # 每个表单区块的行数
+    repeat_rows: int = 4  # 每个重复区块的数据行数
+    nested: int = 0  # 嵌入表单单元格中的 2x2 嵌套表格数
+    runs_per_cell: int = 1  # 每个单元格的文本拆分为几个 w:r
+    seed: int = 0
+
+
+class DocumentSpec(BaseModel):
+    """文档的生成参数，所有表格结构相同，共用一份分割结果"""
+
+    table: TableSpec = TableSpec()
+    tables: int = 1
+    paragraphs: int = 0  # 每个表格前插入的正文段落数
+
+
+def _add_runs(parent: etree._Element, text: str, runs: int) -> None:
+    """在 parent 下添加一个段落，文本拆分为 runs 个 w:r"""
+    p = etree.SubElement(parent, W_P)
+    if not text:
+        return
+    runs = max(1, min(runs, len(text)))
+    size = -(-len(text) // runs)
+    for start in range(0, len(text), size):
+        r = etree.SubElement(p, W_R)
+        r_pr = etree.SubElement(r, W_R_PR)
+        etree.SubElement(r_pr, W_COLOR).set(W_VAL, "000000")
+        etree.SubElement(r, W_T).text = text[start : start + size]
+
+
+def _add_cell(
+    tr: etree._Element,
+    text: str,
+    runs: int,
+    col_span: int = 1,
+    v_merge: str | None = None,
+) -> etree._Element:
+    tc = etree.SubElement(tr, W_TC)
+    tc_pr = etree.SubElement(tc, W_TC_PR)
+    tc_w = etree.SubElement(tc_pr, W_TC_W)
+    tc_w.set(W_VAL, str(1200 * col_span))
+    if col_span > 1:
+        etree.SubElement(tc_pr, W_GRID_SPAN).set(W_VAL, str(col_span))
+    if v_merge is not None:
+        v_merge_element = etree.SubElement(tc_pr, W_V_MERGE)
+        if v_merge == "restart":
+            v_merge_element.set(W_VAL, "restart")
+    _add_runs(tc, text, runs)
+    return tc
+
+
+def _nested_table(runs: int) -> etree._Element:
+    tbl = etree.Element(W_TBL)
+    etree.SubElement(tbl, W_TBL_PR)
+    tbl_grid = etree.SubElement(tbl, W_TBL_GRID)
+    for _ in range(2):
+        etree.SubElement(tbl_grid, W_GRID_COL).set(W_VAL, "600")
+    for row_idx in range(2):
+        tr = etree.SubElement(tbl, W_TR)
+        for col_idx in range(2):
+            _add_cell(tr, f"嵌套{row_idx}-{col_idx}", runs)
+    return tbl
+
+
+def build_table(spec: TableSpec) -> tuple[etree._Element, list[dict]]:
+    """
+    生成一个表格
+
+    Returns:
+        (w:tbl 元素, 分割结果)
+    """
+    if spec.cols < 2:
+        raise ValueError("cols 至少为 2，左重复表每行需要两列以上")
+    rng = random.Random(spec.seed)
+    tbl = etree.Element(W_TBL, nsmap={"w": WORD_NS_URI})
+    etree.SubElement(tbl, W_TBL_PR)
+    tbl_grid = etree.SubElement(tbl, W_TBL_GRID)
+    for _ in range(spec.cols):
+        etree.SubElement(tbl_grid, W_GRID_COL).set(W_VAL, "1200")
+
+    metas: list[dict] = []
+    value_cells: list[etree._Element] = []
+    row_count = 0
+
+    def add_form_rows(count: int) -> None:
+        nonlocal row_count
+        start = row_count
+        for _ in range(count):
+            tr = etree.SubElement(tbl, W_TR)
+            col_idx = 0
+            while col_idx < spec.cols:
+                col_span = 1
+                if col_idx + 1 < spec.cols and rng.random() < spec.span_density:
+                    col_span = 2
+                if col_idx % 2 == 0:
+                    _add_cell(
+                        tr, f"字段{row_count}-{col_idx}", spec.runs_per_cell, col_span
+                    )
+                else:
+                    value_cells.append(_add_cell(tr, "", spec.runs_per_cell, col_span))
+                col_idx += col_span
+            row_count += 1
+        metas.append(_meta(f"表单{len(metas)}", start, row_count, "Form"))
+
+    def add_repeat_rows(count: int, left: bool) -> None:
+        nonlocal row_count
+        start = row_count
+        for idx in range(count):
+            tr = etree.SubElement(tbl, W_TR)
+            first_col = 0
+            if left:
+                if idx == 0:
+                    _add_cell(tr, "左侧标题", spec.runs_per_cell, v_merge="restart")
+                else:
+                    _add_cell(tr, "", spec.runs_per_cell, v_merge="continue")
+                first_col = 1
+            for col_idx in range(first_col, spec.cols):
+                text = f"列{col_idx}" if idx == 0 else ""
+                _add_cell(tr, text, spec.runs_per_cell)
+            row_count += 1
+        if left:
+            metas.append(
+                _meta(
+                    f"左重复表{len(metas)}",
+                    start,
+                    row_count,
+                    "Left_RepeatTable",
+                    split_after_column=0,
+                )
+            )
+        else:
+            metas.append(_meta(f"重复表{len(metas)}", start, row_count, "RepeatTable"))
+
+    while row_count < spec.rows:
+        remaining = spec.rows - row_count
+        form_rows = min(spec.form_rows, remaining)
+        # 剩余行数不足一个重复区块时全部作为表单
+        if remaining - form_rows < 2:
+            form_rows = remaining
+        add_form_rows(form_rows)
+
+        remaining = spec.rows - row_count
+        if remaining >= 2:
+            repeat_rows = min(1 + spec.repeat_rows, remaining)
+            add_repeat_rows(repeat_rows, rng.random() < spec.vmerge_density)
+
+    for tc in value_cells[: spec.nested]:
+        tc.insert(1, _nested_table(spec.runs_per_cell))
+
+    return tbl, metas
+
+
+def _meta(
+    name: str, start: int, end: int, table_type: str, split_after_column=None
+) -> dict:
+    meta = {
+        "name": name,
+        "rows": list(range(start + 1, end + 1)),
+        "type": table_type,
+        "reason": "合成数据",
+    }
+    if split_after_column is not None:
+        meta["split_after_column"] = split_after_column
+    return meta
+
+
+def build_document(spec: DocumentSpec) -> tuple[bytes, list[dict]]:
+    """
+    生成 document.xml
+
+    Returns:
+        (document.xml 内容, 每个表格共用的分割结果)
+    """
+    document = etree.Element(W_DOCUMENT, nsmap={"w": WORD_NS_URI})
+    body = etree.SubElement(document, W_BODY)
+    metas: list[dict] = []
+    for _ in range(spec.tables):
+        for idx in range(spec.paragraphs):
+            _add_runs(body, f"正文段落{idx}，用于增加文档体积。" * 4, 1)
+        tbl, metas = build_table(spec.table)
+        body.append(tbl)
+        _add_runs(body, "", 1)
+    etree.SubElement(body, W_SECT_PR)
+    xml = etree.tostring(
+        document, xml_declaration=True, encoding="UTF-8", standalone=True
+    )
+    return xml, metas
+
+
+def write_docx(path: str | Path, spec: DocumentSpec) -> list[dict]:
+    """
+    生成 .docx 文件
+
+    Returns:
+        每个表格共用的分割结果
+    """
+    xml, metas = build_document(spec)
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as docx:
+        docx.writestr("[Content_Types].xml", _CONTENT_TYPES)
+        docx.writestr("_rels/.rels", _RELS)
+        docx.writestr("word/document.xml", xml)
+    return metas
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("output", help=".docx 或 .xml 输出路径")
+    for name, field in TableSpec.model_fields.items():
+        parser.add_argument(f"--{name.replace('_', '-')}", type=field.annotation)
+    parser.add_argument("--tables", type=int, default=1)
+    parser.add_argument("--paragraphs", type=int, default=0)
+    parser.add_argument("--metas", help="把分割结果写入该 JSON 文件")
+    args = parser.parse_args()
+
+    table_args = {
+        name: getattr(args, name)
+        for name in TableSpec.model_fields
+        if getattr(args, name) is not None
+    }
+    spec = DocumentSpec(
+        table=TableSpec(**table_args), tables=args.tables, paragraphs=args.paragraphs
+    )
+    if args.output.endswith(".docx"):
+        metas = write_docx(args.output, spec)
+    else:
+        xml, metas = build_document(spec)
+        Path(args.output).write_bytes(xml)
+    if args.metas:
+        Path(args.metas).write_text(
+            json.dumps(metas, ensure_ascii=False, indent=2), encoding="UTF-8"
+        )
+
+
+if __name__ == "__main__":
+    main()
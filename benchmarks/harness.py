@@ -0,0 +1,203 @@
+"""
+流水线基准测试
+
+用合成表格分别测量各阶段（Vlmap.parse、MapVerifier.verify、TableSplitter.split、
+SplitVerifier.verify_and_fix、Extractor.extract）以及 Core 端到端处理 .docx 的耗时，
+结果保存为 JSON。指定基线文件时逐项与基线比较，超过阈值的项视为性能回退，
+以非零状态码退出。
+
+用法：
+    python benchmarks/harness.py --output benchmarks/results/latest.json
+    python benchmarks/harness.py --baseline benchmarks/results/baseline.json --threshold 0.2
+"""
+
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+# generator 会把 src 加入 sys.path，必须先于 word_xml_python 导入
+from generator import DocumentSpec, TableSpec, build_table, write_docx
+
+from word_xml_python.core.core import Core
+from word_xml_python.core.query import W_TR, own_descendants
+from word_xml_python.extractors.extractor import Extractor
+from word_xml_python.models import VerifierMeta
+from word_xml_python.split import TableSplitter
+from word_xml_python.split.split_verifier import SplitVerifier
+from word_xml_python.vlmap import MapVerifier, Vlmap
+
+# 场景名 -> 文档参数，单阶段测量使用其中的表格
+SCENARIOS: dict[str, DocumentSpec] = {
+    "small": DocumentSpec(table=TableSpec(rows=20, cols=6)),
+    "tall": DocumentSpec(
+        table=TableSpec(
+            rows=3000, cols=6, vmerge_density=0.5, form_rows=20, repeat_rows=250
+        )
+    ),
+    "wide": DocumentSpec(table=TableSpec(rows=200, cols=40)),
+    "merged": DocumentSpec(
+        table=TableSpec(rows=500, cols=8, span_density=0.8, vmerge_density=1.0)
+    ),
+    "fragmented": DocumentSpec(table=TableSpec(rows=300, cols=8, runs_per_cell=8)),
+    "nested": DocumentSpec(table=TableSpec(rows=200, cols=6, nested=20)),
+    "document": DocumentSpec(
+        table=TableSpec(rows=100, cols=6), tables=50, paragraphs=20
+    ),
+}
+
+STAGES = [
+    "vlmap_parse",
+    "map_verifier",
+    "table_splitter",
+    "split_verifier",
+    "extractor",
+    "core_end_to_end",
+]
+
+
+def _best(run, repeat: int, setup=None) -> float | None:
+    """
+    多次运行取最短耗时（秒），setup 的耗时不计入
+    阶段抛出异常时打印错误并返回 None，不影响其他阶段
+    """
+    best = float("inf")
+    try:
+        for _ in range(repeat):
+            args = setup() if setup is not None else ()
+            started = time.perf_counter()
+            run(*args)
+            best = min(best, time.perf_counter() - started)
+    except Exception as e:
+        print(f"  阶段失败: {e!r}", file=sys.stderr)
+        return None
+    return best
+
+
+def measure_scenario(spec: DocumentSpec, repeat: int) -> dict[str, float | None]:
+    """测量一个场景各阶段的耗时，失败的阶段为 None"""
+    table, raw_metas = build_table(spec.table)
+    metas = [VerifierMeta(**meta) for meta in raw_metas]
+    timings: dict[str, float | None] = {}
+
+    timings["vlmap_parse"] = _best(lambda: Vlmap(table_element=table).parse(), repeat)
+    timings["map_verifier"] = _best(
+        lambda: MapVerifier(
+            verifier_meta=metas, trs=own_descendants(table, W_TR)
+        ).verify(),
+        repeat,
+    )
+
+    timings["table_splitter"] = _best(
+        lambda: TableSplitter(tblElement=table, verifier_meta=metas).split(), repeat
+    )
+
+    def split_results():
+        return (TableSplitter(tblElement=table, verifier_meta=metas).split(),)
+
+    timings["split_verifier"] = _best(
+        lambda results: SplitVerifier(results).verify_and_fix(),
+        repeat,
+        split_results,
+    )
+    timings["extractor"] = _best(
+        lambda results: Extractor(table_split_results=results).extract(),
+        repeat,
+        split_results,
+    )
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "bench.docx")
+        metas_json = json.dumps(write_docx(path, spec), ensure_ascii=False)
+        timings["core_end_to_end"] = _best(
+            lambda: list(Core(path, metas_json).start_all_by_stream()), repeat
+        )
+    return timings
+
+
+def _format_ms(seconds: float | None) -> str:
+    return f"{'失败':>16}" if seconds is None else f"{seconds * 1000:>14.2f}ms"
+
+
+def compare(
+    results: dict[str, dict[str, float | None]],
+    baseline: dict[str, dict[str, float | None]],
+    threshold: float,
+) -> list[str]:
+    """
+    与基线比较
+
+    Returns:
+        回退项的描述，为空表示没有回退
+    """
+    regressions = []
+    print(f"\n{'场景':<12} {'阶段':<16} {'基线(ms)':>10} {'本次(ms)':>10} {'变化':>8}")
+    for scenario, timings in results.items():
+        for stage, seconds in timings.items():
+            base = baseline.get(scenario, {}).get(stage)
+            if base is None:
+                continue
+            if seconds is None:
+                regressions.append(f"{scenario}.{stage}: 失败")
+                continue
+            change = seconds / base - 1
+            mark = ""
+            if change > threshold:
+                mark = " <- 回退"
+                regressions.append(f"{scenario}.{stage}: {change:+.0%}")
+            print(
+                f"{scenario:<12} {stage:<16} {base * 1000:>10.2f} "
+                f"{seconds * 1000:>10.2f} {change:>+7.0%}{mark}"
+            )
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument(
+        "--scenario", action="append", choices=list(SCENARIOS), help="可重复指定"
+    )
+    parser.add_argument("--output", help="结果 JSON 保存路径")
+    parser.add_argument("--baseline", help="用于比较的基线 JSON")
+    parser.add_argument(
+        "--threshold", type=float, default=0.2, help="允许的耗时增长比例"
+    )
+    args = parser.parse_args()
+
+    results: dict[str, dict[str, float | None]] = {}
+    print(f"{'场景':<12} " + " ".join(f"{stage:>16}" for stage in STAGES))
+    for name in args.scenario or SCENARIOS:
+        timings = measure_scenario(SCENARIOS[name], args.repeat)
+        results[name] = timings
+        print(f"{name:<12} " + " ".join(_format_ms(timings[stage]) for stage in STAGES))
+
+    report = {
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "repeat": args.repeat,
+        "results": results,
+    }
+    if args.output:
+        output = Path(args.output)
+        output.parent.mkdir(parents=True, exist_ok=True)
+        output.write_text(json.dumps(report, indent=2), encoding="UTF-8")
+        print(f"\n结果已保存: {output}")
+
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text(encoding="UTF-8"))
+        regressions = compare(results, baseline["results"], args.threshold)
+        if regressions:
+            print("\n性能回退:\n" + "\n".join(f"- {item}" for item in regressions))
+            sys.exit(1)
+        print("\n没有超过阈值的回退")
+
+
+if __name__ == "__main__":
+    main()
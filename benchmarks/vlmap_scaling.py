@@ -0,0 +1,136 @@
+"""
+Vlmap 渲染耗时随表格行数的变化
+
+生成带纵向合并标签列的合成表格（第 0 列每 5 行一个 vMerge 区块，
+第 1 列横向合并两列），从 10 行到 10000 行依次渲染 VL Map，
+输出每种行数的耗时与每行平均耗时。每行耗时基本不变即为线性。
+计时前先确认 10 行表格的输出与逐个向下扫描的基线算法逐字节一致，不一致时退出。
+
+用法：
+    python benchmarks/vlmap_scaling.py [--repeat 3]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(
+    0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+)
+
+from lxml import etree  # noqa: E402
+
+from word_xml_python import Vlmap  # noqa: E402
+from word_xml_python.core.constants import WORD_NS_URI  # noqa: E402
+from word_xml_python.core.grid import (  # noqa: E402
+    V_MERGE_CONTINUE,
+    V_MERGE_RESTART,
+    TableGrid,
+)
+
+ROW_COUNTS = [10, 100, 1000, 3000, 10000]
+MERGE_BLOCK = 5
+
+
+def build_table(rows: int) -> etree._Element:
+    """构建 rows 行、4 个网格列的合成表格"""
+    w = f"{{{WORD_NS_URI}}}"
+    tbl = etree.Element(f"{w}tbl", nsmap={"w": WORD_NS_URI})
+    for row_idx in range(rows):
+        tr = etree.SubElement(tbl, f"{w}tr")
+
+        label = etree.SubElement(tr, f"{w}tc")
+        tc_pr = etree.SubElement(label, f"{w}tcPr")
+        v_merge = etree.SubElement(tc_pr, f"{w}vMerge")
+        if row_idx % MERGE_BLOCK == 0:
+            v_merge.set(f"{w}val", "restart")
+            _add_text(label, f"标签{row_idx // MERGE_BLOCK}")
+
+        wide = etree.SubElement(tr, f"{w}tc")
+        tc_pr = etree.SubElement(wide, f"{w}tcPr")
+        etree.SubElement(tc_pr, f"{w}gridSpan").set(f"{w}val", "2")
+        _add_text(wide, f"内容{row_idx}")
+
+        etree.SubElement(tr, f"{w}tc")
+    return tbl
+
+
+def _add_text(tc: etree._Element, text: str) -> None:
+    w = f"{{{WORD_NS_URI}}}"
+    p = etree.SubElement(tc, f"{w}p")
+    r = etree.SubElement(p, f"{w}r")
+    etree.SubElement(r, f"{w}t").text = text
+
+
+class BaselineVlmap(Vlmap):
+    """
+    线性渲染之前的算法：每个 restart 单元格各自向下扫描后续行计算跨行数，
+    总耗时与行数的平方成正比，只用于核对输出
+    """
+
+    def _calculate_row_spans(self, grid: TableGrid):
+        col_merge_state = {}
+        for row_idx in range(grid.row_count):
+            col_idx = 0
+            for cell_id in grid.row_cells(row_idx):
+                while col_idx in col_merge_state and col_merge_state[col_idx] > row_idx:
+                    col_idx += 1
+                col_span = grid.col_span[cell_id]
+                if grid.v_merge[cell_id] == V_MERGE_RESTART:
+                    row_span = self._count_row_span(grid, row_idx, col_idx)
+                    self.row_span_map[(row_idx, col_idx)] = row_span
+                    for c in range(col_idx, col_idx + col_span):
+                        col_merge_state[c] = row_idx + row_span - 1
+                col_idx += col_span
+
+    @staticmethod
+    def _count_row_span(grid: TableGrid, start_row: int, col_idx: int) -> int:
+        span = 1
+        if col_idx >= grid.col_count:
+            return span
+        for row_idx in range(start_row + 1, grid.row_count):
+            # 该行必须有一个从 col_idx 开始的 continue 单元格
+            cell_id = grid.occupancy[row_idx, col_idx]
+            if (
+                cell_id < 0
+                or grid.cell_col[cell_id] != col_idx
+                or grid.v_merge[cell_id] != V_MERGE_CONTINUE
+            ):
+                break
+            span += 1
+        return span
+
+
+def check_identical(rows: int) -> None:
+    """确认输出与基线算法逐字节一致，不一致时退出"""
+    table = build_table(rows)
+    if Vlmap(table_element=table).parse() != BaselineVlmap(table_element=table).parse():
+        raise SystemExit(f"{rows} 行表格的输出与基线算法不一致")
+
+
+def measure(rows: int, repeat: int) -> float:
+    """多次渲染取最短耗时（秒）"""
+    table = build_table(rows)
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        Vlmap(table_element=table).parse()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    check_identical(ROW_COUNTS[0])
+    print(f"{'行数':>8} {'耗时(ms)':>12} {'每行(us)':>10}")
+    for rows in ROW_COUNTS:
+        seconds = measure(rows, args.repeat)
+        print(f"{rows:>8} {seconds * 1000:>12.2f} {seconds / rows * 1e6:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+"""
+XML 查询方式对比
+
+对 word/ 目录下所有示例文档中的表格，分别用原来的 find/findall + 命名空间字典
+与 core.query 中的 Clark 标签名、iterchildren/iterdescendants、预编译 XPath
+执行各模块中的典型查询，输出每种查询模式单次遍历全部元素的耗时与加速比。
+
+用法：
+    python benchmarks/xml_query.py [--repeat 200]
+"""
+
+import argparse
+import glob
+import os
+import sys
+import timeit
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "src"))
+
+from lxml import etree  # noqa: E402
+
+from word_xml_python.core import iter_tables  # noqa: E402
+from word_xml_python.core.constants import WORD_NAMESPACES, WORD_NS_URI  # noqa: E402
+from word_xml_python.core.query import (  # noqa: E402
+    W_P,
+    W_R,
+    W_TC,
+    W_TC_PR,
+    W_TR,
+    W_VAL,
+    XP_P_JC,
+    XP_R_COLOR,
+    XP_TC_GRID_SPAN,
+    child,
+    descendants,
+    first,
+)
+
+
+def load_tables() -> list[etree._Element]:
+    tables = []
+    for path in sorted(glob.glob(os.path.join(ROOT, "word", "*.docx"))):
+        # iter_tables 产出的元素在下一次迭代前有效，这里复制一份
+        tables.extend(etree.fromstring(etree.tostring(t)) for t in iter_tables(path))
+    return tables
+
+
+def build_patterns(tables: list[etree._Element]):
+    """每种查询模式：(名称, 原写法, 新写法)"""
+    ns = WORD_NAMESPACES
+    rows = [tr for tbl in tables for tr in tbl.findall(".//w:tr", ns)]
+    cells = [tc for tbl in tables for tc in tbl.findall(".//w:tc", ns)]
+    paragraphs = [p for tc in cells for p in tc.findall("./w:p", ns)]
+    runs = [r for p in paragraphs for r in p.findall("./w:r", ns)]
+
+    def old_grid_span(tc):
+        tc_pr = tc.find("./w:tcPr", ns)
+        if tc_pr is None:
+            return None
+        grid_span = tc_pr.find("./w:gridSpan", ns)
+        return grid_span.get(f"{{{WORD_NS_URI}}}val") if grid_span is not None else None
+
+    def new_grid_span(tc):
+        grid_span = first(XP_TC_GRID_SPAN(tc))
+        return grid_span.get(W_VAL) if grid_span is not None else None
+
+    def old_jc(p):
+        p_pr = p.find("./w:pPr", ns)
+        return p_pr.find("./w:jc", ns) if p_pr is not None else None
+
+    def old_color(r):
+        r_pr = r.find("./w:rPr", ns)
+        return r_pr.find("./w:color", ns) if r_pr is not None else None
+
+    return [
+        (
+            "表格行 .//w:tr",
+            lambda: [tbl.findall(".//w:tr", ns) for tbl in tables],
+            lambda: [descendants(tbl, W_TR) for tbl in tables],
+        ),
+        (
+            "行内单元格 .//w:tc",
+            lambda: [tr.findall(".//w:tc", ns) for tr in rows],
+            lambda: [descendants(tr, W_TC) for tr in rows],
+        ),
+        (
+            "单元格属性 ./w:tcPr",
+            lambda: [tc.find("./w:tcPr", ns) for tc in cells],
+            lambda: [child(tc, W_TC_PR) for tc in cells],
+        ),
+        (
+            "列合并 w:tcPr/w:gridSpan/@w:val",
+            lambda: [old_grid_span(tc) for tc in cells],
+            lambda: [new_grid_span(tc) for tc in cells],
+        ),
+        (
+            "段落 ./w:p",
+            lambda: [tc.findall("./w:p", ns) for tc in cells],
+            lambda: [list(tc.iterchildren(W_P)) for tc in cells],
+        ),
+        (
+            "对齐 w:pPr/w:jc",
+            lambda: [old_jc(p) for p in paragraphs],
+            lambda: [first(XP_P_JC(p)) for p in paragraphs],
+        ),
+        (
+            "文本片段 ./w:r",
+            lambda: [p.findall("./w:r", ns) for p in paragraphs],
+            lambda: [list(p.iterchildren(W_R)) for p in paragraphs],
+        ),
+        (
+            "颜色 w:rPr/w:color",
+            lambda: [old_color(r) for r in runs],
+            lambda: [first(XP_R_COLOR(r)) for r in runs],
+        ),
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    tables = load_tables()
+    print(f"表格数: {len(tables)}，重复次数: {args.repeat}")
+    print(f"{'查询':<32} {'原写法(us)':>12} {'新写法(us)':>12} {'加速':>8}")
+    for name, old, new in build_patterns(tables):
+        old_us = min(timeit.repeat(old, number=args.repeat, repeat=3)) / args.repeat
+        new_us = min(timeit.repeat(new, number=args.repeat, repeat=3)) / args.repeat
+        print(
+            f"{name:<32} {old_us * 1e6:>12.1f} {new_us * 1e6:>12.1f} "
+            f"{old_us / new_us:>7.2f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
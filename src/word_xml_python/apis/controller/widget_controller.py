@@ -1,7 +1,12 @@
-from fastapi import APIRouter, Depends
+from typing import Literal
 
+from fastapi import APIRouter, Depends, Request
+from fastapi.responses import StreamingResponse
+
+from ..database.bulk import FORMAT_CSV, FORMAT_NDJSON
 from ..database.database import Database, get_database
 from ..dto import (
+    BulkImportResponse,
     GetTypeRequest,
     SetLogRequest,
     WidgetCreateRequest,
@@ -16,6 +21,11 @@ router = APIRouter(
     responses={404: {"description": "Not found"}},
 )
 
+_MEDIA_TYPES = {
+    FORMAT_CSV: "text/csv; charset=utf-8",
+    FORMAT_NDJSON: "application/x-ndjson",
+}
+
 
 def get_widget_service(db: Database = Depends(get_database)) -> WidgetService:
     return WidgetService(db)
@@ -26,25 +36,58 @@ async def create_widget(
     request: WidgetCreateRequest,
     service: WidgetService = Depends(get_widget_service),
 ):
-    return service.create_widget(request)
+    return await service.create_widget(request)
 
 
 @router.post("/list", response_model=list[WidgetResponse], summary="获取 Widget 列表")
 async def get_widget_list(
     request: WigetListRequest, service: WidgetService = Depends(get_widget_service)
 ) -> list[WidgetResponse]:
-    return service.get_widget_list(request)
+    return await service.get_widget_list(request)
 
 
 @router.post("/set-log", response_model=bool, summary="设置")
 async def set_log(
     request: SetLogRequest, service: WidgetService = Depends(get_widget_service)
 ) -> bool:
-    return service.set_log(request)
+    return await service.set_log(request)
 
 
 @router.post("/get-type", response_model=str, summary="获取类型")
 async def get_type(
     request: GetTypeRequest, service: WidgetService = Depends(get_widget_service)
 ) -> str:
-    return service.get_type(request)
+    return await service.get_type(request)
+
+
+@router.post("/get-type/batch", response_model=list[str], summary="批量获取类型")
+async def get_types(
+    requests: list[GetTypeRequest],
+    service: WidgetService = Depends(get_widget_service),
+) -> list[str]:
+    """按请求顺序返回类型，所有请求只查询一次数据库"""
+    return await service.get_types(requests)
+
+
+@router.post("/import", response_model=BulkImportResponse, summary="批量导入")
+async def import_widgets(
+    request: Request,
+    format: Literal["csv", "ndjson"] = FORMAT_CSV,
+    service: WidgetService = Depends(get_widget_service),
+) -> BulkImportResponse:
+    """请求体为 CSV（第一行为列名）或 NDJSON，边接收边 COPY 到数据库"""
+    return await service.import_widgets(request.stream(), format)
+
+
+@router.get("/export", summary="批量导出")
+async def export_widgets(
+    format: Literal["csv", "ndjson"] = FORMAT_CSV,
+    service: WidgetService = Depends(get_widget_service),
+) -> StreamingResponse:
+    return StreamingResponse(
+        service.export_widgets(format),
+        media_type=_MEDIA_TYPES[format],
+        headers={
+            "Content-Disposition": f'attachment; filename="weight_record.{format}"'
+        },
+    )
@@ -0,0 +1,463 @@
+"""
+weight_record 批量导入导出
+
+基于 PostgreSQL COPY，支持 CSV 与 NDJSON 两种格式。
+
+导入：数据先 COPY 进临时表，再用一条 INSERT ... ON CONFLICT 合并到 weight_record，
+同一个 (label_key, type) 的计数求和，已存在的记录在原计数上累加。
+整个导入在一个事务中完成，出错时不会留下部分数据。
+CSV 第一行为列名，必须包含 label_key 与 type，其余列可选；
+create_time、update_time 列会被忽略，便于直接导入导出的文件。
+NDJSON 每行原样 COPY 进 jsonb 列，由数据库解析，Python 侧不逐行处理。
+
+导出：COPY TO STDOUT 按 id 顺序输出所有记录，边读边写，内存开销与记录数无关。
+
+命令行：
+    python -m word_xml_python.apis.database.bulk import records.csv
+    python -m word_xml_python.apis.database.bulk import records.ndjson
+    python -m word_xml_python.apis.database.bulk export records.csv
+    python -m word_xml_python.apis.database.bulk export - --format ndjson
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import csv
+import queue
+import sys
+import threading
+from typing import TYPE_CHECKING, AsyncIterator, BinaryIO, Iterable, Iterator
+
+import psycopg2
+from psycopg2.errors import QueryCanceledError
+
+from .database import Database
+
+if TYPE_CHECKING:
+    from psycopg2.extensions import cursor
+
+FORMAT_CSV = "csv"
+FORMAT_NDJSON = "ndjson"
+FORMATS = (FORMAT_CSV, FORMAT_NDJSON)
+
+# 导出的列，也是导入时可以出现的列
+COLUMNS = (
+    "label_key",
+    "type",
+    "options",
+    "hit_count",
+    "consistency_count",
+    "un_consistency_count",
+    "confidence",
+    "create_time",
+    "update_time",
+)
+REQUIRED_COLUMNS = ("label_key", "type")
+
+# 合并到流式响应队列前攒够的字节数，避免每行一次线程切换
+CHUNK_SIZE = 64 * 1024
+
+_IMPORT_TABLE = "weight_record_import"
+
+_NDJSON_TABLE = "weight_record_import_ndjson"
+
+_CREATE_IMPORT_TABLE = f"""
+CREATE TEMP TABLE {_IMPORT_TABLE} (
+    label_key TEXT,
+    type TEXT,
+    options TEXT[],
+    hit_count INTEGER,
+    consistency_count INTEGER,
+    un_consistency_count INTEGER,
+    confidence DOUBLE PRECISION,
+    create_time TEXT,
+    update_time TEXT
+) ON COMMIT DROP
+"""
+
+_CREATE_NDJSON_TABLE = f"""
+CREATE TEMP TABLE {_NDJSON_TABLE} (doc JSONB) ON COMMIT DROP
+"""
+
+# 合法的 NDJSON 中不会出现未转义的控制字符，用它们作为 CSV 的引号与分隔符，
+# 每行原样作为一个字段读入
+_COPY_NDJSON = f"""
+COPY {_NDJSON_TABLE} (doc) FROM STDIN WITH (FORMAT csv, QUOTE e'\\x01', DELIMITER e'\\x02')
+"""
+
+# NDJSON 临时表按 CSV 临时表的列展开，空行读作 NULL
+_NDJSON_SOURCE = f"""(
+    SELECT doc ->> 'label_key' AS label_key,
+           doc ->> 'type' AS type,
+           CASE jsonb_typeof(doc -> 'options')
+               WHEN 'array' THEN ARRAY(SELECT jsonb_array_elements_text(doc -> 'options'))
+           END AS options,
+           (doc ->> 'hit_count')::INTEGER AS hit_count,
+           (doc ->> 'consistency_count')::INTEGER AS consistency_count,
+           (doc ->> 'un_consistency_count')::INTEGER AS un_consistency_count,
+           (doc ->> 'confidence')::DOUBLE PRECISION AS confidence
+    FROM {_NDJSON_TABLE}
+    WHERE doc IS NOT NULL
+) AS import"""
+
+_MERGE_IMPORT = """
+WITH merged AS (
+    INSERT INTO weight_record AS record (label_key, type, options, hit_count, consistency_count, un_consistency_count, confidence)
+    SELECT label_key, type,
+           COALESCE(MAX(options), '{{}}'),
+           COALESCE(SUM(hit_count), 0),
+           COALESCE(SUM(consistency_count), 0),
+           COALESCE(SUM(un_consistency_count), 0),
+           COALESCE(MAX(confidence), 0)
+    FROM {source}
+    GROUP BY label_key, type
+    ON CONFLICT (label_key, type) DO UPDATE SET
+        hit_count = record.hit_count + EXCLUDED.hit_count,
+        consistency_count = record.consistency_count + EXCLUDED.consistency_count,
+        un_consistency_count = record.un_consistency_count + EXCLUDED.un_consistency_count
+    RETURNING (xmax = 0) AS inserted
+)
+SELECT COUNT(*) FILTER (WHERE inserted), COUNT(*) FILTER (WHERE NOT inserted)
+FROM merged
+"""
+
+_EXPORT_CSV = f"""
+COPY (SELECT {", ".join(COLUMNS)} FROM weight_record ORDER BY id)
+TO STDOUT WITH (FORMAT csv, HEADER true)
+"""
+
+# text 格式只会把 JSON 中的反斜杠转义为两个，导出时还原
+_EXPORT_NDJSON = f"""
+COPY (
+    SELECT json_build_object({", ".join(f"'{column}', {column}" for column in COLUMNS)})
+    FROM weight_record ORDER BY id
+) TO STDOUT
+"""
+
+
+class _ChunkReader:
+    """把字节块迭代器包装成 COPY FROM 需要的文件对象"""
+
+    def __init__(self, chunks: Iterable[bytes]):
+        self._chunks = iter(chunks)
+        self._buffer = b""
+        self._pos = 0  # 缓冲区中尚未读取的位置，避免每次读取都复制剩余内容
+
+    def _fill(self) -> bool:
+        chunk = next(self._chunks, None)
+        if chunk is None:
+            return False
+        self._buffer = self._buffer[self._pos :] + chunk
+        self._pos = 0
+        return True
+
+    def read(self, size: int = -1) -> bytes:
+        while (size < 0 or len(self._buffer) - self._pos < size) and self._fill():
+            pass
+        end = len(self._buffer)
+        if size >= 0:
+            end = min(end, self._pos + size)
+        data = self._buffer[self._pos : end]
+        self._pos = end
+        return data
+
+    def readline(self) -> bytes:
+        while (end := self._buffer.find(b"\n", self._pos)) < 0 and self._fill():
+            pass
+        end = len(self._buffer) if end < 0 else end + 1
+        line = self._buffer[self._pos : end]
+        self._pos = end
+        return line
+
+
+def _csv_columns(reader: _ChunkReader) -> list[str]:
+    """读取并校验 CSV 表头"""
+    header = reader.readline().decode("UTF-8-sig")
+    columns = [column.strip() for column in next(csv.reader([header]), [])]
+    unknown = [column for column in columns if column not in COLUMNS]
+    if unknown:
+        raise ValueError(f"未知的列: {unknown}，可用的列: {list(COLUMNS)}")
+    duplicated = sorted({column for column in columns if columns.count(column) > 1})
+    if duplicated:
+        raise ValueError(f"重复的列: {duplicated}")
+    missing = [column for column in REQUIRED_COLUMNS if column not in columns]
+    if missing:
+        raise ValueError(f"缺少必需的列: {missing}")
+    return columns
+
+
+def import_records(db: Database, chunks: Iterable[bytes], format: str) -> dict:
+    """
+    导入记录并按 (label_key, type) 合并计数
+
+    数据只能读取一次，连接出错时不会重试
+
+    Args:
+        db: 数据库
+        chunks: 输入内容的字节块
+        format: csv | ndjson
+
+    Returns:
+        {"rows": 读取的行数, "inserted": 新增的记录数, "updated": 累加到已有记录的记录数}
+
+    Raises:
+        ValueError: 格式或 CSV 表头不合法，NDJSON 内容由数据库校验
+    """
+    if format not in FORMATS:
+        raise ValueError(f"不支持的格式: {format}")
+    reader = _ChunkReader(chunks)
+    if format == FORMAT_CSV:
+        columns = _csv_columns(reader)
+        create = _CREATE_IMPORT_TABLE
+        copy = (
+            f"COPY {_IMPORT_TABLE} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)"
+        )
+        source = _IMPORT_TABLE
+    else:
+        create = _CREATE_NDJSON_TABLE
+        copy = _COPY_NDJSON
+        source = _NDJSON_SOURCE
+
+    with db.connection() as conn, conn.cursor() as cur:
+        cur.execute(create)
+        cur.copy_expert(copy, reader)
+        cur.execute(f"SELECT COUNT(*) FROM {source}")
+        rows = cur.fetchone()[0]
+        cur.execute(_MERGE_IMPORT.format(source=source))
+        inserted, updated = cur.fetchone()
+    return {"rows": rows, "inserted": inserted, "updated": updated}
+
+
+class _ExportWriter:
+    """COPY TO 的输出目标，攒够 CHUNK_SIZE 后交给 sink"""
+
+    def __init__(self, sink, format: str):
+        self._sink = sink
+        self._unescape = format == FORMAT_NDJSON
+        self._buffer = bytearray()
+
+    def write(self, data: bytes) -> None:
+        self._buffer += data
+        if len(self._buffer) >= CHUNK_SIZE:
+            self._emit(final=False)
+
+    def flush(self) -> None:
+        self._emit(final=True)
+
+    def _emit(self, final: bool) -> None:
+        if self._unescape:
+            # 只处理完整的行，转义的反斜杠不会被拆开
+            end = len(self._buffer) if final else self._buffer.rfind(b"\n") + 1
+            data = bytes(self._buffer[:end]).replace(b"\\\\", b"\\")
+        else:
+            end = len(self._buffer)
+            data = bytes(self._buffer)
+        del self._buffer[:end]
+        if data:
+            self._sink(data)
+
+
+def _copy_out(cur: cursor, writer: _ExportWriter, format: str) -> None:
+    cur.copy_expert(_EXPORT_CSV if format == FORMAT_CSV else _EXPORT_NDJSON, writer)
+    writer.flush()
+
+
+def export_records(db: Database, output: BinaryIO, format: str) -> None:
+    """把所有记录写入 output"""
+    if format not in FORMATS:
+        raise ValueError(f"不支持的格式: {format}")
+    with db.connection() as conn, conn.cursor() as cur:
+        _copy_out(cur, _ExportWriter(output.write, format), format)
+
+
+class _Cancelled(Exception):
+    """流式导入导出的客户端已断开"""
+
+
+_DONE = object()
+_ABORTED = object()
+
+
+async def stream_export(db: Database, format: str) -> AsyncIterator[bytes]:
+    """
+    流式导出，COPY 在线程池中执行，通过有界队列把数据块交给事件循环
+    客户端断开时取消服务器端的 COPY，线程池中的线程都会退出。
+    取消引起的 QueryCanceledError 虽然是 OperationalError 的子类，但连接本身完好，
+    不按连接错误丢弃，而是回滚后照常放回连接池
+    """
+    if format not in FORMATS:
+        raise ValueError(f"不支持的格式: {format}")
+    chunks: queue.Queue = queue.Queue(maxsize=16)
+    cancelled = False
+    # 正在执行 COPY 的连接，只在持有 active_lock 时读写，
+    # 避免取消请求发给已经放回连接池、被其他请求借走的连接
+    active = None
+    active_lock = threading.Lock()
+
+    def take():
+        # 客户端断开后不再等待，线程不会一直阻塞在队列上
+        while not cancelled:
+            try:
+                return chunks.get(timeout=0.1)
+            except queue.Empty:
+                pass
+        return _DONE
+
+    def put(item) -> bool:
+        # 客户端断开后不再等待队列空位
+        while not cancelled:
+            try:
+                chunks.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def sink(data: bytes) -> None:
+        if not put(data):
+            raise _Cancelled
+
+    def produce() -> None:
+        nonlocal active
+        try:
+            with db.connection() as conn, conn.cursor() as cur:
+                with active_lock:
+                    active = None if cancelled else conn
+                try:
+                    _copy_out(cur, _ExportWriter(sink, format), format)
+                except QueryCanceledError as e:
+                    if not cancelled:
+                        raise
+                    raise _Cancelled from e
+                finally:
+                    with active_lock:
+                        active = None
+        except BaseException as e:
+            put(e)
+            return
+        put(_DONE)
+
+    def cancel_copy() -> None:
+        with active_lock:
+            if active is not None:
+                try:
+                    active.cancel()
+                except psycopg2.Error:
+                    pass
+
+    producer = asyncio.create_task(asyncio.to_thread(produce))
+    try:
+        while True:
+            item = await asyncio.to_thread(take)
+            if item is _DONE:
+                break
+            if isinstance(item, BaseException):
+                raise item
+            yield item
+    finally:
+        cancelled = True
+        if not producer.done():
+            # COPY 可能正在等待服务器的数据，不会马上调用 sink，先取消查询再等待回滚
+            await asyncio.to_thread(cancel_copy)
+        await producer
+
+
+async def import_stream(
+    db: Database, chunks: AsyncIterator[bytes], format: str
+) -> dict:
+    """
+    从异步字节流导入，例如 HTTP 请求体
+    读取请求与 COPY 同时进行，请求体不会整体读入内存
+    """
+    pending: queue.Queue = queue.Queue(maxsize=16)
+
+    def iter_pending() -> Iterator[bytes]:
+        while (chunk := pending.get()) is not _DONE:
+            if chunk is _ABORTED:
+                # COPY 失败，整个导入回滚
+                raise _Cancelled("请求中断")
+            yield chunk
+
+    consumer = asyncio.create_task(
+        asyncio.to_thread(import_records, db, iter_pending(), format)
+    )
+
+    def put(item) -> None:
+        # 导入提前出错时不再等待队列空位
+        while not consumer.done():
+            try:
+                pending.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                pass
+
+    completed = False
+    try:
+        async for chunk in chunks:
+            if consumer.done():
+                break
+            if chunk:
+                await asyncio.to_thread(put, chunk)
+        completed = True
+    finally:
+        await asyncio.to_thread(put, _DONE if completed else _ABORTED)
+        if not completed:
+            # 等待 COPY 回滚并释放连接，抛出的仍是中断请求的原始错误
+            await asyncio.gather(consumer, return_exceptions=True)
+    return await consumer
+
+
+def _format_for(path: str, format: str | None) -> str:
+    if format is not None:
+        return format
+    return FORMAT_NDJSON if path.endswith((".ndjson", ".jsonl")) else FORMAT_CSV
+
+
+def main():
+    parser = argparse.ArgumentParser(description="weight_record 批量导入导出")
+    parser.add_argument("command", choices=["import", "export"])
+    parser.add_argument("path", help="文件路径，- 表示标准输入/输出")
+    parser.add_argument(
+        "--format", choices=FORMATS, help="默认按扩展名判断，.ndjson/.jsonl 以外为 csv"
+    )
+    parser.add_argument("--url", help="连接串，默认读取 DATABASE_URL")
+    args = parser.parse_args()
+    format = _format_for(args.path, args.format)
+
+    db = Database(args.url, min_connections=1, max_connections=1)
+    try:
+        if args.command == "import":
+            source = sys.stdin.buffer if args.path == "-" else open(args.path, "rb")
+            with source:
+                result = import_records(
+                    db, iter(lambda: source.read(CHUNK_SIZE), b""), format
+                )
+            print(
+                f"读取 {result['rows']} 行，新增 {result['inserted']} 条，"
+                f"累加 {result['updated']} 条",
+                file=sys.stderr,
+            )
+        elif args.path == "-":
+            export_records(db, sys.stdout.buffer, format)
+        else:
+            with open(args.path, "wb") as output:
+                export_records(db, output, format)
+    finally:
+        db.close()
+
+
+__all__ = [
+    "FORMAT_CSV",
+    "FORMAT_NDJSON",
+    "FORMATS",
+    "COLUMNS",
+    "import_records",
+    "export_records",
+    "import_stream",
+    "stream_export",
+]
+
+
+if __name__ == "__main__":
+    main()
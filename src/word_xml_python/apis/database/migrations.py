@@ -0,0 +1,201 @@
+"""
+数据库结构迁移
+
+按版本号顺序执行 MIGRATIONS 中尚未执行的迁移，已执行的版本记录在 schema_migrations 表中。
+所有待执行的迁移在同一个事务中完成，并持有事务级 advisory lock，
+多个 API 进程同时启动时只有一个会真正执行，其余等待后发现已是最新版本。
+
+API 服务启动时自动执行（设置 DATABASE_MIGRATE_ON_STARTUP=0 关闭），也可以单独运行：
+    python -m word_xml_python.apis.database.migrations
+    python -m word_xml_python.apis.database.migrations --status
+"""
+
+from __future__ import annotations
+
+import argparse
+from typing import TYPE_CHECKING
+
+from .database import Database
+
+if TYPE_CHECKING:
+    from psycopg2.extensions import cursor
+
+# pg_advisory_xact_lock 使用的锁编号，同一数据库中的迁移互斥
+MIGRATION_LOCK_ID = 0x574F5244
+
+_CREATE_MIGRATIONS_TABLE = """
+CREATE TABLE IF NOT EXISTS schema_migrations (
+    version INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    applied_at TIMESTAMPTZ NOT NULL DEFAULT now()
+)
+"""
+
+
+class Migration:
+    """一个版本的结构变更"""
+
+    __slots__ = ("version", "name", "sql")
+
+    version: int
+    name: str
+    sql: str
+
+    def __init__(self, version: int, name: str, sql: str):
+        self.version = version
+        self.name = name
+        self.sql = sql
+
+
+MIGRATIONS: list[Migration] = [
+    Migration(
+        1,
+        "create weight_record",
+        # 已经手工建好的表保持不变，由后续迁移补齐约束
+        """
+        CREATE TABLE IF NOT EXISTS weight_record (
+            id BIGINT GENERATED BY DEFAULT AS IDENTITY PRIMARY KEY,
+            label_key TEXT NOT NULL,
+            type TEXT NOT NULL,
+            options TEXT[] NOT NULL DEFAULT '{}',
+            hit_count INTEGER NOT NULL DEFAULT 0,
+            consistency_count INTEGER NOT NULL DEFAULT 0,
+            un_consistency_count INTEGER NOT NULL DEFAULT 0,
+            confidence DOUBLE PRECISION NOT NULL DEFAULT 0,
+            create_time TIMESTAMPTZ NOT NULL DEFAULT now(),
+            update_time TIMESTAMPTZ NOT NULL DEFAULT now()
+        )
+        """,
+    ),
+    Migration(
+        2,
+        "unique (label_key, type)",
+        # 先把重复的 (label_key, type) 合并到 id 最小的记录，计数求和
+        # 唯一约束的索引同时服务于 label_key 与 (label_key, type) 的查询
+        """
+        WITH merged AS (
+            SELECT label_key, type, MIN(id) AS keep_id,
+                   SUM(hit_count) AS hit_count,
+                   SUM(consistency_count) AS consistency_count,
+                   SUM(un_consistency_count) AS un_consistency_count,
+                   MIN(create_time) AS create_time,
+                   MAX(update_time) AS update_time
+            FROM weight_record
+            GROUP BY label_key, type
+            HAVING COUNT(*) > 1
+        ), kept AS (
+            UPDATE weight_record AS record
+            SET hit_count = merged.hit_count,
+                consistency_count = merged.consistency_count,
+                un_consistency_count = merged.un_consistency_count,
+                create_time = merged.create_time,
+                update_time = merged.update_time
+            FROM merged
+            WHERE record.id = merged.keep_id
+            RETURNING record.id
+        )
+        DELETE FROM weight_record AS record
+        USING merged
+        WHERE record.label_key = merged.label_key
+          AND record.type = merged.type
+          AND record.id <> merged.keep_id;
+
+        ALTER TABLE weight_record
+            ADD CONSTRAINT weight_record_label_key_type_key UNIQUE (label_key, type);
+        """,
+    ),
+    Migration(
+        3,
+        "maintain update_time",
+        """
+        CREATE OR REPLACE FUNCTION weight_record_set_update_time() RETURNS trigger AS $$
+        BEGIN
+            NEW.update_time = now();
+            RETURN NEW;
+        END;
+        $$ LANGUAGE plpgsql;
+
+        DROP TRIGGER IF EXISTS weight_record_set_update_time ON weight_record;
+        CREATE TRIGGER weight_record_set_update_time
+            BEFORE UPDATE ON weight_record
+            FOR EACH ROW EXECUTE FUNCTION weight_record_set_update_time();
+        """,
+    ),
+]
+
+# 当前代码对应的结构版本
+SCHEMA_VERSION = MIGRATIONS[-1].version
+
+
+def _applied_versions(cur: cursor) -> set[int]:
+    cur.execute(_CREATE_MIGRATIONS_TABLE)
+    cur.execute("SELECT version FROM schema_migrations")
+    return {row[0] for row in cur.fetchall()}
+
+
+def apply_migrations(db: Database) -> list[Migration]:
+    """
+    执行所有尚未执行的迁移
+
+    Returns:
+        本次执行的迁移，已是最新版本时为空
+    """
+
+    def work(cur: cursor) -> list[Migration]:
+        cur.execute("SELECT pg_advisory_xact_lock(%s)", (MIGRATION_LOCK_ID,))
+        applied = _applied_versions(cur)
+        pending = [m for m in MIGRATIONS if m.version not in applied]
+        for migration in pending:
+            cur.execute(migration.sql)
+            cur.execute(
+                "INSERT INTO schema_migrations (version, name) VALUES (%s, %s)",
+                (migration.version, migration.name),
+            )
+        return pending
+
+    return db.run_sync(work)
+
+
+def pending_migrations(db: Database) -> list[Migration]:
+    """尚未执行的迁移"""
+
+    def work(cur: cursor) -> list[Migration]:
+        applied = _applied_versions(cur)
+        return [m for m in MIGRATIONS if m.version not in applied]
+
+    return db.run_sync(work)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="执行 weight_record 数据库结构迁移")
+    parser.add_argument("--url", help="连接串，默认读取 DATABASE_URL")
+    parser.add_argument(
+        "--status", action="store_true", help="只列出尚未执行的迁移，不执行"
+    )
+    args = parser.parse_args()
+
+    db = Database(args.url, min_connections=1, max_connections=1)
+    try:
+        if args.status:
+            pending = pending_migrations(db)
+            print(f"目标版本: {SCHEMA_VERSION}，待执行: {len(pending)}")
+        else:
+            pending = apply_migrations(db)
+            print(f"已更新到版本 {SCHEMA_VERSION}，本次执行: {len(pending)}")
+        for migration in pending:
+            print(f"- {migration.version}: {migration.name}")
+    finally:
+        db.close()
+
+
+__all__ = [
+    "Migration",
+    "MIGRATIONS",
+    "SCHEMA_VERSION",
+    "apply_migrations",
+    "pending_migrations",
+]
+
+
+if __name__ == "__main__":
+    main()
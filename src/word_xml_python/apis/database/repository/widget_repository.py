@@ -1,6 +1,7 @@
 """
 Repository 仓库层
 负责与数据库直接交互，执行 SQL 操作
+每个方法从连接池借出一个连接，在线程池中执行，不阻塞事件循环
 """
 
 from typing import Any
@@ -12,158 +13,121 @@ class WidgetRepository:
     """Widget 数据仓库 - 处理数据库 CRUD 操作"""
 
     TABLE_NAME = "weight_record"
+    COLUMNS = """id, label_key, type, options, hit_count, consistency_count,
+               un_consistency_count, confidence, create_time, update_time"""
 
     def __init__(self, db: Database):
         self.db = db
 
-    def create(
+    @staticmethod
+    def _row_to_dict(row: tuple) -> dict[str, Any]:
+        return {
+            "id": row[0],
+            "label_key": row[1],
+            "type": row[2],
+            "options": list(row[3]) if row[3] else [],
+            "hit_count": row[4],
+            "consistency_count": row[5],
+            "un_consistency_count": row[6],
+            "confidence": row[7],
+            "create_time": row[8],
+            "update_time": row[9],
+        }
+
+    async def create(
         self,
         label_key: str,
         type: str,
         options: list[str],
-        log_type: str,
     ) -> dict[str, Any] | None:
-        """创建新记录"""
+        """创建新记录，计数均为 0"""
         sql = f"""
         INSERT INTO {self.TABLE_NAME} (label_key, type, options, hit_count, consistency_count, un_consistency_count, confidence)
-        VALUES (%s, %s, %s, %s, %s, %s, %s)
-        RETURNING id, label_key, type, options, hit_count, consistency_count, 
-                  un_consistency_count, confidence, create_time, update_time;
+        VALUES (%s, %s, %s, 0, 0, 0, 0)
+        RETURNING {self.COLUMNS};
         """
-        consistency_count = 1 if log_type == "consistency" else 0
-        un_consistency_count = 1 if log_type == "consistency" else 0
-        self.db.cursor.execute(
-            sql,
-            (label_key, type, options, 0, consistency_count, un_consistency_count, 0),
-        )
-        self.db.conn.commit()
-        row = self.db.cursor.fetchone()
+        row = await self.db.fetchone(sql, (label_key, type, options))
         return self._row_to_dict(row) if row else None
 
-    def find_all(self, label_key: str) -> list[dict[str, Any]]:
+    async def find_all(self, label_key: str) -> list[dict[str, Any]]:
         """根据 label_key 查询所有记录"""
+        return await self.find_by_label_key(label_key)
+
+    async def find_by_label_key(self, label_key: str) -> list[dict[str, Any]]:
+        """根据 label_key 查询多条记录"""
         sql = f"""
-        SELECT id, label_key, type, options, hit_count, consistency_count, 
-               un_consistency_count, confidence, create_time, update_time
+        SELECT {self.COLUMNS}
         FROM {self.TABLE_NAME}
         WHERE label_key = %s
         """
-        self.db.cursor.execute(sql, (label_key,))
-        rows = self.db.cursor.fetchall()
-        return [
-            {
-                "id": row[0],
-                "label_key": row[1],
-                "type": row[2],
-                "options": list(row[3]) if row[3] else [],
-                "hit_count": row[4],
-                "consistency_count": row[5],
-                "un_consistency_count": row[6],
-                "confidence": row[7],
-                "create_time": row[8],
-                "update_time": row[9],
-            }
-            for row in rows
-        ]
+        rows = await self.db.fetchall(sql, (label_key,))
+        return [self._row_to_dict(row) for row in rows]
 
-    def find_by_label_key(self, label_key: str) -> list[dict[str, Any]]:
-        """根据 label_key 查询多条记录"""
+    async def find_by_label_keys(self, label_keys: list[str]) -> list[dict[str, Any]]:
+        """一次查询多个 label_key 的所有记录"""
         sql = f"""
-        SELECT id, label_key, type, options, hit_count, consistency_count, 
-               un_consistency_count, confidence, create_time, update_time
+        SELECT {self.COLUMNS}
         FROM {self.TABLE_NAME}
-        WHERE label_key = %s
+        WHERE label_key = ANY(%s)
         """
-        self.db.cursor.execute(sql, (label_key,))
-        rows = self.db.cursor.fetchall()
-        return [
-            {
-                "id": row[0],
-                "label_key": row[1],
-                "type": row[2],
-                "options": list(row[3]) if row[3] else [],
-                "hit_count": row[4],
-                "consistency_count": row[5],
-                "un_consistency_count": row[6],
-                "confidence": row[7],
-                "create_time": row[8],
-                "update_time": row[9],
-            }
-            for row in rows
-        ]
+        rows = await self.db.fetchall(sql, (label_keys,))
+        return [self._row_to_dict(row) for row in rows]
 
-    def count_all(self) -> int:
+    async def count_all(self) -> int:
         """获取总记录数"""
         sql = f"SELECT COUNT(*) FROM {self.TABLE_NAME};"
-        self.db.cursor.execute(sql)
-        result = self.db.cursor.fetchone()
+        result = await self.db.fetchone(sql)
         return result[0] if result else 0
 
-    def find_by_label_key_and_type(
+    async def find_by_label_key_and_type(
         self, label_key: str, type: str
     ) -> dict[str, Any] | None:
         """根据 label_key 和 type 查询单条记录"""
         sql = f"""
-        SELECT id, label_key, type, options, hit_count, consistency_count, 
-               un_consistency_count, confidence, create_time, update_time
+        SELECT {self.COLUMNS}
         FROM {self.TABLE_NAME}
         WHERE label_key = %s AND type = %s
         LIMIT 1
         """
-        self.db.cursor.execute(sql, (label_key, type))
-        row = self.db.cursor.fetchone()
-        return (
-            {
-                "id": row[0],
-                "label_key": row[1],
-                "type": row[2],
-                "options": list(row[3]) if row[3] else [],
-                "hit_count": row[4],
-                "consistency_count": row[5],
-                "un_consistency_count": row[6],
-                "confidence": row[7],
-                "create_time": row[8],
-                "update_time": row[9],
-            }
-            if row
-            else None
-        )
+        row = await self.db.fetchone(sql, (label_key, type))
+        return self._row_to_dict(row) if row else None
 
-    def update_hit_count_by_label_key_and_type(
-        self, label_key: str, type: str, hit_count: int
+    async def increment_hit_count(
+        self, label_key: str, type: str, options: list[str]
     ) -> bool:
-        """根据 label_key 和 type 更新 hit_count"""
-        sql = f"""
-        UPDATE {self.TABLE_NAME}
-        SET hit_count = %s
-        WHERE label_key = %s AND type = %s
         """
-        self.db.cursor.execute(sql, (hit_count, label_key, type))
-        self.db.conn.commit()
-        return self.db.cursor.rowcount > 0
-
-    def update_consistency_count_by_label_key_and_type(
-        self, label_key: str, type: str, consistency_count: int
-    ) -> bool:
-        """根据 label_key 和 type 更新 consistency_count"""
+        hit_count 加 1，记录不存在时创建
+        依赖 (label_key, type) 唯一约束，计数在数据库中累加，并发调用不会丢失
+        """
         sql = f"""
-        UPDATE {self.TABLE_NAME}
-        SET consistency_count = %s
-        WHERE label_key = %s AND type = %s
+        INSERT INTO {self.TABLE_NAME} AS record (label_key, type, options, hit_count, consistency_count, un_consistency_count, confidence)
+        VALUES (%s, %s, %s, 1, 0, 0, 0)
+        ON CONFLICT (label_key, type)
+        DO UPDATE SET hit_count = record.hit_count + 1
         """
-        self.db.cursor.execute(sql, (consistency_count, label_key, type))
-        self.db.conn.commit()
-        return self.db.cursor.rowcount > 0
+        return await self.db.execute(sql, (label_key, type, options)) > 0
 
-    def update_un_consistency_count_by_label_key_and_type(
-        self, label_key: str, type: str, un_consistency_count: int
+    async def record_consistency(
+        self, label_key: str, type: str, options: list[str]
     ) -> bool:
-        """根据 label_key 和 type 更新 un_consistency_count"""
+        """
+        记录一次 label_key 被确认为 type：
+        该类型的 consistency_count 加 1（记录不存在时创建），
+        同一 label_key 其他类型的 un_consistency_count 加 1
+        两部分在同一条语句中完成，只有一次往返和一次提交
+        """
         sql = f"""
+        WITH upsert AS (
+            INSERT INTO {self.TABLE_NAME} AS record (label_key, type, options, hit_count, consistency_count, un_consistency_count, confidence)
+            VALUES (%(label_key)s, %(type)s, %(options)s, 0, 1, 0, 0)
+            ON CONFLICT (label_key, type)
+            DO UPDATE SET consistency_count = record.consistency_count + 1
+            RETURNING id
+        )
         UPDATE {self.TABLE_NAME}
-        SET un_consistency_count = %s
-        WHERE label_key = %s AND type = %s
+        SET un_consistency_count = un_consistency_count + 1
+        WHERE label_key = %(label_key)s AND type <> %(type)s
         """
-        self.db.cursor.execute(sql, (un_consistency_count, label_key, type))
-        self.db.conn.commit()
-        return self.db.cursor.rowcount > 0
+        params = {"label_key": label_key, "type": type, "options": options}
+        await self.db.execute(sql, params)
+        return True
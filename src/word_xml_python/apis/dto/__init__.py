@@ -1,4 +1,5 @@
 from .widget_dto import (
+    BulkImportResponse,
     GetTypeRequest,
     WidgetCreateRequest,
     WigetListRequest,
@@ -7,6 +8,7 @@ from .widget_dto import (
 )
 
 __all__ = [
+    "BulkImportResponse",
     "GetTypeRequest",
     "WidgetCreateRequest",
     "WigetListRequest",
@@ -26,8 +26,8 @@ class SetLogRequest(BaseModel):
         ...,
         description="日志类型",
         examples=[
-            "hit",
-            "consistency",
+            "hit_count",
+            "consistency_count",
         ],
     )
     label_key: str = Field(..., description="标签键", examples=["name_field"])
@@ -46,6 +46,14 @@ class GetTypeRequest(BaseModel):
 # ==================== 响应 DTO ====================
 
 
+class BulkImportResponse(BaseModel):
+    """批量导入结果"""
+
+    rows: int = Field(..., description="读取的行数")
+    inserted: int = Field(..., description="新增的记录数")
+    updated: int = Field(..., description="计数累加到已有记录的记录数")
+
+
 class WidgetResponse(BaseModel):
     """Widget 响应体"""
 
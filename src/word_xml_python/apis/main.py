@@ -2,22 +2,42 @@
 FastAPI 主入口文件
 """
 
+import asyncio
+import os
+import sys
+import time
 from contextlib import asynccontextmanager
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, PlainTextResponse
+import psycopg2
 import uvicorn
 
+from ..core.metrics import InMemorySink, get_sink, set_sink
 from .controller import widget_router
-from .database.database import close_database
+from .database.database import close_database, get_database
+from .database.migrations import apply_migrations
+
+# Prometheus 文本格式的 Content-Type
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """
     应用生命周期管理
-    - 启动时：可以进行初始化操作
+    - 启动时：启用内存指标 sink，供 /metrics 输出 HTTP 请求与数据库查询的指标
+      （API 不运行 Core，阶段指标由调用 Core 的批处理进程产生）；执行数据库结构迁移，
+      数据库不可用时只打印警告，服务照常启动，可在恢复后用迁移命令补齐
     - 关闭时：清理数据库连接等资源
     """
+    if not get_sink().enabled:
+        set_sink(InMemorySink())
+    if os.getenv("DATABASE_MIGRATE_ON_STARTUP", "1") != "0":
+        try:
+            await asyncio.to_thread(apply_migrations, get_database())
+        except psycopg2.OperationalError as e:
+            print(f"数据库结构迁移未执行: {e}", file=sys.stderr)
     yield
     close_database()
 
@@ -33,6 +53,47 @@ app = FastAPI(
 )
 
 
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    """记录每个请求的耗时与次数，路径使用路由模板，避免路径参数造成标签膨胀"""
+    started = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        route = request.scope.get("route")
+        labels = (
+            ("method", request.method),
+            ("path", route.path if route is not None else "unmatched"),
+            ("status", str(status)),
+        )
+        sink = get_sink()
+        sink.observe(
+            "http_request_duration_seconds", time.perf_counter() - started, labels
+        )
+        sink.increment("http_requests", labels=labels)
+
+
+@app.get("/health", summary="健康检查")
+async def health() -> JSONResponse:
+    """数据库不可用时返回 503，数据库恢复后连接池会自动重新建立连接"""
+    database = await get_database().health()
+    return JSONResponse(
+        {"status": "ok" if database else "unavailable", "database": database},
+        status_code=200 if database else 503,
+    )
+
+
+@app.get("/metrics", include_in_schema=False)
+def metrics() -> PlainTextResponse:
+    """Prometheus 指标：HTTP 请求与数据库查询，不包含 Core 的阶段指标"""
+    sink = get_sink()
+    body = sink.render_prometheus() if isinstance(sink, InMemorySink) else ""
+    return PlainTextResponse(body, media_type=PROMETHEUS_CONTENT_TYPE)
+
+
 app.include_router(widget_router)
 
 if __name__ == "__main__":
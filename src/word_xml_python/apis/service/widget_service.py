@@ -1,15 +1,20 @@
 """
 Service 服务层
 负责业务逻辑处理，连接 Controller 和 Repository
+数据库访问都是异步的，不阻塞事件循环
 """
 
 from datetime import datetime
+from typing import AsyncIterator
 
+import psycopg2
 from fastapi import HTTPException
 
+from ..database.bulk import import_stream, stream_export
 from ..database.database import Database
 from ..database.repository import WidgetRepository
 from ..dto import (
+    BulkImportResponse,
     GetTypeRequest,
     SetLogRequest,
     WidgetCreateRequest,
@@ -31,10 +36,10 @@ class WidgetService:
         self.db = db
         self.repository = WidgetRepository(self.db)
 
-    def create_widget(self, request: WidgetCreateRequest) -> WidgetResponse:
+    async def create_widget(self, request: WidgetCreateRequest) -> WidgetResponse:
         """创建 Widget"""
         # 检查是否已存在相同的 label_key
-        existing = self.repository.find_by_label_key(request.label_key)
+        existing = await self.repository.find_by_label_key(request.label_key)
         if existing:
             raise HTTPException(
                 status_code=400,
@@ -42,7 +47,7 @@ class WidgetService:
             )
 
         # 创建记录
-        result = self.repository.create(
+        result = await self.repository.create(
             label_key=request.label_key,
             type=request.type,
             options=request.options,
@@ -53,119 +58,135 @@ class WidgetService:
 
         return WidgetResponse(**result)
 
-    def get_widget_list(self, request: WigetListRequest) -> list[WidgetResponse]:
-        print("get_widget_list", request.label_key)
-        return [
-            WidgetResponse(**row) for row in self.repository.find_all(request.label_key)
-        ]
-
-    def set_log(self, request: SetLogRequest) -> bool:
-        label_key = request.label_key
-        log_type = request.log_type
-        options = request.options
-        type = request.type
-
-        if log_type == "hit_count":
-            record = self.repository.find_by_label_key_and_type(label_key, type)
-            if record:
-                self.repository.update_hit_count_by_label_key_and_type(
-                    label_key, type, record["hit_count"] + 1
-                )
-            else:
-                self.create_widget_record(label_key, type, options, log_type)
-        elif log_type == "consistency_count":
-            records = self.repository.find_by_label_key(label_key)
-            if len(records) == 0:
-                self.create_widget_record(label_key, type, options, log_type)
-            else:
-                for record in records:
-                    if record["type"] == type:
-                        self.repository.update_consistency_count_by_label_key_and_type(
-                            label_key, type, record["consistency_count"] + 1
-                        )
-                    else:
-                        self.repository.update_un_consistency_count_by_label_key_and_type(
-                            label_key, type, record["un_consistency_count"] + 1
-                        )
-
-    def create_widget_record(
-        self, label_key: str, type: str, options: list[str], log_type: str
-    ) -> bool:
-        self.repository.create(label_key, type, options, log_type)
-
-    def get_type(self, request: GetTypeRequest) -> str:
-        def clean_keyword(text: str | None) -> str:
-            if text is None:
-                return ""
-            return (
-                text.replace(" ", "")
-                .replace("\n", "")
-                .replace("\r", "")
-                .replace("\t", "")
-            )
+    async def get_widget_list(self, request: WigetListRequest) -> list[WidgetResponse]:
+        rows = await self.repository.find_all(request.label_key)
+        return [WidgetResponse(**row) for row in rows]
 
-        def get_frequency_confidence(hit_count: int) -> float:
-            if hit_count >= 50:
-                return 1.0
-            elif hit_count >= 10:
-                return 0.9
-            elif hit_count >= 3:
-                return 0.6
-            elif hit_count >= 1:
-                return 0.2
-            return 0.0
-
-        def get_consistency_confidence(
-            consistency_count: int, un_consistency_count: int
-        ) -> float:
-            total = consistency_count + un_consistency_count
-            if total == 0:
-                return 0.0
-            return consistency_count / total
-
-        def get_time_decay(update_time: datetime) -> float:
-            now = datetime.now(update_time.tzinfo)
-            days_diff = (now - update_time).days
-            if days_diff > 20:
-                return 0.7
-            return 1.0
-
-        keywords = [
-            clean_keyword(request.left_text),
-            clean_keyword(request.top_text),
-            clean_keyword(request.text),
-        ]
-        keywords = [k for k in keywords if k]
-
-        if not keywords:
-            return ""
-
-        records_map: dict[int, dict] = {}
-        for keyword in keywords:
-            records = self.repository.find_by_label_key(keyword)
-            for record in records:
-                records_map[record["id"]] = record
-
-        if not records_map:
-            return ""
-
-        best_type = ""
-        best_confidence = -1.0
-
-        for record in records_map.values():
-            freq_conf = get_frequency_confidence(record["hit_count"])
-            cons_conf = get_consistency_confidence(
-                record["consistency_count"], record["un_consistency_count"]
+    async def set_log(self, request: SetLogRequest) -> bool:
+        """
+        记录一次命中或一致性反馈
+        计数都在数据库中用一条 upsert 语句累加，每次调用只有一次往返和一次提交
+        """
+        if request.log_type == "hit_count":
+            return await self.repository.increment_hit_count(
+                request.label_key, request.type, request.options
             )
-            time_decay = get_time_decay(record["update_time"])
-
-            confidence = freq_conf * cons_conf * time_decay
-
-            if confidence > best_confidence:
-                best_confidence = confidence
-                best_type = record["type"]
+        if request.log_type == "consistency_count":
+            return await self.repository.record_consistency(
+                request.label_key, request.type, request.options
+            )
+        raise HTTPException(
+            status_code=400, detail=f"Unsupported log_type '{request.log_type}'"
+        )
 
-        if best_confidence <= 0.5:
-            return ""
+    async def import_widgets(
+        self, chunks: AsyncIterator[bytes], format: str
+    ) -> BulkImportResponse:
+        """批量导入，同一个 (label_key, type) 的计数与已有记录求和"""
+        try:
+            result = await import_stream(self.db, chunks, format)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        except (psycopg2.DataError, psycopg2.IntegrityError) as e:
+            raise HTTPException(status_code=400, detail=str(e).strip())
+        return BulkImportResponse(**result)
+
+    def export_widgets(self, format: str) -> AsyncIterator[bytes]:
+        """批量导出，返回边读边输出的字节流"""
+        return stream_export(self.db, format)
+
+    async def get_type(self, request: GetTypeRequest) -> str:
+        return (await self.get_types([request]))[0]
+
+    async def get_types(self, requests: list[GetTypeRequest]) -> list[str]:
+        """
+        批量获取类型，所有请求的关键词合并后只查询一次数据库
 
-        return best_type
+        Returns:
+            与 requests 一一对应的类型，无法确定时为空字符串
+        """
+        keywords_by_request = [_keywords(request) for request in requests]
+        label_keys = list(
+            dict.fromkeys(
+                keyword for keywords in keywords_by_request for keyword in keywords
+            )
+        )
+        if not label_keys:
+            return [""] * len(requests)
+
+        records_by_key: dict[str, list[dict]] = {}
+        for record in await self.repository.find_by_label_keys(label_keys):
+            records_by_key.setdefault(record["label_key"], []).append(record)
+
+        # 同一条记录可能被多个请求用到，置信度只计算一次
+        confidences: dict[int, float] = {}
+        types = []
+        for keywords in keywords_by_request:
+            records_map: dict[int, dict] = {}
+            for keyword in keywords:
+                for record in records_by_key.get(keyword, ()):
+                    records_map[record["id"]] = record
+
+            best_type = ""
+            best_confidence = -1.0
+            for record_id, record in records_map.items():
+                confidence = confidences.get(record_id)
+                if confidence is None:
+                    confidence = confidences[record_id] = _confidence(record)
+                if confidence > best_confidence:
+                    best_confidence = confidence
+                    best_type = record["type"]
+
+            types.append(best_type if best_confidence > 0.5 else "")
+        return types
+
+
+def _clean_keyword(text: str | None) -> str:
+    if text is None:
+        return ""
+    return text.replace(" ", "").replace("\n", "").replace("\r", "").replace("\t", "")
+
+
+def _keywords(request: GetTypeRequest) -> list[str]:
+    keywords = [
+        _clean_keyword(request.left_text),
+        _clean_keyword(request.top_text),
+        _clean_keyword(request.text),
+    ]
+    return [k for k in keywords if k]
+
+
+def _frequency_confidence(hit_count: int) -> float:
+    if hit_count >= 50:
+        return 1.0
+    elif hit_count >= 10:
+        return 0.9
+    elif hit_count >= 3:
+        return 0.6
+    elif hit_count >= 1:
+        return 0.2
+    return 0.0
+
+
+def _consistency_confidence(consistency_count: int, un_consistency_count: int) -> float:
+    total = consistency_count + un_consistency_count
+    if total == 0:
+        return 0.0
+    return consistency_count / total
+
+
+def _time_decay(update_time: datetime) -> float:
+    now = datetime.now(update_time.tzinfo)
+    days_diff = (now - update_time).days
+    if days_diff > 20:
+        return 0.7
+    return 1.0
+
+
+def _confidence(record: dict) -> float:
+    freq_conf = _frequency_confidence(record["hit_count"])
+    cons_conf = _consistency_confidence(
+        record["consistency_count"], record["un_consistency_count"]
+    )
+    time_decay = _time_decay(record["update_time"])
+    return freq_conf * cons_conf * time_decay
@@ -1,5 +1,22 @@
 """核心配置和常量模块"""
 
 from .constants import TCPR_DELETE_TAGS, WORD_NAMESPACES, WORD_NS_URI
+from .docx_reader import iter_tables, open_document_xml
+from .grid import TableGrid
+from .table_tree import TableNode, build_table_tree
+from .metrics import InMemorySink, MetricsSink, NullSink, set_sink
 
-__all__ = ["TCPR_DELETE_TAGS", "WORD_NAMESPACES", "WORD_NS_URI"]
+__all__ = [
+    "TCPR_DELETE_TAGS",
+    "WORD_NAMESPACES",
+    "WORD_NS_URI",
+    "iter_tables",
+    "open_document_xml",
+    "TableGrid",
+    "TableNode",
+    "build_table_tree",
+    "MetricsSink",
+    "NullSink",
+    "InMemorySink",
+    "set_sink",
+]
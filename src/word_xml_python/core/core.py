@@ -1,12 +1,38 @@
+import asyncio
+import copy
 import json
+import os
+import traceback
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from typing import IO, Awaitable, Callable, Iterable, Iterator, TypeVar
+
 from lxml import etree
+from lxml.etree import _Element
 
 from word_xml_python.extractors.extractor import Extractor
-from word_xml_python.models import ExtractorResult, VerifierMeta
-from word_xml_python.split.split_verifier import SplitVerifier
+from word_xml_python.models import (
+    BatchResult,
+    DocumentManifest,
+    ExtractorResult,
+    ManifestEntry,
+    VerifierMeta,
+)
+from word_xml_python.models.batch import DOCUMENT_RESULTS_ADAPTER
+from word_xml_python.models.records import ExtractorRecord
+from ..exporters import GRANULARITY_REGION, iter_ndjson, write_ndjson
+from ..segmentation import Segmenter, StaticSegmentationClient
 from ..split import TableSplitter
-from ..vlmap import Vlmap, MapVerifier
-from ..core.constants import WORD_NAMESPACES
+from ..core.grid import TableGrid
+from ..core.docx_reader import DocumentSource, iter_tables, open_document_xml
+from ..core.metrics import count, span
+from ..core.manifest import table_content_hash
+from ..core.table_tree import TableNode, build_table_tree
+
+T = TypeVar("T")
+
+# 在子进程中创建分割调度器，需要能被 pickle（模块级函数或 functools.partial）
+SegmenterFactory = Callable[[], Segmenter]
 
 
 class Core:
@@ -15,69 +41,492 @@ class Core:
     调度所有模块的执行
     """
 
-    file_path: str
-    file_bytes: bytes
-    demo_spit_result: list[VerifierMeta]
+    file_path: DocumentSource
+    demo_spit_result: list[VerifierMeta] | None
+    segmenter: Segmenter
 
-    def __init__(self, file_path: str, demo_spit_result_str: str):
+    def __init__(
+        self,
+        file_path: DocumentSource,
+        demo_spit_result_str: str | None = None,
+        segmenter: Segmenter | None = None,
+    ):
+        """
+        Args:
+            file_path: .docx 文件路径/文件对象，或已解压的 document.xml 路径
+            demo_spit_result_str: 固定的分割结果 json 字符串，未提供 segmenter 时使用
+            segmenter: 分割调度器，用于接入真实的 AI 分割客户端
+        """
         self.file_path = file_path
-        self.file_bytes = open(file_path, "rb").read()
-        raw_result = json.loads(demo_spit_result_str)
-        self.demo_spit_result = [VerifierMeta(**item) for item in raw_result]
+        self.demo_spit_result = None
+        if demo_spit_result_str is not None:
+            raw_result = json.loads(demo_spit_result_str)
+            self.demo_spit_result = [VerifierMeta(**item) for item in raw_result]
 
-    def get_xml_tables(self) -> list[str]:
+        if segmenter is None:
+            if demo_spit_result_str is None:
+                raise ValueError("demo_spit_result_str 与 segmenter 至少需要提供一个")
+            # 固定结果重试也不会变化，不需要重试
+            segmenter = Segmenter(
+                StaticSegmentationClient(demo_spit_result_str), max_retries=0
+            )
+        self.segmenter = segmenter
+
+    @property
+    def file_bytes(self) -> bytes:
+        """
+        document.xml 的完整内容
+        会把整个正文读入内存，大文档请使用 iter_tables
+        """
+        with open_document_xml(self.file_path) as stream:
+            return stream.read()
+
+    def iter_tables(self) -> Iterator[_Element]:
+        """
+        以流的方式逐个产出顶层表格元素
+        产出的元素只在下一次迭代前有效
+        """
+        return iter_tables(self.file_path)
+
+    def iter_table_nodes(self) -> Iterator[TableNode]:
         """
-        获取所有表格的xml字符串
+        按文档顺序逐个产出所有表格，嵌套表格作为独立的节点紧跟在外层表格之后
+        产出的节点只在下一个顶层表格开始解析前有效
         """
-        tree = etree.fromstring(self.file_bytes)
-        tables = tree.findall(".//w:tbl", WORD_NAMESPACES)
+        for table in self.iter_tables():
+            yield from self._build_tree(table).walk()
 
+    def get_xml_tables(self) -> list[str]:
+        """
+        获取所有表格的xml字符串，嵌套表格单独列出
+        外层表格的字符串中仍包含嵌套表格，处理时不会计入外层表格
+        """
         return [
-            etree.tostring(table, pretty_print=True, encoding="UTF-8")
-            for table in tables
+            etree.tostring(node.element, pretty_print=True, encoding="UTF-8")
+            for node in self.iter_table_nodes()
         ]
 
+    def start_all_by_stream(self) -> Iterator[list[ExtractorResult] | None]:
+        """
+        边解析边处理所有表格，峰值内存只取决于同时在途的
+        segmenter.concurrency 个顶层表格，与文档大小无关
+        """
+        for records in self.start_records_by_stream():
+            yield _to_models(records)
+
+    def start_records_by_stream(self) -> Iterator[list[ExtractorRecord] | None]:
+        """
+        与 start_all_by_stream 相同，但产出不做校验的内部记录，
+        直接序列化时省去创建 pydantic 模型的开销
+
+        嵌套表格与 get_xml_tables 的顺序一致，各自产出一项；
+        所有表格在同一个事件循环中处理，后续顶层表格在等待前一个表格时
+        已经开始 AI 分割，并发数受 segmenter.concurrency 限制
+        """
+        with asyncio.Runner() as runner:
+            for records in self._run_pipelined(runner, self._records_by_tree):
+                yield from records
+
+    def start_incremental(
+        self, manifest: DocumentManifest | None = None
+    ) -> DocumentManifest:
+        """
+        增量处理：内容哈希与旧清单中某个表格相同的表格直接使用旧结果，
+        只有新增或修改过的表格才会经过 AI 分割、拆分与提取
+
+        Args:
+            manifest: 上次处理返回的清单，为 None 或版本不一致时处理所有表格
+
+        Returns:
+            本次的清单，results() 即为所有表格的提取结果，保存后供下次使用
+        """
+        reusable = manifest.reusable() if manifest is not None else {}
+        entries: list[ManifestEntry] = []
+        with asyncio.Runner() as runner:
+            for table_entries in self._run_pipelined(
+                runner,
+                lambda nodes, first: self._entries_by_tree(nodes, first, reusable),
+            ):
+                entries.extend(table_entries)
+        return DocumentManifest(tables=entries)
+
+    def iter_ndjson(self, granularity: str = GRANULARITY_REGION) -> Iterator[str]:
+        """
+        边解析边处理，逐条产出 NDJSON 记录
+        第一个表格处理完即可得到记录，不需要等待整个文档
+
+        Args:
+            granularity: region 每个区域一行，cell 每个单元格一行
+        """
+        return iter_ndjson(self.start_records_by_stream(), granularity)
+
+    def write_ndjson(self, fp: IO[str], granularity: str = GRANULARITY_REGION) -> int:
+        """
+        边解析边处理，把 NDJSON 记录写入文本文件对象
+
+        Returns:
+            写入的记录数
+        """
+        return write_ndjson(self.start_records_by_stream(), fp, granularity)
+
     def start_all_by_tables(
-        self, table_xmls: list[str]
+        self, table_xmls: list[str | bytes | _Element]
+    ) -> list[list[ExtractorResult] | None]:
+        """
+        一次性处理所有表格，各表格的 AI 分割并发进行
+        """
+        return asyncio.run(self.start_all_by_tables_async(table_xmls))
+
+    async def start_all_by_tables_async(
+        self, table_xmls: list[str | bytes | _Element]
     ) -> list[list[ExtractorResult] | None]:
         """
-        一次性处理所有表格
+        一次性处理所有表格，在 segmenter 的并发上限内同时进行 AI 分割
+        """
+        tables = []
+        grids = []
+        for table_xml in table_xmls:
+            table, grid = self._parse_table(table_xml)
+            tables.append(table)
+            grids.append(grid)
+        segmentations = await self.segmenter.segment_many(tables, grids)
+        return [
+            _to_models(self._split_and_extract(table, grid, segmentation.metas))
+            for table, grid, segmentation in zip(tables, grids, segmentations)
+        ]
+
+    def start_by_table(
+        self, table_xml: bytes | str | _Element
+    ) -> list[ExtractorResult] | None:
+        """
+        处理单个表格
+        不能在已运行的事件循环中调用，此时请使用 start_by_table_async
+
+        Args:
+            table_xml: 表格 xml 字符串，或已解析的 w:tbl 元素
+                传入元素时整个流程只传递元素，不再做任何序列化/解析
         """
-        return [self.start_by_table(table_xml) for table_xml in table_xmls]
+        return asyncio.run(self.start_by_table_async(table_xml))
 
-    def start_by_table(self, table_xml: bytes | str) -> list[ExtractorResult] | None:
+    async def start_by_table_async(
+        self, table_xml: bytes | str | _Element
+    ) -> list[ExtractorResult] | None:
         """
         处理单个表格
+
+        Returns:
+            提取结果，AI 分割重试耗尽仍未通过验证时为 None
         """
-        # 确保是字符串格式
-        if isinstance(table_xml, bytes):
-            table_xml_str = table_xml.decode("UTF-8")
-        else:
-            table_xml_str = table_xml
+        return _to_models(await self._records_by_table(table_xml))
 
-        vlmap = Vlmap(table_xml_string=table_xml_str)
+    def _run_pipelined(
+        self,
+        runner: asyncio.Runner,
+        work: Callable[[list[TableNode], int], Awaitable[T]],
+    ) -> Iterator[T]:
+        """
+        在 runner 的事件循环中对每个顶层表格执行 work，按文档顺序产出结果
+        work 的参数为顶层表格及其嵌套表格（先序），以及其中第一个表格在文档中的序号
+
+        最多 segmenter.concurrency 个顶层表格同时在途，它们的 AI 分割共用
+        segmenter 的并发上限。iter_tables 产出的元素在下一次迭代后失效，
+        同时在途多个表格时 work 使用表格的 deepcopy。副本只声明用到的命名空间，
+        内容哈希不受命名空间声明位置的影响，与直接处理原元素时相同
+        """
+        loop = runner.get_loop()
+        window = max(1, self.segmenter.concurrency)
+        tables = self._iter_tables_timed()
+        pending: deque[asyncio.Task] = deque()
+        first = 0
+        while True:
+            while len(pending) < window and (table := next(tables, None)) is not None:
+                if window > 1:
+                    table = copy.deepcopy(table)
+                nodes = list(self._build_tree(table).walk())
+                pending.append(loop.create_task(work(nodes, first)))
+                first += len(nodes)
+            if not pending:
+                return
+            # 等待最早的表格时，其余在途表格的 AI 分割同时进行
+            yield runner.run(_wait(pending.popleft()))
+
+    def _iter_tables_timed(self) -> Iterator[_Element]:
+        """与 iter_tables 相同，读取表格的耗时计入 parse 阶段"""
+        tables = self.iter_tables()
+        while True:
+            with span("parse"):
+                table = next(tables, None)
+            if table is None:
+                return
+            yield table
+
+    async def _records_by_tree(
+        self, nodes: list[TableNode], first: int
+    ) -> list[list[ExtractorRecord] | None]:
+        """处理顶层表格及其嵌套表格，结果按先序排列，嵌套表格的结果关联到宿主单元格"""
+        all_records = await self._records_by_nodes(nodes)
+        for records, (parent_table, host_cell_key) in zip(
+            all_records, _host_links(nodes, first)
+        ):
+            for record in records or ():
+                record.parent_table = parent_table
+                record.host_cell_key = host_cell_key
+        return all_records
+
+    async def _entries_by_tree(
+        self,
+        nodes: list[TableNode],
+        first: int,
+        reusable: dict[str, list[ExtractorResult]],
+    ) -> list[ManifestEntry]:
+        """
+        处理顶层表格及其嵌套表格中内容有变化的表格，其余直接复用旧结果
+        复用的结果按表格当前的位置重新关联宿主单元格
+        """
+        hashes = [table_content_hash(node.element) for node in nodes]
+        changed = [
+            node
+            for node, content_hash in zip(nodes, hashes)
+            if content_hash not in reusable
+        ]
+        records = iter(await self._records_by_nodes(changed))
+
+        entries = []
+        for content_hash, link in zip(hashes, _host_links(nodes, first)):
+            if content_hash in reusable:
+                count("manifest_reused")
+                entry = ManifestEntry(
+                    content_hash=content_hash,
+                    results=_relink(reusable[content_hash], *link),
+                    reused=True,
+                )
+            else:
+                entry = ManifestEntry(
+                    content_hash=content_hash,
+                    results=_relink(_to_models(next(records)), *link),
+                )
+            entries.append(entry)
+        return entries
+
+    async def _records_by_nodes(
+        self, nodes: list[TableNode]
+    ) -> list[list[ExtractorRecord] | None]:
+        """并发分割多个表格，再依次拆分与提取"""
+        if not nodes:
+            return []
+        with span("parse"):
+            grids = [node.grid for node in nodes]
+        for grid in grids:
+            _count_grid(grid)
+        segmentations = await self.segmenter.segment_many(
+            [node.element for node in nodes], grids
+        )
+        return [
+            self._split_and_extract(node.element, node.grid, segmentation.metas)
+            for node, segmentation in zip(nodes, segmentations)
+        ]
+
+    async def _records_by_table(
+        self, table_xml: bytes | str | _Element
+    ) -> list[ExtractorRecord] | None:
+        table, grid = self._parse_table(table_xml)
+        segmentation = await self.segmenter.segment(table, grid)
+        return self._split_and_extract(table, grid, segmentation.metas)
+
+    def _parse_table(
+        self, table_xml: bytes | str | _Element
+    ) -> tuple[_Element, TableGrid]:
+        """解析表格并构建网格，同时计入表格、行、单元格数"""
+        with span("parse"):
+            table = self._to_element(table_xml)
+            grid = TableGrid(table)
+        _count_grid(grid)
+        return table, grid
+
+    def _build_tree(self, table: _Element) -> TableNode:
+        with span("parse"):
+            return build_table_tree(table)
+
+    def _to_element(self, table_xml: bytes | str | _Element) -> _Element:
+        if isinstance(table_xml, _Element):
+            return table_xml
         # table_xml 本身就是 w:tbl 元素，不需要再查找
-        table = etree.fromstring(table_xml)
-        # 解析表格 并生成ai提示
-        vlmap.parse_and_tip()
-        # 访问ai 拿到分割结果 假设是json字符串
-        ai_result = self.demo_spit_result
-
-        trs = table.findall(".//w:tr", WORD_NAMESPACES)
-        map_verifier = MapVerifier(verifier_meta=ai_result, trs=trs)
-        error_infos = map_verifier.verify()
-        if error_infos:
+        return etree.fromstring(table_xml)
+
+    def _split_and_extract(
+        self, table: _Element, grid: TableGrid, metas: list[VerifierMeta] | None
+    ) -> list[ExtractorRecord] | None:
+        """按已通过验证的分割结果拆分表格并提取信息"""
+        if metas is None:
             return None
-        else:
-            table_splitter = TableSplitter(tblElement=table, verifier_meta=ai_result)
-            split_results = table_splitter.split()
+        table_splitter = TableSplitter(tblElement=table, verifier_meta=metas, grid=grid)
+        # split 内部已经执行过 SplitVerifier
+        split_results = table_splitter.split()
+        extractor = Extractor(table_split_results=split_results)
+        return extractor.extract_records()
+
+    @classmethod
+    def process_many(
+        cls,
+        paths: Iterable[str | os.PathLike],
+        demo_spit_result_str: str | None = None,
+        workers: int | None = None,
+        ordered: bool = True,
+        max_pending: int | None = None,
+        segmenter_factory: SegmenterFactory | None = None,
+    ) -> Iterator[BatchResult]:
+        """
+        使用进程池批量处理多个文档
+
+        单个文档失败只会体现在对应的 BatchResult 上，不会中断整个批次。
+        结果以 JSON 字节跨进程传递，需要模型对象时调用 BatchResult.results()
+
+        Args:
+            paths: 文档路径
+            demo_spit_result_str: 固定的分割结果 json 字符串，未提供 segmenter_factory 时使用
+            workers: 进程数，默认为 CPU 核数
+            ordered: True 按提交顺序返回，False 按完成顺序返回
+            max_pending: 同时在途的文档数上限，默认为 workers 的两倍
+            segmenter_factory: 创建分割调度器的函数，每个子进程启动时调用一次，
+                同一进程处理的文档共用一个调度器（及其缓存与模板索引）
+
+        Yields:
+            每个文档的处理结果
+        """
+        if demo_spit_result_str is None and segmenter_factory is None:
+            raise ValueError(
+                "demo_spit_result_str 与 segmenter_factory 至少需要提供一个"
+            )
+        workers = workers or os.cpu_count() or 1
+        max_pending = max_pending or workers * 2
+        jobs = enumerate(os.fspath(path) for path in paths)
+
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_worker,
+            initargs=(segmenter_factory,),
+        ) as pool:
+
+            def submit_next() -> tuple[Future, int, str] | None:
+                job = next(jobs, None)
+                if job is None:
+                    return None
+                index, path = job
+                future = pool.submit(
+                    _process_document, index, path, demo_spit_result_str
+                )
+                return future, index, path
+
+            if ordered:
+                queue: deque[tuple[Future, int, str]] = deque()
+                while len(queue) < max_pending and (job := submit_next()):
+                    queue.append(job)
+                while queue:
+                    yield _collect_result(*queue.popleft())
+                    if job := submit_next():
+                        queue.append(job)
+            else:
+                pending: dict[Future, tuple[int, str]] = {}
+                while len(pending) < max_pending and (job := submit_next()):
+                    pending[job[0]] = job[1:]
+                while pending:
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        yield _collect_result(future, *pending.pop(future))
+                        if job := submit_next():
+                            pending[job[0]] = job[1:]
+
+
+async def _wait(task: "asyncio.Task[T]") -> T:
+    """Runner.run 只接受协程，包装已创建的任务"""
+    return await task
+
+
+def _host_links(
+    nodes: list[TableNode], first: int
+) -> list[tuple[int | None, str | None]]:
+    """
+    每个表格的 (外层表格序号, 宿主单元格 key)，顶层表格为 (None, None)
+
+    Args:
+        nodes: 顶层表格及其嵌套表格，先序排列
+        first: nodes[0] 在文档中的序号
+    """
+    positions = {node: first + idx for idx, node in enumerate(nodes)}
+    return [
+        (None, None) if node.parent is None else (positions[node.parent], node.host_key)
+        for node in nodes
+    ]
+
+
+def _relink(
+    results: list[ExtractorResult] | None,
+    parent_table: int | None,
+    host_cell_key: str | None,
+) -> list[ExtractorResult] | None:
+    """把提取结果关联到宿主单元格，关联已经一致时原样返回"""
+    if results is None or all(
+        result.parent_table == parent_table and result.host_cell_key == host_cell_key
+        for result in results
+    ):
+        return results
+    update = {"parent_table": parent_table, "host_cell_key": host_cell_key}
+    return [result.model_copy(update=update) for result in results]
+
+
+def _count_grid(grid: TableGrid) -> None:
+    count("tables")
+    count("rows", grid.row_count)
+    count("cells", grid.cell_count)
+
+
+def _to_models(
+    records: list[ExtractorRecord] | None,
+) -> list[ExtractorResult] | None:
+    """内部记录转换为对外的 pydantic 模型"""
+    if records is None:
+        return None
+    return [record.to_model() for record in records]
+
+
+# 子进程中由 segmenter_factory 创建的分割调度器
+_worker_segmenter: Segmenter | None = None
+
+
+def _init_worker(segmenter_factory: SegmenterFactory | None) -> None:
+    """子进程启动时创建分割调度器"""
+    global _worker_segmenter
+    _worker_segmenter = segmenter_factory() if segmenter_factory else None
+
+
+def _process_document(
+    index: int, path: str, demo_spit_result_str: str | None
+) -> tuple[int, bool, bytes | str]:
+    """
+    进程池中处理单个文档
+
+    Returns:
+        (文档序号, 是否成功, 成功时为 JSON 编码的结果，失败时为异常堆栈)
+    """
+    try:
+        core = Core(path, demo_spit_result_str, segmenter=_worker_segmenter)
+        results = list(core.start_all_by_stream())
+        return index, True, DOCUMENT_RESULTS_ADAPTER.dump_json(results)
+    except Exception:
+        return index, False, traceback.format_exc()
 
-            split_results = SplitVerifier(
-                table_split_result=split_results
-            ).verify_and_fix()
-            extractor = Extractor(table_split_results=split_results)
 
-            return extractor.extract()
+def _collect_result(future: Future, index: int, path: str) -> BatchResult:
+    """把进程池返回值转换为 BatchResult，进程池本身的异常也记录到对应文档上"""
+    try:
+        _, ok, payload = future.result()
+    except Exception as e:
+        return BatchResult(index=index, path=path, ok=False, error=repr(e))
+    if ok:
+        # 子进程中的指标不会回传，序列化字节数在主进程计入
+        count("serialized_bytes", len(payload))
+        return BatchResult(index=index, path=path, ok=True, payload=payload)
+    return BatchResult(index=index, path=path, ok=False, error=payload)
 
 
 __all__ = ["Core"]
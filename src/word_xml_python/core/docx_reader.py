@@ -0,0 +1,95 @@
+"""Word 文档读取
+
+直接从 .docx 压缩包中以流的方式读取 word/document.xml，并通过 iterparse
+逐个产出顶层 w:tbl 元素，避免把整个文档解压到磁盘或一次性加载到内存。
+"""
+
+import zipfile
+from contextlib import contextmanager
+from os import PathLike
+from typing import IO, Iterator
+
+from lxml import etree
+from lxml.etree import _Element
+
+from .query import W_P, W_TBL
+
+# docx 压缩包中正文 XML 的路径
+DOCUMENT_XML_PATH = "word/document.xml"
+
+DocumentSource = str | PathLike | IO[bytes]
+
+
+@contextmanager
+def open_document_xml(source: DocumentSource) -> Iterator[IO[bytes]]:
+    """
+    打开文档正文 XML 的二进制流
+
+    Args:
+        source: .docx 文件路径/文件对象，或已解压的 document.xml 路径/文件对象
+
+    Yields:
+        document.xml 的二进制流（docx 时为压缩包成员流，不会解压到磁盘）
+    """
+    if zipfile.is_zipfile(source):
+        with zipfile.ZipFile(source) as package:
+            with package.open(DOCUMENT_XML_PATH) as stream:
+                yield stream
+    elif hasattr(source, "read"):
+        source.seek(0)
+        yield source
+    else:
+        with open(source, "rb") as stream:
+            yield stream
+
+
+def iter_tables(source: DocumentSource) -> Iterator[_Element]:
+    """
+    逐个产出文档中的顶层表格元素
+
+    解析过程中会清理已经处理过的节点，峰值内存只取决于最大的那个表格，
+    与文档大小无关。因此产出的元素只在下一次迭代前有效，需要保留时请自行
+    deepcopy。嵌套在单元格中的表格随其外层表格一起产出，
+    需要分别处理时使用 table_tree.build_table_tree。
+
+    Args:
+        source: .docx 文件路径/文件对象，或 document.xml 路径/文件对象
+
+    Yields:
+        顶层 w:tbl 元素
+    """
+    with open_document_xml(source) as stream:
+        depth = 0
+        for event, element in etree.iterparse(
+            stream, events=("start", "end"), tag=(W_TBL, W_P)
+        ):
+            if element.tag == W_P:
+                # 表格之外的段落处理完即可丢弃
+                if event == "end" and depth == 0:
+                    _release(element)
+                continue
+
+            if event == "start":
+                depth += 1
+                continue
+
+            depth -= 1
+            if depth == 0:
+                yield element
+                _release(element)
+
+
+def _release(element: _Element) -> None:
+    """释放已处理的元素以及它在各级父节点中之前的兄弟节点"""
+    element.clear(keep_tail=True)
+    node = element
+    while node is not None:
+        parent = node.getparent()
+        if parent is None:
+            break
+        while node.getprevious() is not None:
+            del parent[0]
+        node = parent
+
+
+__all__ = ["DOCUMENT_XML_PATH", "open_document_xml", "iter_tables"]
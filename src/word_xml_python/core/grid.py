@@ -0,0 +1,184 @@
+"""表格网格
+
+一次遍历解析出表格的完整几何信息，供 Vlmap、MapVerifier、TableSplitter、
+CellExtractor 等模块共用，避免各模块重复 findall 与逐个单元格查找
+gridSpan/vMerge。
+
+单元格按文档顺序编号（cell id），每个单元格的属性保存在按 id 索引的列表中；
+occupancy 是 行 x 网格列 的整数矩阵，记录每个网格位置被哪个单元格占据。
+
+嵌套在单元格中的表格不属于当前网格：它的行、单元格与文本都不计入，
+只在 nested_tables 中记录所在的单元格，由 table_tree 作为独立表格处理。
+"""
+
+from lxml.etree import _Element
+import numpy as np
+
+from .query import (
+    W_GRID_SPAN,
+    W_T,
+    W_TBL,
+    W_TC,
+    W_TC_PR,
+    W_TR,
+    W_V_MERGE,
+    W_VAL,
+    child,
+    own_descendants,
+)
+
+# vMerge 状态
+V_MERGE_NONE = 0
+V_MERGE_RESTART = 1
+V_MERGE_CONTINUE = 2
+
+
+class TableGrid:
+    """
+    表格网格
+
+    行合并按 Word 的语义解析：vMerge="restart" 的单元格向下延伸，直到某一行在
+    同一起始列上不再是 vMerge="continue" 的单元格为止。
+    """
+
+    rows: list[_Element]  # w:tr 元素
+    cells: list[_Element]  # w:tc 元素，下标即 cell id
+    row_start: list[int]  # 每行第一个单元格的 id，长度为行数+1
+    cell_row: list[int]  # 单元格所在行
+    cell_col: list[int]  # 单元格起始网格列
+    col_span: list[int]  # 列合并数
+    row_span: list[int]  # 行合并数，仅 restart 单元格可能大于 1
+    v_merge: list[int]  # vMerge 状态
+    merge_root: list[int]  # continue 单元格对应的 restart 单元格 id，其余为自身
+    text: list[str]  # 单元格内所有 w:t 的文本，不含嵌套表格
+    has_text: list[bool]  # 单元格内是否存在 w:t
+    nested_tables: dict[int, list[_Element]]  # cell id -> 单元格内的直接嵌套表格
+    col_count: int  # 网格列数
+    occupancy: np.ndarray  # 行 x 网格列，值为占据该位置的 cell id，空位为 -1
+
+    def __init__(
+        self, table: _Element | None = None, rows: list[_Element] | None = None
+    ):
+        """
+        Args:
+            table: w:tbl 元素
+            rows: 已经取出的 w:tr 元素列表，提供时不再从 table 中查找
+        """
+        if rows is None:
+            if table is None:
+                raise ValueError("table 与 rows 至少需要提供一个")
+            rows = own_descendants(table, W_TR)
+
+        self.rows = rows
+        self.cells = []
+        self.row_start = []
+        self.cell_row = []
+        self.cell_col = []
+        self.col_span = []
+        self.row_span = []
+        self.v_merge = []
+        self.merge_root = []
+        self.text = []
+        self.has_text = []
+        self.nested_tables = {}
+
+        # 每个网格列上尚未结束的 restart 单元格
+        open_merges: dict[int, int] = {}
+        col_count = 0
+
+        for row_idx, tr in enumerate(rows):
+            self.row_start.append(len(self.cells))
+            next_open_merges: dict[int, int] = {}
+            col_idx = 0
+
+            for tc in own_descendants(tr, W_TC):
+                cell_id = len(self.cells)
+                col_span, v_merge = self._read_tc_pr(tc)
+                merge_root = cell_id
+
+                if v_merge == V_MERGE_RESTART:
+                    next_open_merges[col_idx] = cell_id
+                elif v_merge == V_MERGE_CONTINUE and col_idx in open_merges:
+                    merge_root = open_merges[col_idx]
+                    self.row_span[merge_root] += 1
+                    next_open_merges[col_idx] = merge_root
+
+                texts = []
+                for node in own_descendants(tc, W_T, W_TBL):
+                    if node.tag == W_T:
+                        texts.append(node.text or "")
+                    else:
+                        self.nested_tables.setdefault(cell_id, []).append(node)
+
+                self.cells.append(tc)
+                self.cell_row.append(row_idx)
+                self.cell_col.append(col_idx)
+                self.col_span.append(col_span)
+                self.row_span.append(1)
+                self.v_merge.append(v_merge)
+                self.merge_root.append(merge_root)
+                self.text.append("".join(texts))
+                self.has_text.append(len(texts) > 0)
+                col_idx += col_span
+
+            open_merges = next_open_merges
+            col_count = max(col_count, col_idx)
+
+        self.row_start.append(len(self.cells))
+        self.col_count = col_count
+        self.occupancy = np.full((len(rows), col_count), -1, dtype=np.int32)
+        for cell_id, (row_idx, col_idx, col_span) in enumerate(
+            zip(self.cell_row, self.cell_col, self.col_span)
+        ):
+            self.occupancy[row_idx, col_idx : col_idx + col_span] = cell_id
+
+    @property
+    def row_count(self) -> int:
+        return len(self.rows)
+
+    @property
+    def cell_count(self) -> int:
+        return len(self.cells)
+
+    def row_cells(self, row_idx: int) -> range:
+        """某一行所有单元格的 id"""
+        return range(self.row_start[row_idx], self.row_start[row_idx + 1])
+
+    def row_cell_count(self, row_idx: int) -> int:
+        """某一行的 w:tc 数量"""
+        return self.row_start[row_idx + 1] - self.row_start[row_idx]
+
+    def row_has_text(self, row_idx: int) -> bool:
+        """某一行是否有单元格包含 w:t"""
+        return any(self.has_text[cell_id] for cell_id in self.row_cells(row_idx))
+
+    @staticmethod
+    def _read_tc_pr(tc: _Element) -> tuple[int, int]:
+        """读取单元格的列合并数与 vMerge 状态"""
+        tc_pr = child(tc, W_TC_PR)
+        if tc_pr is None:
+            return 1, V_MERGE_NONE
+
+        col_span = 1
+        grid_span = child(tc_pr, W_GRID_SPAN)
+        if grid_span is not None:
+            col_span = int(grid_span.get(W_VAL, "1"))
+
+        v_merge = V_MERGE_NONE
+        v_merge_element = child(tc_pr, W_V_MERGE)
+        if v_merge_element is not None:
+            val = v_merge_element.get(W_VAL, "continue")
+            if val == "restart":
+                v_merge = V_MERGE_RESTART
+            elif val == "continue":
+                v_merge = V_MERGE_CONTINUE
+
+        return col_span, v_merge
+
+
+__all__ = [
+    "TableGrid",
+    "V_MERGE_NONE",
+    "V_MERGE_RESTART",
+    "V_MERGE_CONTINUE",
+]
@@ -0,0 +1,26 @@
+"""表格内容哈希
+
+增量处理时用于判断表格是否变化。哈希基于表格的完整 XML（包括样式与嵌套表格），
+任何会影响提取结果的修改都会改变哈希；嵌套表格变化时外层表格也会重新处理。
+XML 先按 Exclusive C14N 规范化，只保留用到的命名空间声明，
+文档中的原元素、deepcopy 的副本与重新解析的字符串得到相同的哈希。
+"""
+
+import hashlib
+
+from lxml import etree
+from lxml.etree import _Element
+
+
+def table_content_hash(table: _Element) -> str:
+    """
+    计算表格内容哈希
+
+    Returns:
+        sha256 十六进制字符串
+    """
+    canonical = etree.tostring(table, method="c14n", exclusive=True)
+    return hashlib.sha256(canonical).hexdigest()
+
+
+__all__ = ["table_content_hash"]
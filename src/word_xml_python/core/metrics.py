@@ -0,0 +1,256 @@
+"""运行指标
+
+Core 各阶段的耗时与计数通过可替换的 sink 上报。默认的 NullSink 不记录任何数据，
+span/count 在禁用时只做一次属性判断；需要指标时用 set_sink 换成 InMemorySink，
+再由 render_prometheus 输出 Prometheus 文本格式。
+
+阶段（stage 标签）：
+    parse, vlmap_render, ai_wait, verify, rules, repair, split, split_verify, extract
+计数：
+    tables, rows, cells, verification_failures, client_errors, serialized_bytes,
+    manifest_reused
+
+阶段指标只在运行 Core 的进程中产生，即调用 Core 处理文档的脚本或批处理程序。
+API 服务不运行 Core，/metrics 只包含 HTTP 请求与数据库查询的指标：
+    http_request_duration_seconds, http_requests, db_query_seconds, db_retries
+"""
+
+import threading
+import time
+from bisect import bisect_left
+from contextlib import nullcontext
+
+# 指标名前缀
+METRIC_PREFIX = "word_xml"
+
+# 阶段耗时直方图
+STAGE_SECONDS = "stage_seconds"
+
+# 默认直方图分桶（秒）
+DEFAULT_BUCKETS = (
+    0.001,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+    60.0,
+)
+
+METRIC_HELP = {
+    STAGE_SECONDS: "Core 各阶段耗时",
+    "tables": "处理的表格数",
+    "rows": "处理的表格行数",
+    "cells": "处理的单元格数",
+    "verification_failures": "分割结果未通过 MapVerifier 验证的次数",
+    "client_errors": "失败的模型调用次数",
+    "serialized_bytes": "序列化输出的字节数",
+    "manifest_reused": "增量处理时直接复用旧结果的表格数",
+    "http_request_duration_seconds": "HTTP 请求耗时",
+    "http_requests": "HTTP 请求数",
+    "db_query_seconds": "数据库事务耗时，包括等待连接的时间",
+    "db_retries": "连接错误后换连接重试的次数",
+}
+
+Labels = tuple[tuple[str, str], ...]
+
+
+class MetricsSink:
+    """指标 sink 基类，默认实现不记录任何数据"""
+
+    enabled: bool = False
+
+    def observe(self, name: str, value: float, labels: Labels = ()) -> None:
+        """记录一次直方图观测值"""
+
+    def increment(self, name: str, value: float = 1, labels: Labels = ()) -> None:
+        """累加计数"""
+
+
+class NullSink(MetricsSink):
+    """禁用指标时使用的 sink"""
+
+
+class _Histogram:
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets: tuple[float, ...]):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class InMemorySink(MetricsSink):
+    """在内存中聚合指标，可输出 Prometheus 文本格式"""
+
+    enabled = True
+
+    def __init__(self, buckets: tuple[float, ...] = DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self._histograms: dict[str, dict[Labels, _Histogram]] = {}
+        self._counters: dict[str, dict[Labels, float]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, name: str, value: float, labels: Labels = ()) -> None:
+        with self._lock:
+            series = self._histograms.setdefault(name, {})
+            histogram = series.get(labels)
+            if histogram is None:
+                histogram = series[labels] = _Histogram(self.buckets)
+            histogram.observe(value)
+
+    def increment(self, name: str, value: float = 1, labels: Labels = ()) -> None:
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[labels] = series.get(labels, 0) + value
+
+    def counter(self, name: str, labels: Labels = ()) -> float:
+        """当前计数值"""
+        with self._lock:
+            return self._counters.get(name, {}).get(labels, 0)
+
+    def histogram(self, name: str, labels: Labels = ()) -> tuple[int, float]:
+        """直方图的 (观测次数, 总和)"""
+        with self._lock:
+            histogram = self._histograms.get(name, {}).get(labels)
+            if histogram is None:
+                return 0, 0.0
+            return histogram.count, histogram.sum
+
+    def reset(self) -> None:
+        with self._lock:
+            self._histograms.clear()
+            self._counters.clear()
+
+    def render_prometheus(self, prefix: str = METRIC_PREFIX) -> str:
+        """输出 Prometheus 文本格式（0.0.4）"""
+        lines: list[str] = []
+        with self._lock:
+            for name, series in sorted(self._counters.items()):
+                full_name = f"{prefix}_{name}_total"
+                _write_header(lines, full_name, name, "counter")
+                for labels, value in sorted(series.items()):
+                    lines.append(f"{full_name}{_format_labels(labels)} {_num(value)}")
+
+            for name, series in sorted(self._histograms.items()):
+                full_name = f"{prefix}_{name}"
+                _write_header(lines, full_name, name, "histogram")
+                for labels, histogram in sorted(series.items()):
+                    cumulative = 0
+                    for bound, count in zip(
+                        (*histogram.buckets, float("inf")), histogram.counts
+                    ):
+                        cumulative += count
+                        le = "+Inf" if bound == float("inf") else _num(bound)
+                        bucket_labels = _format_labels((*labels, ("le", le)))
+                        lines.append(f"{full_name}_bucket{bucket_labels} {cumulative}")
+                    label_text = _format_labels(labels)
+                    lines.append(f"{full_name}_sum{label_text} {_num(histogram.sum)}")
+                    lines.append(f"{full_name}_count{label_text} {histogram.count}")
+        return "\n".join(lines) + "\n" if lines else ""
+
+
+def _write_header(lines: list[str], full_name: str, name: str, kind: str) -> None:
+    if name in METRIC_HELP:
+        lines.append(f"# HELP {full_name} {METRIC_HELP[name]}")
+    lines.append(f"# TYPE {full_name} {kind}")
+
+
+def _format_labels(labels: Labels) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels) + "}"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _num(value: float) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Span:
+    """记录一个阶段耗时的上下文管理器"""
+
+    __slots__ = ("sink", "labels", "started")
+
+    def __init__(self, sink: MetricsSink, stage: str):
+        self.sink = sink
+        self.labels = (("stage", stage),)
+
+    def __enter__(self) -> "_Span":
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.sink.observe(
+            STAGE_SECONDS, time.perf_counter() - self.started, self.labels
+        )
+
+
+_NULL_SPAN = nullcontext()
+_sink: MetricsSink = NullSink()
+
+
+def set_sink(sink: MetricsSink | None) -> MetricsSink:
+    """
+    替换全局 sink，传入 None 时恢复为 NullSink
+
+    Returns:
+        之前的 sink
+    """
+    global _sink
+    previous = _sink
+    _sink = sink if sink is not None else NullSink()
+    return previous
+
+
+def get_sink() -> MetricsSink:
+    return _sink
+
+
+def span(stage: str):
+    """
+    记录一个阶段的耗时
+
+    with span("verify"):
+        ...
+    """
+    sink = _sink
+    if not sink.enabled:
+        return _NULL_SPAN
+    return _Span(sink, stage)
+
+
+def count(name: str, value: float = 1) -> None:
+    """累加计数，禁用时不做任何事"""
+    sink = _sink
+    if sink.enabled:
+        sink.increment(name, value)
+
+
+__all__ = [
+    "MetricsSink",
+    "NullSink",
+    "InMemorySink",
+    "set_sink",
+    "get_sink",
+    "span",
+    "count",
+    "STAGE_SECONDS",
+    "METRIC_PREFIX",
+]
@@ -0,0 +1,89 @@
+"""表格树
+
+嵌套在单元格中的表格作为独立的处理单元：每个表格只解析自己的行与单元格，
+内层表格通过 parent 与 host_cell 关联到外层表格的宿主单元格。
+同一棵树中的各个表格互不依赖，可以并发进行 AI 分割。
+
+构建树时只查找嵌套表格，网格在第一次访问时才构建，
+增量处理中内容没有变化的表格不需要解析网格。
+"""
+
+from typing import Iterator
+
+from lxml.etree import _Element
+
+from .grid import TableGrid
+from .query import W_TBL, own_descendants
+
+
+class TableNode:
+    """表格树中的一个表格"""
+
+    __slots__ = ("element", "parent", "depth", "children", "_grid")
+
+    element: _Element  # w:tbl 元素
+    parent: "TableNode | None"  # 外层表格，顶层表格为 None
+    depth: int  # 嵌套层数，顶层表格为 0
+    children: list["TableNode"]  # 按文档顺序排列的内层表格
+
+    def __init__(self, element: _Element, parent: "TableNode | None" = None):
+        self.element = element
+        self.parent = parent
+        self.depth = 0 if parent is None else parent.depth + 1
+        self.children = []
+        self._grid = None
+
+    @property
+    def grid(self) -> TableGrid:
+        """只包含本表格的网格"""
+        if self._grid is None:
+            self._grid = TableGrid(self.element)
+        return self._grid
+
+    @property
+    def host_cell(self) -> int | None:
+        """宿主单元格在外层网格中的 cell id"""
+        if self.parent is None:
+            return None
+        for cell_id, tables in self.parent.grid.nested_tables.items():
+            if any(table is self.element for table in tables):
+                return cell_id
+        return None
+
+    @property
+    def host_key(self) -> str | None:
+        """宿主单元格的 key，与 CellInfo.key 的格式（行号-单元格序号）一致"""
+        host_cell = self.host_cell
+        if host_cell is None:
+            return None
+        grid = self.parent.grid
+        row_idx = grid.cell_row[host_cell]
+        return f"{row_idx}-{host_cell - grid.row_start[row_idx]}"
+
+    def walk(self) -> Iterator["TableNode"]:
+        """先序遍历，顺序与表格在文档中出现的顺序一致"""
+        stack = [self]
+        while stack:
+            node = stack.pop()
+            yield node
+            stack.extend(reversed(node.children))
+
+
+def build_table_tree(table: _Element) -> TableNode:
+    """
+    从顶层表格构建表格树
+
+    每一层只查找直接嵌套的 w:tbl，不解析网格
+    """
+    root = TableNode(table)
+    pending = [root]
+    while pending:
+        node = pending.pop()
+        for element in own_descendants(node.element, W_TBL):
+            nested = TableNode(element, parent=node)
+            node.children.append(nested)
+            pending.append(nested)
+    return root
+
+
+__all__ = ["TableNode", "build_table_tree"]
@@ -0,0 +1,10 @@
+"""数据导出模块"""
+
+from .ndjson import GRANULARITY_CELL, GRANULARITY_REGION, iter_ndjson, write_ndjson
+
+__all__ = [
+    "iter_ndjson",
+    "write_ndjson",
+    "GRANULARITY_REGION",
+    "GRANULARITY_CELL",
+]
@@ -0,0 +1,119 @@
+"""NDJSON 流式导出
+
+把逐个表格产出的提取结果转换为每行一个 JSON 对象的文本，
+每条记录单独序列化，不需要先把整个文档的结果转换为 dict。
+"""
+
+import json
+from typing import IO, Iterable, Iterator
+
+from pydantic import BaseModel
+
+from ..core.metrics import MetricsSink, get_sink
+from ..models import ExtractorResult
+from ..models.records import CellRecord, ExtractorRecord
+
+# 与 model_dump_json 输出相同的格式
+_JSON_SEPARATORS = (",", ":")
+
+GRANULARITY_REGION = "region"  # 每个区域一行
+GRANULARITY_CELL = "cell"  # 每个单元格一行
+
+
+def _dump_json(item: BaseModel | ExtractorRecord | CellRecord) -> str:
+    if isinstance(item, BaseModel):
+        return item.model_dump_json()
+    return json.dumps(item.to_dict(), ensure_ascii=False, separators=_JSON_SEPARATORS)
+
+
+def iter_ndjson(
+    results: Iterable[list[ExtractorResult | ExtractorRecord] | None],
+    granularity: str = GRANULARITY_REGION,
+) -> Iterator[str]:
+    """
+    逐条产出 NDJSON 记录
+
+    每条记录包含 table（表格序号）与 region（区域序号），分割失败的表格
+    产出一条 {"table": n, "region": null, "ok": false}。
+    按区域输出时记录中的 result 为完整的 ExtractorResult；
+    按单元格输出时记录中包含 table_type 与 cell，嵌套表格的记录还包含
+    parent_table（外层表格序号）与 host_cell_key（宿主单元格位置）。
+
+    Args:
+        results: 每个表格的提取结果或内部记录，通常为 Core.start_records_by_stream()
+        granularity: region | cell
+
+    Returns:
+        逐条产出以换行结尾的 JSON 文本的迭代器
+
+    Raises:
+        ValueError: 不支持的输出粒度，调用时立即抛出，不会等到开始迭代
+    """
+    if granularity not in (GRANULARITY_REGION, GRANULARITY_CELL):
+        raise ValueError(f"不支持的输出粒度: {granularity}")
+
+    lines = _iter_lines(results, granularity)
+    sink = get_sink()
+    if not sink.enabled:
+        return lines
+    return _count_bytes(lines, sink)
+
+
+def _count_bytes(lines: Iterator[str], sink: MetricsSink) -> Iterator[str]:
+    for line in lines:
+        sink.increment("serialized_bytes", len(line.encode()))
+        yield line
+
+
+def _iter_lines(
+    results: Iterable[list[ExtractorResult | ExtractorRecord] | None],
+    granularity: str,
+) -> Iterator[str]:
+    for table_idx, table_results in enumerate(results):
+        if table_results is None:
+            yield f'{{"table":{table_idx},"region":null,"ok":false}}\n'
+            continue
+
+        for region_idx, result in enumerate(table_results):
+            prefix = f'{{"table":{table_idx},"region":{region_idx},'
+            if granularity == GRANULARITY_REGION:
+                yield f'{prefix}"result":{_dump_json(result)}}}\n'
+                continue
+
+            if result.parent_table is not None:
+                host_cell_key = json.dumps(result.host_cell_key, ensure_ascii=False)
+                prefix += (
+                    f'"parent_table":{result.parent_table},'
+                    f'"host_cell_key":{host_cell_key},'
+                )
+            table_type = json.dumps(result.table_type, ensure_ascii=False)
+            for cell in result.cell_info_list:
+                yield (
+                    f'{prefix}"table_type":{table_type},"cell":{_dump_json(cell)}}}\n'
+                )
+
+
+def write_ndjson(
+    results: Iterable[list[ExtractorResult | ExtractorRecord] | None],
+    fp: IO[str],
+    granularity: str = GRANULARITY_REGION,
+) -> int:
+    """
+    把提取结果写入文本文件对象
+
+    Returns:
+        写入的记录数
+    """
+    count = 0
+    for line in iter_ndjson(results, granularity):
+        fp.write(line)
+        count += 1
+    return count
+
+
+__all__ = [
+    "iter_ndjson",
+    "write_ndjson",
+    "GRANULARITY_REGION",
+    "GRANULARITY_CELL",
+]
@@ -3,46 +3,86 @@
 from typing import Dict, List
 from lxml.etree import _Element
 
-from ..models import CellInfo, CellPBody, CellRBody
-from ..core import TCPR_DELETE_TAGS
-from ..core.constants import WORD_NAMESPACES, WORD_NS_URI
+from ..models import CellInfo
+from ..models.records import CellRecord, ParagraphRecord, RunRecord
+from ..core.query import (
+    TCPR_DELETE_QNAMES,
+    W_B,
+    W_COLOR,
+    W_I,
+    W_P,
+    W_R,
+    W_R_PR,
+    W_T,
+    W_TC_PR,
+    W_VAL,
+    XP_P_JC,
+    XP_R_COLOR,
+    child,
+    first,
+)
+from ..core.grid import TableGrid, V_MERGE_CONTINUE, V_MERGE_RESTART
+
+# 段落 rPr 中提取的样式：(标签, 样式名, 缺省值)
+_P_STYLE_TAGS = (
+    (W_COLOR, "color", "black"),
+    (W_B, "bold", "false"),
+    (W_I, "italic", "false"),
+)
 
 
 class CellExtractor:
-    """单元格信息提取器"""
+    """
+    单元格信息提取器
+    提取过程只创建不做校验的内部记录，需要 pydantic 模型时再转换
+    """
 
     def __init__(self):
         """初始化提取器"""
-        self.row_span_map: Dict[int, CellInfo] = {}
-        self.cell_info_map: Dict[str, CellInfo] = {}
+        self.cell_info_map: Dict[str, CellRecord] = {}
 
-    def extract_all(self, table_element: _Element) -> List[CellInfo]:
+    def extract_all(
+        self, table_element: _Element, grid: TableGrid | None = None
+    ) -> List[CellInfo]:
         """
         从表格元素中提取所有单元格信息
 
         Args:
             table_element: 表格XML元素
+            grid: 已解析的表格网格，不提供时由 table_element 构建
 
         Returns:
             单元格信息列表
         """
-        cell_info_list: List[CellInfo] = []
-        self.row_span_map = {}
-        self.cell_info_map = {}
+        return [
+            cell_record.to_model()
+            for cell_record in self.extract_records(table_element, grid)
+        ]
+
+    def extract_records(
+        self, table_element: _Element, grid: TableGrid | None = None
+    ) -> List[CellRecord]:
+        """
+        从表格元素中提取所有单元格的内部记录
 
-        rows = table_element.findall(".//w:tr", WORD_NAMESPACES)
+        Args:
+            table_element: 表格XML元素
+            grid: 已解析的表格网格，不提供时由 table_element 构建
 
-        for row_index, row in enumerate(rows):
-            cells = row.findall(".//w:tc", WORD_NAMESPACES)
-            actual_col_index = 0
+        Returns:
+            单元格记录列表
+        """
+        cell_info_list: List[CellRecord] = []
+        self.cell_info_map = {}
 
-            for cell_index, cell in enumerate(cells):
-                cell_info = self._extract_cell(
-                    cell, row_index, cell_index, actual_col_index
-                )
+        if grid is None:
+            grid = TableGrid(table_element)
+
+        for row_index in range(grid.row_count):
+            for cell_index, cell_id in enumerate(grid.row_cells(row_index)):
+                cell_info = self._extract_cell(grid, cell_id, row_index, cell_index)
                 self.cell_info_map[cell_info.key] = cell_info
                 cell_info_list.append(cell_info)
-                actual_col_index += cell_info.col_span
 
         for cell_info in cell_info_list:
             self._fill_adjoining_text_body(cell_info)
@@ -51,40 +91,41 @@ class CellExtractor:
 
     def _extract_cell(
         self,
-        cell_element: _Element,
+        grid: TableGrid,
+        cell_id: int,
         row_index: int,
         cell_index: int,
-        actual_col_index: int,
-    ) -> CellInfo:
+    ) -> CellRecord:
         """
         提取单个单元格信息
 
         Args:
-            cell_element: 单元格XML元素
+            grid: 表格网格
+            cell_id: 单元格在网格中的 id
             row_index: 行索引
             cell_index: tc元素索引
-            actual_col_index: 实际列位置
 
         Returns:
-            单元格信息对象
+            单元格记录
         """
         key = f"{row_index}-{cell_index}"
+        cell_element = grid.cells[cell_id]
 
         # 获取单元格属性
-        tc_pr = cell_element.find("./w:tcPr", WORD_NAMESPACES)
+        tc_pr = child(cell_element, W_TC_PR)
 
         # 清理不需要的标签
         if tc_pr is not None:
             self._clean_tc_pr(tc_pr)
 
         # 获取列合并信息
-        col_span = self._get_col_span(tc_pr)
+        col_span = grid.col_span[cell_id]
 
         # 提取单元格内容
         cell_body = self._extract_p_body(cell_element)
 
         # 创建单元格信息对象
-        cell_info = CellInfo(
+        cell_info = CellRecord(
             key=key, col_span=col_span, row_span=1, body=cell_body, is_empty_cell=False
         )
 
@@ -97,7 +138,7 @@ class CellExtractor:
         cell_info.left_cell_key = left_cell_key
         cell_info.top_cell_key = top_cell_key
 
-        self._process_row_merge(tc_pr, actual_col_index, cell_info)
+        self._process_row_merge(grid, cell_id, cell_info)
 
         return cell_info
 
@@ -115,33 +156,16 @@ class CellExtractor:
         top_cell_key = None if row_index == 0 else f"{row_index - 1}-{cell_index}"
         return (left_cell_key, top_cell_key)
 
-    def _fill_adjoining_text_body(self, cell_info: CellInfo) -> None:
+    def _fill_adjoining_text_body(self, cell_info: CellRecord) -> None:
         # 填充左边单元格的文本内容
         if cell_info.left_cell_key and cell_info.left_cell_key in self.cell_info_map:
             left_cell = self.cell_info_map[cell_info.left_cell_key]
-            cell_info.left_text_body = self._get_cell_text_body(left_cell)
+            cell_info.left_text_body = left_cell.text()
 
         # 填充上边单元格的文本内容
         if cell_info.top_cell_key and cell_info.top_cell_key in self.cell_info_map:
             top_cell = self.cell_info_map[cell_info.top_cell_key]
-            cell_info.top_text_body = self._get_cell_text_body(top_cell)
-
-    def _get_cell_text_body(self, cell_info: CellInfo) -> str:
-        """
-        获取单元格的纯文本内容
-
-        Args:
-            cell_info: 单元格信息对象
-
-        Returns:
-            单元格的纯文本内容
-        """
-        text_parts: List[str] = []
-        for p_body in cell_info.body:
-            for r_body in p_body.rList:
-                if r_body.body:
-                    text_parts.append(r_body.body)
-        return "".join(text_parts)
+            cell_info.top_text_body = top_cell.text()
 
     def _clean_tc_pr(self, tc_pr: _Element) -> None:
         """
@@ -150,62 +174,30 @@ class CellExtractor:
         Args:
             tc_pr: tcPr元素
         """
-        for tag in TCPR_DELETE_TAGS:
-            tag_element = tc_pr.find(tag, WORD_NAMESPACES)
+        for tag in TCPR_DELETE_QNAMES:
+            tag_element = child(tc_pr, tag)
             if tag_element is not None:
                 tc_pr.remove(tag_element)
 
-    def _get_col_span(self, tc_pr: _Element | None) -> int:
-        """
-        获取列合并数
-
-        Args:
-            tc_pr: tcPr元素
-
-        Returns:
-            列合并数
-        """
-        if tc_pr is None:
-            return 1
-
-        grid_span = tc_pr.find("./w:gridSpan", WORD_NAMESPACES)
-        if grid_span is not None:
-            val = grid_span.get(f"{{{WORD_NS_URI}}}val", "1")
-            return int(val)
-
-        return 1
-
     def _process_row_merge(
-        self, tc_pr: _Element | None, actual_col_index: int, cell_info: CellInfo
+        self, grid: TableGrid, cell_id: int, cell_info: CellRecord
     ) -> None:
         """
-        处理行合并逻辑
+        处理行合并逻辑，行合并数直接取自网格
 
         Args:
-            tc_pr: tcPr元素
-            actual_col_index: 实际列位置
-            cell_info: 单元格信息对象
+            grid: 表格网格
+            cell_id: 单元格在网格中的 id
+            cell_info: 单元格记录
         """
-        if tc_pr is None:
-            self.row_span_map.pop(actual_col_index, None)
-            return
-
-        v_merge = tc_pr.find("./w:vMerge", WORD_NAMESPACES)
-
-        if v_merge is not None:
-            val = v_merge.get(f"{{{WORD_NS_URI}}}val", "continue")
-
-            if val == "restart":
-                self.row_span_map[actual_col_index] = cell_info
-            elif val == "continue":
-                # 标记为行合并的继续单元格
-                cell_info.is_merge_continue_cell = True
-                if actual_col_index in self.row_span_map:
-                    self.row_span_map[actual_col_index].row_span += 1
-        else:
-            self.row_span_map.pop(actual_col_index, None)
-
-    def _extract_p_body(self, cell_element: _Element) -> List[CellPBody]:
+        v_merge = grid.v_merge[cell_id]
+        if v_merge == V_MERGE_RESTART:
+            cell_info.row_span = grid.row_span[cell_id]
+        elif v_merge == V_MERGE_CONTINUE:
+            # 标记为行合并的继续单元格
+            cell_info.is_merge_continue_cell = True
+
+    def _extract_p_body(self, cell_element: _Element) -> List[ParagraphRecord]:
         """
         提取单元格内容
 
@@ -215,43 +207,27 @@ class CellExtractor:
         Returns:
             单元格内容列表
         """
-        body: List[CellPBody] = []
-        p_elements = cell_element.findall("./w:p", WORD_NAMESPACES)
-        for p_element in p_elements:
+        body: List[ParagraphRecord] = []
+        for p_element in cell_element.iterchildren(W_P):
             pStyle: Dict[str, str] = {}
-            pPrElement = p_element.find("./w:pPr", WORD_NAMESPACES)
             # 提取 p 中的段落样式
-            if pPrElement is not None:
-                jcElement = pPrElement.find("./w:jc", WORD_NAMESPACES)
-                if jcElement is not None:
-                    pStyle["algin"] = jcElement.get(f"{{{WORD_NS_URI}}}val", "left")
+            jcElement = first(XP_P_JC(p_element))
+            if jcElement is not None:
+                pStyle["algin"] = jcElement.get(W_VAL, "left")
             # 提取 p 中的文本样式
-            rprElement = p_element.find("./w:rPr", WORD_NAMESPACES)
+            rprElement = child(p_element, W_R_PR)
             if rprElement is not None:
-                style_tags = [
-                    ("color", "black"),
-                    ("b", "false"),
-                    ("i", "false"),
-                ]
-                for tag, default in style_tags:
-                    element = rprElement.find(f"./w:{tag}", WORD_NAMESPACES)
+                for tag, style_key, default in _P_STYLE_TAGS:
+                    element = child(rprElement, tag)
                     if element is not None:
-                        # 映射标签名称
-                        style_key = tag
-                        if tag == "b":
-                            style_key = "bold"
-                        elif tag == "i":
-                            style_key = "italic"
-                        pStyle[style_key] = element.get(
-                            f"{{{WORD_NS_URI}}}val", default
-                        )
+                        pStyle[style_key] = element.get(W_VAL, default)
 
             # 创建段落内容
-            pBody = CellPBody(pStyle=pStyle, rList=self._extract_r_body(p_element))
+            pBody = ParagraphRecord(pStyle, self._extract_r_body(p_element))
             body.append(pBody)
         return body
 
-    def _extract_r_body(self, p_element: _Element) -> List[CellRBody]:
+    def _extract_r_body(self, p_element: _Element) -> List[RunRecord]:
         """
         提取 w:r元素
 
@@ -261,21 +237,18 @@ class CellExtractor:
         Returns:
             run内容列表
         """
-        body: List[CellRBody] = []
-        r_elements = p_element.findall("./w:r", WORD_NAMESPACES)
-        for r_element in r_elements:
+        body: List[RunRecord] = []
+        for r_element in p_element.iterchildren(W_R):
             rStyle: str = ""
             # 提取 r 中的文本样式
-            rPrElement = r_element.find("./w:rPr", WORD_NAMESPACES)
-            if rPrElement is not None:
-                colorElement = rPrElement.find("./w:color", WORD_NAMESPACES)
-                if colorElement is not None:
-                    rStyle = colorElement.get(f"{{{WORD_NS_URI}}}val", "")
+            colorElement = first(XP_R_COLOR(r_element))
+            if colorElement is not None:
+                rStyle = colorElement.get(W_VAL, "")
 
             # 提取 r 中的文本
-            textElement = r_element.find("./w:t", WORD_NAMESPACES)
-            rBody = CellRBody(
-                rStyle=rStyle, body=textElement.text if textElement is not None else ""
+            textElement = child(r_element, W_T)
+            rBody = RunRecord(
+                rStyle, (textElement.text or "") if textElement is not None else ""
             )
             body.append(rBody)
         return body
@@ -1,8 +1,9 @@
 from typing import List
-from lxml import etree
 from .table_extractor import TableExtractor
 from .cell_extractor import CellExtractor
-from ..models import TableSplitResult, ExtractorResult, TableInfo
+from ..models import TableSplitResult, ExtractorResult
+from ..models.records import ExtractorRecord
+from ..core.metrics import span
 
 
 class Extractor:
@@ -14,14 +15,27 @@ class Extractor:
         self.extractor_results = []
 
     def extract(self) -> List[ExtractorResult]:
-        for table_split_result in self.table_split_results:
-            extractor_result = ExtractorResult(
-                table_info=TableInfo(),
-                cell_info_list=[],
-                table_type=table_split_result.table_type,
-            )
-            xml_element = etree.fromstring(table_split_result.table_xml.encode("UTF-8"))
-            extractor_result.table_info = TableExtractor().extract(xml_element)
-            extractor_result.cell_info_list = CellExtractor().extract_all(xml_element)
-            self.extractor_results.append(extractor_result)
+        self.extractor_results = [
+            record.to_model() for record in self.extract_records()
+        ]
         return self.extractor_results
+
+    def extract_records(self) -> List[ExtractorRecord]:
+        """
+        提取为不做校验的内部记录，序列化时不必先转换为 pydantic 模型
+        """
+        with span("extract"):
+            return [
+                self._extract_record(table_split_result)
+                for table_split_result in self.table_split_results
+            ]
+
+    def _extract_record(self, table_split_result: TableSplitResult) -> ExtractorRecord:
+        xml_element = table_split_result.table_element
+        table_info = TableExtractor().extract(xml_element)
+        return ExtractorRecord(
+            table_type=table_split_result.table_type,
+            col=table_info.col,
+            row=table_info.row,
+            cell_info_list=CellExtractor().extract_records(xml_element),
+        )
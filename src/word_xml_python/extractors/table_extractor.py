@@ -3,7 +3,7 @@
 from lxml.etree import _Element
 
 from ..models import TableInfo
-from ..core.constants import WORD_NAMESPACES
+from ..core.query import W_TBL_GRID, W_TR, child, own_descendants
 
 
 class TableExtractor:
@@ -24,11 +24,10 @@ class TableExtractor:
             表格信息对象
         """
         # 获取列数
-        tbl_grid = table_element.find("./w:tblGrid", WORD_NAMESPACES)
+        tbl_grid = child(table_element, W_TBL_GRID)
         col_count = len(tbl_grid) if tbl_grid is not None else 0
 
         # 获取行数
-        rows = table_element.findall(".//w:tr", WORD_NAMESPACES)
-        row_count = len(rows)
+        row_count = len(own_descendants(table_element, W_TR))
 
         return TableInfo(col=col_count, row=row_count)
@@ -1,9 +1,11 @@
 """数据模型模块"""
 
 from .xml_meta import XmlMeta
-from .verifier import VerifierMeta, ErrorInfo
+from .verifier import VerifierMeta, ErrorInfo, CandidateVerification
 from .spit import TableSplitResult
 from .extractor import ExtractorResult, TableInfo, CellInfo, CellPBody, CellRBody
+from .batch import BatchResult
+from .manifest import DocumentManifest, ManifestEntry
 
 __all__ = [
     "TableInfo",
@@ -14,5 +16,9 @@ __all__ = [
     "XmlMeta",
     "VerifierMeta",
     "ErrorInfo",
+    "CandidateVerification",
     "TableSplitResult",
+    "BatchResult",
+    "DocumentManifest",
+    "ManifestEntry",
 ]
@@ -0,0 +1,30 @@
+"""批量处理相关数据模型"""
+
+from pydantic import BaseModel, TypeAdapter
+
+from .extractor import ExtractorResult
+
+# 单个文档的处理结果：每个表格对应一个提取结果列表，验证失败的表格为 None
+DocumentResults = list[list[ExtractorResult] | None]
+
+DOCUMENT_RESULTS_ADAPTER = TypeAdapter(DocumentResults)
+
+
+class BatchResult(BaseModel):
+    """
+    批量处理中单个文档的结果
+
+    结果以 JSON 字节的形式跨进程传递，只有调用 results() 时才还原为模型对象
+    """
+
+    index: int  # 文档在提交顺序中的位置
+    path: str
+    ok: bool
+    error: str | None = None
+    payload: bytes = b""
+
+    def results(self) -> DocumentResults:
+        """还原为提取结果模型"""
+        if not self.ok:
+            raise ValueError(f"文档处理失败: {self.path}\n{self.error}")
+        return DOCUMENT_RESULTS_ADAPTER.validate_json(self.payload)
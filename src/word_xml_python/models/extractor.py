@@ -60,6 +60,10 @@ class ExtractorResult(BaseModel):
     table_type: str
     table_info: TableInfo = Field(default_factory=TableInfo)
     cell_info_list: list[CellInfo] = Field(default_factory=list)
+    # 嵌套表格所在的外层表格序号（与 get_xml_tables 的顺序一致），顶层表格为 None
+    parent_table: int | None = None
+    # 宿主单元格在外层表格（分割前）中的位置，格式同 CellInfo.key，顶层表格为 None
+    host_cell_key: str | None = None
 
     def __repr__(self) -> str:
         return f"ExtractorResult(table_info={self.table_info}, cell_info_list={self.cell_info_list})"
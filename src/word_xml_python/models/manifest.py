@@ -0,0 +1,58 @@
+"""增量处理清单"""
+
+from pydantic import BaseModel, Field
+
+from .batch import DocumentResults
+from .extractor import ExtractorResult
+
+# 清单格式版本，结构或提取逻辑变化导致旧结果不再可用时递增
+# 2: 内容哈希改为基于 Exclusive C14N
+MANIFEST_VERSION = 2
+
+
+class ManifestEntry(BaseModel):
+    """单个表格的内容哈希与提取结果"""
+
+    content_hash: str  # 规范化后的表格 XML 的 sha256
+    results: list[ExtractorResult] | None = None  # 提取结果，分割失败时为 None
+    reused: bool = Field(default=False, exclude=True)  # 本次是否直接取自旧清单
+
+
+class DocumentManifest(BaseModel):
+    """
+    文档清单
+
+    tables 与 Core.get_xml_tables 的顺序一致。重新处理时按内容哈希查找旧结果，
+    表格的增删与移动不影响其余表格的复用。
+    """
+
+    version: int = MANIFEST_VERSION
+    tables: list[ManifestEntry] = Field(default_factory=list)
+
+    def results(self) -> DocumentResults:
+        """按表格顺序排列的提取结果"""
+        return [entry.results for entry in self.tables]
+
+    def reusable(self) -> dict[str, list[ExtractorResult]]:
+        """
+        可以复用的结果：内容哈希 -> 提取结果
+        版本不一致时为空，分割失败的表格不复用，以便重新尝试
+        """
+        if self.version != MANIFEST_VERSION:
+            return {}
+        return {
+            entry.content_hash: entry.results
+            for entry in self.tables
+            if entry.results is not None
+        }
+
+    @property
+    def reused_count(self) -> int:
+        return sum(entry.reused for entry in self.tables)
+
+    @property
+    def processed_count(self) -> int:
+        return len(self.tables) - self.reused_count
+
+
+__all__ = ["MANIFEST_VERSION", "ManifestEntry", "DocumentManifest"]
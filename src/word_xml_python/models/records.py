@@ -0,0 +1,160 @@
+"""提取结果的内部表示
+
+提取器在处理过程中为每个 w:r、w:p、w:tc 都要创建一个对象，大文档中数量可达
+数百万。这里的类只声明 __slots__，不做任何校验，字段名与 models.extractor 中的
+pydantic 模型一一对应；需要模型对象时用 to_model() 以 model_construct 转换
+（同样跳过校验），需要 JSON 时用 to_dict() 直接得到与 model_dump() 相同的结构。
+"""
+
+from .extractor import CellInfo, CellPBody, CellRBody, ExtractorResult, TableInfo
+
+
+class RunRecord:
+    """对应 CellRBody"""
+
+    __slots__ = ("rStyle", "body")
+
+    def __init__(self, rStyle: str = "", body: str = ""):
+        self.rStyle = rStyle
+        self.body = body
+
+    def to_model(self) -> CellRBody:
+        return CellRBody.model_construct(rStyle=self.rStyle, body=self.body)
+
+    def to_dict(self) -> dict:
+        return {"rStyle": self.rStyle, "body": self.body}
+
+
+class ParagraphRecord:
+    """对应 CellPBody"""
+
+    __slots__ = ("pStyle", "rList")
+
+    def __init__(self, pStyle: dict[str, str], rList: list[RunRecord]):
+        self.pStyle = pStyle
+        self.rList = rList
+
+    def to_model(self) -> CellPBody:
+        return CellPBody.model_construct(
+            pStyle=self.pStyle, rList=[run.to_model() for run in self.rList]
+        )
+
+    def to_dict(self) -> dict:
+        return {
+            "pStyle": self.pStyle,
+            "rList": [run.to_dict() for run in self.rList],
+        }
+
+
+class CellRecord:
+    """对应 CellInfo"""
+
+    __slots__ = (
+        "key",
+        "col_span",
+        "row_span",
+        "body",
+        "is_empty_cell",
+        "left_cell_key",
+        "top_cell_key",
+        "left_text_body",
+        "top_text_body",
+        "is_merge_continue_cell",
+    )
+
+    def __init__(
+        self,
+        key: str,
+        col_span: int = 1,
+        row_span: int = 1,
+        body: list[ParagraphRecord] | None = None,
+        is_empty_cell: bool = False,
+    ):
+        self.key = key
+        self.col_span = col_span
+        self.row_span = row_span
+        self.body = body if body is not None else []
+        self.is_empty_cell = is_empty_cell
+        self.left_cell_key: str | None = None
+        self.top_cell_key: str | None = None
+        self.left_text_body: str | None = None
+        self.top_text_body: str | None = None
+        self.is_merge_continue_cell = False
+
+    def text(self) -> str:
+        """单元格的纯文本内容"""
+        return "".join(
+            run.body for paragraph in self.body for run in paragraph.rList if run.body
+        )
+
+    def to_model(self) -> CellInfo:
+        return CellInfo.model_construct(
+            key=self.key,
+            col_span=self.col_span,
+            row_span=self.row_span,
+            body=[paragraph.to_model() for paragraph in self.body],
+            is_empty_cell=self.is_empty_cell,
+            left_cell_key=self.left_cell_key,
+            top_cell_key=self.top_cell_key,
+            left_text_body=self.left_text_body,
+            top_text_body=self.top_text_body,
+            is_merge_continue_cell=self.is_merge_continue_cell,
+        )
+
+    def to_dict(self) -> dict:
+        return {
+            "key": self.key,
+            "col_span": self.col_span,
+            "row_span": self.row_span,
+            "body": [paragraph.to_dict() for paragraph in self.body],
+            "is_empty_cell": self.is_empty_cell,
+            "left_cell_key": self.left_cell_key,
+            "top_cell_key": self.top_cell_key,
+            "left_text_body": self.left_text_body,
+            "top_text_body": self.top_text_body,
+            "is_merge_continue_cell": self.is_merge_continue_cell,
+        }
+
+
+class ExtractorRecord:
+    """对应 ExtractorResult，table_info 展开为 col/row 两个字段"""
+
+    __slots__ = (
+        "table_type",
+        "col",
+        "row",
+        "cell_info_list",
+        "parent_table",
+        "host_cell_key",
+    )
+
+    def __init__(
+        self, table_type: str, col: int, row: int, cell_info_list: list[CellRecord]
+    ):
+        self.table_type = table_type
+        self.col = col
+        self.row = row
+        self.cell_info_list = cell_info_list
+        self.parent_table: int | None = None
+        self.host_cell_key: str | None = None
+
+    def to_model(self) -> ExtractorResult:
+        return ExtractorResult.model_construct(
+            table_type=self.table_type,
+            table_info=TableInfo.model_construct(col=self.col, row=self.row),
+            cell_info_list=[cell.to_model() for cell in self.cell_info_list],
+            parent_table=self.parent_table,
+            host_cell_key=self.host_cell_key,
+        )
+
+    def to_dict(self) -> dict:
+        return {
+            "table_type": self.table_type,
+            "table_info": {"col": self.col, "row": self.row},
+            "cell_info_list": [cell.to_dict() for cell in self.cell_info_list],
+            "parent_table": self.parent_table,
+            "host_cell_key": self.host_cell_key,
+        }
+
+
+__all__ = ["RunRecord", "ParagraphRecord", "CellRecord", "ExtractorRecord"]
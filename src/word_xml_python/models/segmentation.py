@@ -0,0 +1,73 @@
+"""AI 分割相关数据模型"""
+
+from pydantic import BaseModel, Field
+
+from .verifier import ErrorInfo, VerifierMeta
+
+
+class SegmentationResponse(BaseModel):
+    """分割客户端单次调用的返回"""
+
+    content: str  # 模型返回的原始文本
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+
+
+class SegmentationStats(BaseModel):
+    """分割耗时与 token 统计"""
+
+    tables: int = 0  # 统计覆盖的表格数
+    attempts: int = 0  # 模型调用次数（含重试）
+    failures: int = 0  # 重试耗尽仍未通过验证的表格数
+    client_errors: int = 0  # 失败的模型调用次数（网络、HTTP 错误等），计入 attempts
+    cache_hits: int = 0  # 直接使用缓存结果、跳过模型调用的表格数
+    template_hits: int = 0  # 由相似模板映射得到结果、跳过模型调用的表格数
+    rule_hits: int = 0  # 由结构规则得到结果、跳过模型调用的表格数
+    windows: int = 0  # 超出 token 预算、按行窗口分割时的窗口数
+    repairs: int = 0  # 经本地修复后通过验证、不再重试模型的次数
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    model_seconds: float = 0.0  # 等待模型的时间
+    elapsed_seconds: float = 0.0  # 分割总耗时
+
+    def add(self, other: "SegmentationStats") -> None:
+        """累加另一份统计"""
+        for name in type(self).model_fields:
+            setattr(self, name, getattr(self, name) + getattr(other, name))
+
+
+class RepairAction(BaseModel):
+    """本地修复对分割结果做的一处改动"""
+
+    kind: str  # 改动类型，见 segmentation.repair 中的 REPAIR_* 常量
+    region: str  # 区域名称
+    detail: str
+    rows: int = 0  # 去掉、补齐、裁剪或扩展的行数
+
+
+class SegmentationResult(BaseModel):
+    """单个表格的分割结果"""
+
+    metas: list[VerifierMeta] | None = None  # 通过验证的分割结果，失败时为 None
+    errors: list[ErrorInfo] = Field(default_factory=list)  # 最后一次验证的错误
+    stats: SegmentationStats = Field(default_factory=SegmentationStats)
+    source: str = "model"  # 结果来源: model | cache | template | rules
+    repairs: list[RepairAction] = Field(default_factory=list)  # 本地修复的改动
+    repaired: bool = False  # 结果是否经过本地修复，而不是原样通过验证
+
+
+class TemplateMatch(BaseModel):
+    """相似模板匹配结果"""
+
+    template_id: int
+    similarity: float  # 估算的 Jaccard 相似度
+    metas: list[VerifierMeta]  # 已映射到新表格行号的分割结果，尚未验证
+
+
+class RowWindow(BaseModel):
+    """大表格按行拆分的窗口，行号从 0 开始、左闭右开"""
+
+    start: int  # 窗口包含的第一行
+    end: int  # 窗口包含的最后一行之后
+    own_start: int  # 拼接时由本窗口决定归属的第一行
+    own_end: int  # 拼接时由本窗口决定归属的最后一行之后
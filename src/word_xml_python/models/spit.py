@@ -1,8 +1,49 @@
-from pydantic import BaseModel
+from typing import Any
+
+from lxml import etree
+from lxml.etree import _Element
+from pydantic import BaseModel, ConfigDict, Field, PrivateAttr, computed_field
 
 
 class TableSplitResult(BaseModel):
-    """表格分割结果"""
+    """
+    表格分割结果
+
+    既可以由 xml 字符串构造，也可以直接持有 lxml 元素。
+    流水线各阶段之间只传递元素，只有在访问 table_xml 或序列化时才生成字符串。
+    """
+
+    model_config = ConfigDict(arbitrary_types_allowed=True)
 
-    table_xml: str
     table_type: str
+    element: _Element | None = Field(default=None, exclude=True, repr=False)
+    _table_xml: str | None = PrivateAttr(default=None)
+
+    def __init__(self, table_xml: str | None = None, **data: Any):
+        super().__init__(**data)
+        if table_xml is None and self.element is None:
+            raise ValueError("table_xml 与 element 至少需要提供一个")
+        self._table_xml = table_xml
+
+    @computed_field
+    @property
+    def table_xml(self) -> str:
+        """表格 xml 字符串，持有元素时按需序列化"""
+        if self.element is not None:
+            return etree.tostring(
+                self.element, pretty_print=True, encoding="UTF-8"
+            ).decode("UTF-8")
+        return self._table_xml
+
+    @table_xml.setter
+    def table_xml(self, value: str) -> None:
+        self._table_xml = value
+        self.element = None
+
+    @property
+    def table_element(self) -> _Element:
+        """表格元素，仅由字符串构造时才解析一次"""
+        if self.element is None:
+            self.element = etree.fromstring(self._table_xml.encode("UTF-8"))
+            self._table_xml = None
+        return self.element
@@ -1,6 +1,6 @@
 """验证器相关数据模型"""
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 
 class VerifierMeta(BaseModel):
@@ -18,3 +18,12 @@ class ErrorInfo(BaseModel):
 
     source_meta: str
     error_msg: str
+
+
+class CandidateVerification(BaseModel):
+    """多个候选分割结果的验证结果"""
+
+    index: int | None = None  # 选中的候选序号：通过验证的候选，或报告错误的候选
+    metas: list[VerifierMeta] | None = None  # 通过验证的候选，全部未通过时为 None
+    errors: list[ErrorInfo] = Field(default_factory=list)  # 报告的候选的错误
+    checked: int = 0  # 实际验证过的候选数
@@ -0,0 +1,32 @@
+"""AI 分割模块"""
+
+from .cache import SegmentationCache, table_fingerprint
+from .client import (
+    OpenAISegmentationClient,
+    SegmentationClient,
+    StaticSegmentationClient,
+)
+from .repair import repair_metas
+from .rules import DEFAULT_RULE_THRESHOLD, classify_table
+from .segmenter import Segmenter, parse_verifier_metas
+from .stub_server import StubModelServer
+from .template_index import TemplateIndex, remap_metas
+from .windowing import plan_windows, stitch_metas
+
+__all__ = [
+    "SegmentationClient",
+    "StaticSegmentationClient",
+    "OpenAISegmentationClient",
+    "Segmenter",
+    "parse_verifier_metas",
+    "StubModelServer",
+    "SegmentationCache",
+    "table_fingerprint",
+    "TemplateIndex",
+    "remap_metas",
+    "plan_windows",
+    "stitch_metas",
+    "repair_metas",
+    "classify_table",
+    "DEFAULT_RULE_THRESHOLD",
+]
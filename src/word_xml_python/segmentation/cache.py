@@ -0,0 +1,202 @@
+"""分割结果缓存
+
+以表格的结构指纹为键缓存通过验证的分割结果。指纹由行列网格、gridSpan/vMerge
+布局和规范化后的表头文本组成，同一模板填写后的表格指纹相同。
+缓存分为内存 LRU 层和可选的磁盘层，磁盘层在进程重启后依然有效。
+"""
+
+import hashlib
+import json
+import os
+import threading
+import unicodedata
+from collections import OrderedDict
+from pathlib import Path
+
+from ..core.grid import V_MERGE_CONTINUE, V_MERGE_NONE, V_MERGE_RESTART, TableGrid
+from ..models import VerifierMeta
+
+# 指纹中的 vMerge 状态标记
+_V_MERGE_CODES = {V_MERGE_NONE: "-", V_MERGE_RESTART: "r", V_MERGE_CONTINUE: "c"}
+
+
+def normalize_text(text: str) -> str:
+    """规范化文本：全角转半角、去掉所有空白、统一小写"""
+    return "".join(unicodedata.normalize("NFKC", text).split()).lower()
+
+
+def table_fingerprint(grid: TableGrid) -> str:
+    """
+    计算表格的结构指纹
+
+    Args:
+        grid: 表格网格
+
+    Returns:
+        sha256 十六进制字符串
+    """
+    parts: list[str] = []
+    for row_idx in range(grid.row_count):
+        cells: list[str] = []
+        for cell_id in grid.row_cells(row_idx):
+            cell = f"{grid.col_span[cell_id]}:{_V_MERGE_CODES[grid.v_merge[cell_id]]}"
+            if row_idx == 0:
+                cell += f":{normalize_text(grid.text[cell_id])}"
+            cells.append(cell)
+        parts.append(",".join(cells))
+    return hashlib.sha256("\n".join(parts).encode("UTF-8")).hexdigest()
+
+
+class SegmentationCache:
+    """
+    分割结果缓存
+
+    只应存入通过 MapVerifier 验证的结果；取出的结果在使用前仍需重新验证，
+    验证失败时调用 invalidate 删除该条目。
+    """
+
+    max_entries: int
+    directory: Path | None
+    hits: int  # 内存层命中次数
+    disk_hits: int  # 磁盘层命中次数
+    misses: int
+    invalidations: int  # 重新验证失败被删除的次数
+    corrupted: int  # 无法解析、按未命中处理并删除的条目数
+
+    def __init__(
+        self, max_entries: int = 1024, directory: str | os.PathLike | None = None
+    ):
+        """
+        Args:
+            max_entries: 内存层最多保存的条目数
+            directory: 磁盘层目录，为 None 时只使用内存层
+        """
+        self.max_entries = max_entries
+        self.directory = Path(directory) if directory is not None else None
+        if self.directory is not None:
+            self.directory.mkdir(parents=True, exist_ok=True)
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.corrupted = 0
+        # 保存序列化后的字符串，保证取出的结果互相独立，不会被下游修改
+        self._entries: OrderedDict[str, str] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, fingerprint: str) -> list[VerifierMeta] | None:
+        """
+        按指纹取出分割结果，未命中时返回 None
+        写入中途崩溃等原因损坏的条目按未命中处理并删除
+        """
+        with self._lock:
+            raw = self._entries.get(fingerprint)
+            if raw is not None:
+                self._entries.move_to_end(fingerprint)
+        from_disk = raw is None
+
+        metas = None
+        try:
+            if from_disk:
+                raw = self._read_disk(fingerprint)
+            if raw is not None:
+                metas = _decode(raw)
+        except ValueError:
+            self._discard(fingerprint)
+            with self._lock:
+                self.corrupted += 1
+
+        with self._lock:
+            if metas is None:
+                self.misses += 1
+            elif from_disk:
+                self.disk_hits += 1
+                self._remember(fingerprint, raw)
+            else:
+                self.hits += 1
+        return metas
+
+    def put(self, fingerprint: str, metas: list[VerifierMeta]) -> None:
+        """存入通过验证的分割结果"""
+        raw = json.dumps([meta.model_dump() for meta in metas], ensure_ascii=False)
+        with self._lock:
+            self._remember(fingerprint, raw)
+        self._write_disk(fingerprint, raw)
+
+    def invalidate(self, fingerprint: str) -> None:
+        """删除条目（内存层与磁盘层）"""
+        self._discard(fingerprint)
+        with self._lock:
+            self.invalidations += 1
+
+    def stats(self) -> dict[str, int]:
+        """命中统计"""
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "invalidations": self.invalidations,
+            "corrupted": self.corrupted,
+        }
+
+    def _discard(self, fingerprint: str) -> None:
+        with self._lock:
+            self._entries.pop(fingerprint, None)
+        path = self._disk_path(fingerprint)
+        if path is not None:
+            path.unlink(missing_ok=True)
+
+    def _remember(self, fingerprint: str, raw: str) -> None:
+        self._entries[fingerprint] = raw
+        self._entries.move_to_end(fingerprint)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _disk_path(self, fingerprint: str) -> Path | None:
+        if self.directory is None:
+            return None
+        return self.directory / fingerprint[:2] / f"{fingerprint}.json"
+
+    def _read_disk(self, fingerprint: str) -> str | None:
+        path = self._disk_path(fingerprint)
+        if path is None:
+            return None
+        try:
+            # 不是合法 UTF-8 时的 UnicodeDecodeError 属于 ValueError，由 get 按损坏处理
+            return path.read_bytes().decode("UTF-8")
+        except FileNotFoundError:
+            return None
+
+    def _write_disk(self, fingerprint: str, raw: str) -> None:
+        path = self._disk_path(fingerprint)
+        if path is None:
+            return
+        path.parent.mkdir(exist_ok=True)
+        # 先写临时文件并落盘再替换，并发读取或写入中途崩溃都不会看到写了一半的文件
+        tmp_path = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        try:
+            with open(tmp_path, "wb") as f:
+                f.write(raw.encode("UTF-8"))
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, path)
+        except BaseException:
+            tmp_path.unlink(missing_ok=True)
+            raise
+
+
+def _decode(raw: str) -> list[VerifierMeta]:
+    """
+    反序列化缓存条目
+
+    Raises:
+        ValueError: 条目不是合法的分割结果（JSON 损坏、结构或字段不符）
+    """
+    items = json.loads(raw)
+    if not isinstance(items, list) or not all(isinstance(item, dict) for item in items):
+        raise ValueError("缓存条目不是分割结果数组")
+    return [VerifierMeta(**item) for item in items]
+
+
+__all__ = ["SegmentationCache", "table_fingerprint", "normalize_text"]
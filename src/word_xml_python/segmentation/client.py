@@ -0,0 +1,135 @@
+"""AI 分割客户端
+
+客户端只负责把对话消息发给模型并返回原始文本，提示词构造、结果解析、
+验证与重试都由 Segmenter 负责。
+"""
+
+import asyncio
+import json
+import os
+import urllib.request
+from abc import ABC, abstractmethod
+
+from ..models import VerifierMeta
+from ..models.segmentation import SegmentationResponse
+
+# 对话消息，格式同 OpenAI Chat Completions: {"role": ..., "content": ...}
+Message = dict[str, str]
+
+
+class SegmentationClient(ABC):
+    """分割客户端接口"""
+
+    @abstractmethod
+    async def complete(
+        self, messages: list[Message], temperature: float | None = None
+    ) -> SegmentationResponse:
+        """
+        发送对话消息并返回模型回复
+
+        Args:
+            messages: 对话消息，最后一条为本次的用户消息
+            temperature: 本次请求的采样温度，为 None 时使用客户端的默认值
+
+        Returns:
+            模型回复及 token 用量
+        """
+
+
+class StaticSegmentationClient(SegmentationClient):
+    """
+    固定结果客户端
+    无论输入什么都返回同一份分割结果，用于演示或已知表格结构的场景
+    """
+
+    def __init__(self, result: str | list[VerifierMeta]):
+        """
+        Args:
+            result: 分割结果 json 字符串或 VerifierMeta 列表
+        """
+        if isinstance(result, str):
+            self.content = result
+        else:
+            self.content = json.dumps(
+                [meta.model_dump() for meta in result], ensure_ascii=False
+            )
+
+    async def complete(
+        self, messages: list[Message], temperature: float | None = None
+    ) -> SegmentationResponse:
+        return SegmentationResponse(content=self.content)
+
+
+class OpenAISegmentationClient(SegmentationClient):
+    """
+    OpenAI Chat Completions 兼容接口客户端
+    base_url 指向本地桩服务（见 stub_server）即可在测试中替代真实模型
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        model: str,
+        api_key: str | None = None,
+        timeout: float = 120.0,
+        temperature: float = 0.0,
+    ):
+        """
+        Args:
+            base_url: 接口地址，如 https://api.openai.com/v1
+            model: 模型名称
+            api_key: 密钥，默认读取环境变量 OPENAI_API_KEY
+            timeout: 单次请求超时（秒）
+            temperature: 默认采样温度，请求时可以单独指定
+        """
+        self.url = base_url.rstrip("/") + "/chat/completions"
+        self.model = model
+        self.api_key = api_key or os.getenv("OPENAI_API_KEY", "")
+        self.timeout = timeout
+        self.temperature = temperature
+
+    async def complete(
+        self, messages: list[Message], temperature: float | None = None
+    ) -> SegmentationResponse:
+        if temperature is None:
+            temperature = self.temperature
+        # urllib 是阻塞的，放到线程中执行，避免阻塞事件循环
+        return await asyncio.to_thread(self._post, messages, temperature)
+
+    def _post(
+        self, messages: list[Message], temperature: float
+    ) -> SegmentationResponse:
+        body = json.dumps(
+            {
+                "model": self.model,
+                "messages": messages,
+                "temperature": temperature,
+            },
+            ensure_ascii=False,
+        ).encode("UTF-8")
+        request = urllib.request.Request(
+            self.url,
+            data=body,
+            headers={
+                "Content-Type": "application/json",
+                "Authorization": f"Bearer {self.api_key}",
+            },
+            method="POST",
+        )
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            data = json.loads(response.read())
+
+        usage = data.get("usage") or {}
+        return SegmentationResponse(
+            content=data["choices"][0]["message"]["content"],
+            prompt_tokens=usage.get("prompt_tokens", 0),
+            completion_tokens=usage.get("completion_tokens", 0),
+        )
+
+
+__all__ = [
+    "Message",
+    "SegmentationClient",
+    "StaticSegmentationClient",
+    "OpenAISegmentationClient",
+]
@@ -0,0 +1,243 @@
+"""分割结果本地修复
+
+很多 MapVerifier 错误是机械性的：末尾漏掉一行、相邻区域差一行重叠、
+RepeatTable 只有一行等。这里按固定规则做最小改动，修复后仍需重新验证，
+通过时即可省去一次模型重试。
+
+修复只处理小的偏差：去掉、补齐、裁剪、扩展以及随区域删除的行数合计超过 max_rows，
+或者需要插入新的表单区域时放弃修复，交给模型根据错误信息重试，
+避免把完全错误的结果改成“通过验证”的结果。
+
+修复步骤：
+1. 去掉超出范围或重复的行号，补齐区域内部的空缺，删除没有行的区域
+2. 按起始行排序，相邻区域重叠时裁剪：后一个区域以表头开始时裁剪前一个区域的末尾，
+   否则裁剪后一个区域的开头
+3. 未覆盖的行并入前一个区域；开头未覆盖时扩展第一个表单区域，或插入一个表单区域
+4. 不满足类型要求的重复表降级为 Form
+"""
+
+from ..core.grid import TableGrid
+from ..models import VerifierMeta
+from ..models.segmentation import RepairAction
+
+REPAIR_DROP_ROWS = "drop_rows"  # 去掉超出范围或重复的行号
+REPAIR_DROP_REGION = "drop_region"  # 删除没有行的区域
+REPAIR_FILL_GAP = "fill_gap"  # 补齐区域内部不连续的行号
+REPAIR_CLIP_RANGE = "clip_range"  # 裁剪与相邻区域重叠的行
+REPAIR_EXTEND_RANGE = "extend_range"  # 扩展区域以覆盖遗漏的行
+REPAIR_INSERT_FORM = "insert_form"  # 为遗漏的行插入表单区域
+REPAIR_DOWNGRADE_TYPE = "downgrade_type"  # 不满足类型要求时降级为 Form
+
+# 改动超出“小偏差”、出现时放弃修复的类型
+STRUCTURAL_REPAIRS = (REPAIR_INSERT_FORM,)
+
+# 默认最多改动的行数（去掉、补齐、裁剪、扩展以及随区域删除的行数合计）
+MAX_REPAIR_ROWS = 2
+
+# 以表头行开始的区域类型，裁剪时保留其第一行
+_HEADER_TYPES = ("RepeatTable", "Left_RepeatTable", "Right_RepeatTable")
+
+
+class _Region:
+    __slots__ = ("meta", "type", "start", "end")
+
+    def __init__(self, meta: VerifierMeta, start: int, end: int):
+        self.meta = meta
+        self.type = meta.type
+        self.start = start
+        self.end = end
+
+    @property
+    def name(self) -> str:
+        return self.meta.name
+
+    def to_meta(self) -> VerifierMeta:
+        update = {"rows": list(range(self.start, self.end + 1)), "type": self.type}
+        if self.type != self.meta.type and self.type == "Form":
+            update["split_after_column"] = None
+        return self.meta.model_copy(update=update)
+
+
+def repair_metas(
+    metas: list[VerifierMeta], grid: TableGrid, max_rows: int | None = MAX_REPAIR_ROWS
+) -> tuple[list[VerifierMeta] | None, list[RepairAction]]:
+    """
+    对分割结果做最小的确定性修复
+
+    Args:
+        metas: 未通过验证的分割结果，不会被修改
+        grid: 表格网格
+        max_rows: 最多改动的行数，为 None 时不限制行数
+
+    Returns:
+        (修复后的分割结果, 改动记录)，没有可修复之处时改动记录为空；
+        改动超出限制（行数超过 max_rows，或需要插入区域）时分割结果为 None，
+        改动记录仍完整返回
+    """
+    actions: list[RepairAction] = []
+    row_count = grid.row_count
+
+    def record(kind: str, region: str, detail: str, rows: int = 0) -> None:
+        actions.append(RepairAction(kind=kind, region=region, detail=detail, rows=rows))
+
+    regions: list[_Region] = []
+    for meta in metas:
+        rows = sorted({row for row in meta.rows if 1 <= row <= row_count})
+        if len(rows) != len(meta.rows):
+            dropped = sorted(set(meta.rows) - set(rows))
+            # 重复的行号不影响覆盖，不计入改动行数
+            record(
+                REPAIR_DROP_ROWS,
+                meta.name,
+                f"去掉超出范围或重复的行号 {dropped}" if dropped else "去掉重复的行号",
+                len(dropped),
+            )
+        if not rows:
+            record(REPAIR_DROP_REGION, meta.name, "区域没有有效的行，已删除")
+            continue
+        if rows[-1] - rows[0] + 1 != len(rows):
+            record(
+                REPAIR_FILL_GAP,
+                meta.name,
+                f"行号不连续，补齐为第{rows[0]}-{rows[-1]}行",
+                rows[-1] - rows[0] + 1 - len(rows),
+            )
+        regions.append(_Region(meta, rows[0], rows[-1]))
+
+    regions.sort(key=lambda region: region.start)
+    regions = _clip_overlaps(regions, record)
+    regions = _cover_gaps(regions, row_count, record)
+    _downgrade_types(regions, grid, record)
+
+    if any(action.kind in STRUCTURAL_REPAIRS for action in actions) or (
+        max_rows is not None and sum(action.rows for action in actions) > max_rows
+    ):
+        return None, actions
+    return [region.to_meta() for region in regions], actions
+
+
+def _clip_overlaps(regions: list[_Region], record) -> list[_Region]:
+    kept: list[_Region] = []
+    for region in regions:
+        previous = kept[-1] if kept else None
+        if previous is not None and region.start <= previous.end:
+            if region.type in _HEADER_TYPES and previous.start < region.start:
+                record(
+                    REPAIR_CLIP_RANGE,
+                    previous.name,
+                    f"与'{region.name}'重叠，结束行由第{previous.end}行改为第{region.start - 1}行",
+                    previous.end - region.start + 1,
+                )
+                previous.end = region.start - 1
+            else:
+                start = previous.end + 1
+                if start > region.end:
+                    record(
+                        REPAIR_DROP_REGION,
+                        region.name,
+                        f"完全包含在'{previous.name}'中，已删除",
+                        region.end - region.start + 1,
+                    )
+                    continue
+                record(
+                    REPAIR_CLIP_RANGE,
+                    region.name,
+                    f"与'{previous.name}'重叠，起始行由第{region.start}行改为第{start}行",
+                    start - region.start,
+                )
+                region.start = start
+        kept.append(region)
+    return kept
+
+
+def _cover_gaps(regions: list[_Region], row_count: int, record) -> list[_Region]:
+    covered: list[_Region] = []
+    expected = 1
+    for region in regions:
+        if region.start > expected:
+            if covered:
+                previous = covered[-1]
+                record(
+                    REPAIR_EXTEND_RANGE,
+                    previous.name,
+                    f"第{expected}-{region.start - 1}行未被覆盖，结束行扩展到第{region.start - 1}行",
+                    region.start - expected,
+                )
+                previous.end = region.start - 1
+            elif region.type == "Form":
+                record(
+                    REPAIR_EXTEND_RANGE,
+                    region.name,
+                    f"第{expected}-{region.start - 1}行未被覆盖，起始行扩展到第{expected}行",
+                    region.start - expected,
+                )
+                region.start = expected
+            else:
+                covered.append(_new_form(expected, region.start - 1, record))
+        covered.append(region)
+        expected = region.end + 1
+
+    if expected <= row_count:
+        if covered:
+            last = covered[-1]
+            record(
+                REPAIR_EXTEND_RANGE,
+                last.name,
+                f"第{expected}-{row_count}行未被覆盖，结束行扩展到第{row_count}行",
+                row_count - expected + 1,
+            )
+            last.end = row_count
+        else:
+            covered.append(_new_form(expected, row_count, record))
+    return covered
+
+
+def _new_form(start: int, end: int, record) -> _Region:
+    meta = VerifierMeta(
+        name=f"补充表单{start}-{end}",
+        rows=[],
+        type="Form",
+        reason="本地修复：补充未被任何区域覆盖的行",
+    )
+    record(
+        REPAIR_INSERT_FORM,
+        meta.name,
+        f"为未覆盖的第{start}-{end}行插入表单区域",
+        end - start + 1,
+    )
+    return _Region(meta, start, end)
+
+
+def _downgrade_types(regions: list[_Region], grid: TableGrid, record) -> None:
+    for region in regions:
+        reason = None
+        if region.type in _HEADER_TYPES and region.end == region.start:
+            reason = "只有一行"
+        elif region.type == "RepeatTable" and not grid.row_has_text(region.start - 1):
+            reason = f"第一行（第{region.start}行）没有内容"
+        elif region.type in ("Left_RepeatTable", "Right_RepeatTable"):
+            for row_num in range(region.start, region.end + 1):
+                if grid.row_cell_count(row_num - 1) < 2:
+                    reason = f"第{row_num}行只有{grid.row_cell_count(row_num - 1)}列"
+                    break
+        if reason is not None:
+            record(
+                REPAIR_DOWNGRADE_TYPE,
+                region.name,
+                f"标记为{region.type}，但{reason}，改为Form",
+            )
+            region.type = "Form"
+
+
+__all__ = [
+    "repair_metas",
+    "MAX_REPAIR_ROWS",
+    "STRUCTURAL_REPAIRS",
+    "REPAIR_DROP_ROWS",
+    "REPAIR_DROP_REGION",
+    "REPAIR_FILL_GAP",
+    "REPAIR_CLIP_RANGE",
+    "REPAIR_EXTEND_RANGE",
+    "REPAIR_INSERT_FORM",
+    "REPAIR_DOWNGRADE_TYPE",
+]
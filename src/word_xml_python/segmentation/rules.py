@@ -0,0 +1,239 @@
+"""基于规则的本地分割
+
+相当一部分表格只凭结构就能确定分割结果：纯粹的标签/填写区表单、
+一行表头加若干结构相同的空白行、左侧标题列用 vMerge 跨越整个重复块等。
+这里只根据 TableGrid 的结构给出分割结果与置信度，
+Segmenter 在置信度不低于阈值且通过 MapVerifier 验证时直接使用，不再调用模型。
+
+识别规则：
+1. Left_RepeatTable：行首连续若干个有内容的 vMerge restart 单元格跨越相同的行数，
+   右侧部分（至少 2 个单元格）在后续行中结构相同且没有内容，后续行的左侧单元格合并到表头行
+2. RepeatTable：至少 2 个单元格、有内容且没有跨行单元格的表头行，
+   后面紧跟至少一行列结构完全相同且没有内容的数据行
+3. 其余连续的行合并为 Form
+
+置信度从 1 开始，遇到下列不确定的结构时按比例降低：
+- 表单中出现不属于任何重复表的空行（可能是结构不规则的重复表或大段填写区）
+- 表单中出现连续的、每个单元格都有内容且列结构相同的行（可能是已填写的重复表）
+- 重复表只有一行数据行，或表头中有空白单元格
+"""
+
+from ..core.grid import V_MERGE_RESTART, TableGrid
+from ..models import VerifierMeta
+
+# Segmenter 默认使用的置信度阈值
+DEFAULT_RULE_THRESHOLD = 0.8
+
+_EMPTY_ROW_FACTOR = 0.85  # 表单中的空行
+_FILLED_ROWS_FACTOR = 0.8  # 表单中疑似已填写的重复表
+_SINGLE_DATA_ROW_FACTOR = 0.9  # 重复表只有一行数据行
+_HEADER_BLANK_FACTOR = 0.85  # 表头有空白单元格
+
+# 区域类型 -> 生成的区域名称前缀
+_NAMES = {"Form": "表单", "RepeatTable": "重复表", "Left_RepeatTable": "左重复表"}
+
+
+class _RowInfo:
+    """每行的列结构与内容，按需计算去掉左侧若干单元格后的结构"""
+
+    __slots__ = ("grid", "cells", "layout", "has_text")
+
+    def __init__(self, grid: TableGrid, row_idx: int):
+        self.grid = grid
+        self.cells = grid.row_cells(row_idx)
+        self.layout = self.layout_from(0)
+        self.has_text = [grid.has_text[cell_id] for cell_id in self.cells]
+
+    def layout_from(self, skip: int) -> tuple[tuple[int, int], ...]:
+        """从第 skip 个单元格开始的 (起始网格列, 列合并数)"""
+        grid = self.grid
+        return tuple(
+            (grid.cell_col[cell_id], grid.col_span[cell_id])
+            for cell_id in self.cells[skip:]
+        )
+
+    def empty_from(self, skip: int) -> bool:
+        return not any(self.has_text[skip:])
+
+
+class _Block:
+    __slots__ = ("type", "start", "end", "split_after_column", "reason")
+
+    def __init__(
+        self,
+        type: str,
+        start: int,
+        end: int,
+        reason: str,
+        split_after_column: int | None = None,
+    ):
+        self.type = type
+        self.start = start
+        self.end = end
+        self.reason = reason
+        self.split_after_column = split_after_column
+
+
+def classify_table(grid: TableGrid) -> tuple[list[VerifierMeta], float]:
+    """
+    只根据表格结构给出分割结果
+
+    Args:
+        grid: 表格网格
+
+    Returns:
+        (分割结果, 置信度)，置信度在 0 到 1 之间，空表格返回 ([], 0.0)
+    """
+    row_count = grid.row_count
+    if row_count == 0:
+        return [], 0.0
+
+    infos = [_RowInfo(grid, row_idx) for row_idx in range(row_count)]
+    blocks: list[_Block] = []
+    factors: list[float] = []
+    form_start = None
+
+    row_idx = 0
+    while row_idx < row_count:
+        block = _left_repeat_block(infos, row_idx, factors) or _repeat_block(
+            infos, row_idx, factors
+        )
+        if block is None:
+            if form_start is None:
+                form_start = row_idx
+            row_idx += 1
+            continue
+        if form_start is not None:
+            blocks.append(_form_block(infos, form_start, row_idx - 1, factors))
+            form_start = None
+        blocks.append(block)
+        row_idx = block.end + 1
+
+    if form_start is not None:
+        blocks.append(_form_block(infos, form_start, row_count - 1, factors))
+
+    confidence = 1.0
+    for factor in factors:
+        confidence *= factor
+
+    metas = [
+        VerifierMeta(
+            name=f"{_NAMES[block.type]}{block.start + 1}-{block.end + 1}",
+            rows=list(range(block.start + 1, block.end + 2)),
+            type=block.type,
+            reason=f"规则：{block.reason}",
+            split_after_column=block.split_after_column,
+        )
+        for block in blocks
+    ]
+    return metas, confidence
+
+
+def _left_repeat_block(
+    infos: list[_RowInfo], row_idx: int, factors: list[float]
+) -> _Block | None:
+    """以 row_idx 为表头的左重复表"""
+    info = infos[row_idx]
+    grid = info.grid
+
+    left = 0
+    span = 0
+    for cell_id in info.cells:
+        row_span = grid.row_span[cell_id]
+        if (
+            grid.v_merge[cell_id] != V_MERGE_RESTART
+            or not grid.has_text[cell_id]
+            or row_span < 2
+            or (span and row_span != span)
+        ):
+            break
+        left += 1
+        span = row_span
+    if left == 0 or len(info.cells) - left < 2 or info.empty_from(left):
+        return None
+
+    end = row_idx + span - 1
+    if end >= len(infos):
+        return None
+    header_layout = info.layout_from(left)
+    for data_idx in range(row_idx + 1, end + 1):
+        data = infos[data_idx]
+        if len(data.cells) <= left:
+            return None
+        # 左侧单元格必须是表头行左侧单元格的延续
+        for offset in range(left):
+            if grid.merge_root[data.cells[offset]] != info.cells[offset]:
+                return None
+        if data.layout_from(left) != header_layout or not data.empty_from(left):
+            return None
+
+    if not all(info.has_text[left:]):
+        factors.append(_HEADER_BLANK_FACTOR)
+    if span == 2:
+        factors.append(_SINGLE_DATA_ROW_FACTOR)
+    return _Block(
+        "Left_RepeatTable",
+        row_idx,
+        end,
+        f"第{row_idx + 1}行左侧 {left} 列跨越第{row_idx + 1}-{end + 1}行，"
+        f"右侧第{row_idx + 1}行为表头，其余为结构相同的空白数据行",
+        split_after_column=left - 1,
+    )
+
+
+def _repeat_block(
+    infos: list[_RowInfo], row_idx: int, factors: list[float]
+) -> _Block | None:
+    """以 row_idx 为表头的重复表"""
+    info = infos[row_idx]
+    grid = info.grid
+    if len(info.cells) < 2 or info.empty_from(0):
+        return None
+    # 表头中跨行的单元格会延伸到数据行，属于左/右重复表或表单，交给模型判断
+    if any(grid.row_span[cell_id] > 1 for cell_id in info.cells):
+        return None
+
+    end = row_idx
+    while (
+        end + 1 < len(infos)
+        and infos[end + 1].layout == info.layout
+        and infos[end + 1].empty_from(0)
+    ):
+        end += 1
+    if end == row_idx:
+        return None
+
+    if not all(info.has_text):
+        factors.append(_HEADER_BLANK_FACTOR)
+    if end == row_idx + 1:
+        factors.append(_SINGLE_DATA_ROW_FACTOR)
+    return _Block(
+        "RepeatTable",
+        row_idx,
+        end,
+        f"第{row_idx + 1}行为表头，第{row_idx + 2}-{end + 1}行为结构相同的空白数据行",
+    )
+
+
+def _form_block(
+    infos: list[_RowInfo], start: int, end: int, factors: list[float]
+) -> _Block:
+    """连续的表单行，同时记录其中不确定的结构"""
+    for row_idx in range(start, end + 1):
+        info = infos[row_idx]
+        if info.empty_from(0):
+            factors.append(_EMPTY_ROW_FACTOR)
+        elif (
+            row_idx > start
+            and len(info.cells) >= 3
+            and all(info.has_text)
+            and all(infos[row_idx - 1].has_text)
+            and infos[row_idx - 1].layout == info.layout
+        ):
+            factors.append(_FILLED_ROWS_FACTOR)
+    return _Block(
+        "Form", start, end, f"第{start + 1}-{end + 1}行没有表头加空白数据行的重复结构"
+    )
+
+
+__all__ = ["classify_table", "DEFAULT_RULE_THRESHOLD"]
@@ -0,0 +1,497 @@
+"""AI 分割调度
+
+为每个表格生成 VL Map 提示词、调用分割客户端、用 MapVerifier 校验结果，
+校验失败时先尝试本地修复（只处理改动行数不超过 repair_max_rows 的小偏差），
+修复不了或修复后仍不通过才把 ErrorInfo 作为反馈发回模型，在有限次数内重试。
+设置 rule_threshold 时先用结构规则分割，置信度达到阈值且通过验证的表格不调用模型。
+多个表格在并发上限内同时分割；提示词超出 token 预算的表格按行窗口分别分割后拼接。
+"""
+
+import asyncio
+import json
+import time
+from typing import Iterable
+
+from lxml.etree import _Element
+
+from ..core.grid import TableGrid
+from ..core.metrics import count, span
+from ..models import CandidateVerification, ErrorInfo, VerifierMeta
+from ..models.segmentation import (
+    RepairAction,
+    RowWindow,
+    SegmentationResult,
+    SegmentationStats,
+)
+from ..vlmap import ENCODING_VERBOSE, MapVerifier, Vlmap, estimate_tokens
+from .cache import SegmentationCache, table_fingerprint
+from .client import Message, SegmentationClient
+from .repair import MAX_REPAIR_ROWS, repair_metas
+from .rules import classify_table
+from .template_index import TemplateIndex
+from .windowing import plan_windows, stitch_metas
+
+FEEDBACK_TIP = """你给出的分割结果没有通过校验，错误如下：
+{errors}
+请根据错误修正后重新输出完整的 JSON 数组，只返回 JSON，不要其他解释。"""
+
+
+def parse_verifier_metas(content: str) -> list[VerifierMeta]:
+    """
+    从模型回复中解析分割结果
+    允许回复中带有 ```json 代码块等多余内容，只取第一个 [ 到最后一个 ] 之间的部分
+
+    Raises:
+        ValueError: 回复中没有合法的分割结果
+    """
+    start = content.find("[")
+    end = content.rfind("]")
+    if start == -1 or end < start:
+        raise ValueError("回复中没有找到 JSON 数组")
+    raw_result = json.loads(content[start : end + 1])
+    if not isinstance(raw_result, list):
+        raise ValueError("回复的 JSON 不是数组")
+    for index, item in enumerate(raw_result):
+        if not isinstance(item, dict):
+            raise ValueError(f"第{index + 1}个区域不是 JSON 对象")
+    # 字段缺失或类型不符时 pydantic 抛出的 ValidationError 也是 ValueError
+    return [VerifierMeta(**item) for item in raw_result]
+
+
+class Segmenter:
+    """分割调度器"""
+
+    client: SegmentationClient
+    max_retries: int
+    concurrency: int
+    cache: SegmentationCache | None
+    template_index: TemplateIndex | None
+    encoding: str
+    window_tokens: int | None
+    window_overlap: int
+    samples: int
+    sample_temperature: float
+    repair: bool
+    repair_max_rows: int
+    rule_threshold: float | None
+    totals: SegmentationStats
+
+    def __init__(
+        self,
+        client: SegmentationClient,
+        max_retries: int = 2,
+        concurrency: int = 4,
+        cache: SegmentationCache | None = None,
+        template_index: TemplateIndex | None = None,
+        encoding: str = ENCODING_VERBOSE,
+        window_tokens: int | None = None,
+        window_overlap: int = 3,
+        samples: int = 1,
+        sample_temperature: float = 0.7,
+        repair: bool = True,
+        repair_max_rows: int = MAX_REPAIR_ROWS,
+        rule_threshold: float | None = None,
+    ):
+        """
+        Args:
+            client: 分割客户端
+            max_retries: 校验失败后的最大重试次数
+            concurrency: segment_many 同时进行的分割数上限
+            cache: 分割结果缓存，命中且重新验证通过时跳过模型调用
+            template_index: 相似模板索引，映射结果通过验证时跳过模型调用
+            encoding: VL Map 输出格式，verbose | compact | html
+            window_tokens: 单次提示词的估算 token 上限，超出时按行窗口分割，
+                为 None 时不拆分
+            window_overlap: 相邻窗口重叠的行数
+            samples: 每次同时向模型请求的候选数，取第一个通过验证的候选
+            sample_temperature: samples 大于 1 时请求使用的采样温度，必须大于 0，
+                否则各候选完全相同；samples 为 1 时使用客户端的默认温度
+            repair: 校验失败时是否先尝试本地修复，修复后通过验证则不再重试模型
+            repair_max_rows: 本地修复最多改动的行数，超出或需要插入区域时
+                不修复，把错误反馈给模型重试
+            rule_threshold: 规则分割的置信度阈值，达到阈值且通过验证时不调用模型，
+                为 None 时不使用规则分割，推荐值见 rules.DEFAULT_RULE_THRESHOLD
+        """
+        if samples > 1 and sample_temperature <= 0:
+            raise ValueError("samples 大于 1 时 sample_temperature 必须大于 0")
+        self.client = client
+        self.max_retries = max_retries
+        self.concurrency = concurrency
+        self.cache = cache
+        self.template_index = template_index
+        self.encoding = encoding
+        self.window_tokens = window_tokens
+        self.window_overlap = window_overlap
+        self.samples = samples
+        self.sample_temperature = sample_temperature
+        self.repair = repair
+        self.repair_max_rows = repair_max_rows
+        self.rule_threshold = rule_threshold
+        self.totals = SegmentationStats()
+        self._semaphore: asyncio.Semaphore | None = None
+        self._semaphore_loop: asyncio.AbstractEventLoop | None = None
+
+    async def segment(
+        self, table: _Element, grid: TableGrid | None = None
+    ) -> SegmentationResult:
+        """
+        分割单个表格
+
+        Args:
+            table: w:tbl 元素
+            grid: 已解析的表格网格，不提供时由 table 构建
+
+        Returns:
+            分割结果，重试耗尽仍未通过校验时 metas 为 None
+        """
+        started = time.perf_counter()
+        result = SegmentationResult(stats=SegmentationStats(tables=1))
+        if grid is None:
+            grid = TableGrid(table)
+
+        fingerprint = None
+        if self.cache is not None:
+            fingerprint = table_fingerprint(grid)
+            if self._segment_from_cache(fingerprint, grid, result):
+                return self._finish(result, started)
+
+        if self.template_index is not None and self._segment_from_template(
+            grid, result
+        ):
+            if fingerprint is not None:
+                self.cache.put(fingerprint, result.metas)
+            return self._finish(result, started)
+
+        if self.rule_threshold is not None and self._segment_from_rules(grid, result):
+            return self._finish(result, started)
+
+        await self._segment_with_model(table, grid, result)
+        if result.metas is not None:
+            if fingerprint is not None:
+                self.cache.put(fingerprint, result.metas)
+            if self.template_index is not None:
+                self.template_index.add(grid, result.metas)
+        return self._finish(result, started)
+
+    def _segment_from_cache(
+        self, fingerprint: str, grid: TableGrid, result: SegmentationResult
+    ) -> bool:
+        """
+        尝试使用缓存结果，缓存结果必须重新通过 MapVerifier 验证
+
+        Returns:
+            是否命中并通过验证
+        """
+        metas = self.cache.get(fingerprint)
+        if metas is None:
+            return False
+        if self._verify(metas, grid):
+            self.cache.invalidate(fingerprint)
+            return False
+        result.metas = metas
+        result.source = "cache"
+        result.stats.cache_hits = 1
+        return True
+
+    def _segment_from_template(
+        self, grid: TableGrid, result: SegmentationResult
+    ) -> bool:
+        """
+        尝试使用最相近模板映射出的分割结果，映射结果必须通过 MapVerifier 验证
+
+        Returns:
+            是否找到模板并通过验证
+        """
+        match = self.template_index.query(grid)
+        if match is None or not match.metas:
+            return False
+        metas = match.metas
+        if self._verify(metas, grid):
+            metas = self._repair([metas], grid, result.stats, result.repairs)
+            if metas is None:
+                return False
+        result.metas = metas
+        result.source = "template"
+        result.stats.template_hits = 1
+        return True
+
+    def _segment_from_rules(self, grid: TableGrid, result: SegmentationResult) -> bool:
+        """
+        尝试使用结构规则的分割结果，置信度达到阈值后仍需通过 MapVerifier 验证
+        规则结果计算代价很低，不写入缓存与模板索引
+
+        Returns:
+            是否达到阈值并通过验证
+        """
+        with span("rules"):
+            metas, confidence = classify_table(grid)
+        if confidence < self.rule_threshold or not metas:
+            return False
+        if self._verify(metas, grid):
+            return False
+        result.metas = metas
+        result.source = "rules"
+        result.stats.rule_hits = 1
+        return True
+
+    async def _segment_with_model(
+        self, table: _Element, grid: TableGrid, result: SegmentationResult
+    ) -> None:
+        """调用模型分割，提示词超出预算时改为按行窗口分割"""
+        vlmap = Vlmap(table_element=table, grid=grid)
+        with span("vlmap_render"):
+            head, rows, tail = vlmap.render(self.encoding)
+
+        if self.window_tokens is not None:
+            budget = self.window_tokens - vlmap.prompt_overhead(self.encoding)
+            row_tokens = [estimate_tokens(row) for row in rows]
+            if sum(row_tokens) > budget:
+                windows = plan_windows(row_tokens, budget, self.window_overlap)
+                await self._segment_windows(table, grid, windows, result)
+                return
+
+        prompt = head + "".join(rows) + tail + "\n" + vlmap.tip(self.encoding)
+        result.metas, result.errors = await self._segment_prompt(
+            prompt, grid, result.stats, result.repairs
+        )
+        if result.metas is None:
+            result.stats.failures = 1
+
+    async def _segment_windows(
+        self,
+        table: _Element,
+        grid: TableGrid,
+        windows: list[RowWindow],
+        result: SegmentationResult,
+    ) -> None:
+        """各窗口同时分割，全部通过后拼接并对整张表重新验证"""
+        result.stats.windows = len(windows)
+
+        async def run(window: RowWindow):
+            window_grid = TableGrid(rows=grid.rows[window.start : window.end])
+            with span("vlmap_render"):
+                prompt = Vlmap(table_element=table, grid=window_grid).parse_and_tip(
+                    self.encoding
+                )
+            return await self._segment_prompt(
+                prompt, window_grid, result.stats, result.repairs
+            )
+
+        outcomes = await asyncio.gather(*(run(window) for window in windows))
+
+        for window, (metas, errors) in zip(windows, outcomes):
+            if metas is None:
+                result.errors = [
+                    error.model_copy(
+                        update={
+                            "error_msg": f"第{window.start + 1}-{window.end}行窗口: "
+                            f"{error.error_msg}"
+                        }
+                    )
+                    for error in errors
+                ]
+                result.stats.failures = 1
+                return
+
+        metas = stitch_metas(windows, [metas for metas, _ in outcomes])
+        result.errors = self._verify(metas, grid)
+        if result.errors:
+            metas = self._repair([metas], grid, result.stats, result.repairs)
+        if metas is None:
+            result.stats.failures = 1
+        else:
+            result.metas = metas
+            result.errors = []
+
+    async def _segment_prompt(
+        self,
+        prompt: str,
+        grid: TableGrid,
+        stats: SegmentationStats,
+        repairs: list[RepairAction],
+    ) -> tuple[list[VerifierMeta] | None, list[ErrorInfo]]:
+        """
+        发送提示词并校验，校验失败时携带错误信息重试
+        每次请求 samples 个候选，全部未通过时把其中一个候选及其错误作为反馈
+
+        Returns:
+            (通过验证的分割结果, 最后一次验证的错误)，重试耗尽时分割结果为 None
+        """
+        messages: list[Message] = [{"role": "user", "content": prompt}]
+        errors: list[ErrorInfo] = []
+
+        for _ in range(self.max_retries + 1):
+            contents, failure = await self._sample(messages, stats)
+            if not contents:
+                # 所有请求都失败时没有可以反馈的回复，原样重试
+                errors = [
+                    ErrorInfo(source_meta="", error_msg=f"模型调用失败: {failure!r}")
+                ]
+                continue
+            parsed: list[tuple[str, list[VerifierMeta]]] = []
+            unparsed: tuple[str, str] | None = None
+            for content in contents:
+                try:
+                    parsed.append((content, parse_verifier_metas(content)))
+                except ValueError as e:
+                    if unparsed is None:
+                        unparsed = (content, str(e))
+
+            if parsed:
+                outcome = self._verify_many([metas for _, metas in parsed], grid)
+                if outcome.metas is not None:
+                    return outcome.metas, []
+                repaired = self._repair(
+                    [metas for _, metas in parsed], grid, stats, repairs
+                )
+                if repaired is not None:
+                    return repaired, []
+                reply = parsed[outcome.index][0]
+                errors = outcome.errors
+            else:
+                reply, reason = unparsed
+                errors = [
+                    ErrorInfo(
+                        source_meta=reply,
+                        error_msg=f"返回内容不是合法的分割结果: {reason}",
+                    )
+                ]
+            messages.append({"role": "assistant", "content": reply})
+            messages.append({"role": "user", "content": self._feedback(errors)})
+
+        return None, errors
+
+    def _verify(self, metas: list[VerifierMeta], grid: TableGrid) -> list[ErrorInfo]:
+        with span("verify"):
+            errors = MapVerifier(verifier_meta=metas, trs=grid.rows, grid=grid).verify()
+        if errors:
+            count("verification_failures")
+        return errors
+
+    def _verify_many(
+        self, candidates: list[list[VerifierMeta]], grid: TableGrid
+    ) -> CandidateVerification:
+        with span("verify"):
+            outcome = MapVerifier(
+                verifier_meta=[], trs=grid.rows, grid=grid
+            ).verify_many(candidates)
+        if outcome.metas is None:
+            count("verification_failures")
+        return outcome
+
+    def _repair(
+        self,
+        candidates: list[list[VerifierMeta]],
+        grid: TableGrid,
+        stats: SegmentationStats,
+        repairs: list[RepairAction],
+    ) -> list[VerifierMeta] | None:
+        """
+        依次修复未通过验证的候选，返回第一个修复后通过验证的结果
+        并把改动记录追加到 repairs 中，都修复失败时返回 None
+        改动超出 repair_max_rows 或需要插入区域的候选不修复
+        """
+        if not self.repair:
+            return None
+        with span("repair"):
+            for candidate in candidates:
+                metas, actions = repair_metas(candidate, grid, self.repair_max_rows)
+                if metas is None or not actions:
+                    continue
+                verifier = MapVerifier(verifier_meta=metas, trs=grid.rows, grid=grid)
+                if not verifier.verify(fail_fast=True):
+                    repairs.extend(actions)
+                    stats.repairs += 1
+                    return metas
+        return None
+
+    def _finish(self, result: SegmentationResult, started: float) -> SegmentationResult:
+        """记录耗时并累加到总统计"""
+        result.repaired = bool(result.repairs)
+        result.stats.elapsed_seconds = time.perf_counter() - started
+        self.totals.add(result.stats)
+        return result
+
+    async def segment_many(
+        self,
+        tables: Iterable[_Element],
+        grids: list[TableGrid] | None = None,
+    ) -> list[SegmentationResult]:
+        """
+        在并发上限内同时分割多个表格
+        同一事件循环中同时进行的多个 segment_many 共用一个并发上限
+
+        Args:
+            tables: w:tbl 元素
+            grids: 与 tables 一一对应的表格网格，不提供时各自构建
+
+        Returns:
+            与 tables 顺序一致的分割结果
+        """
+        semaphore = self._limiter()
+
+        async def run(table: _Element, grid: TableGrid | None) -> SegmentationResult:
+            async with semaphore:
+                return await self.segment(table, grid)
+
+        tables = list(tables)
+        if grids is None:
+            grids = [None] * len(tables)
+        return await asyncio.gather(
+            *(run(table, grid) for table, grid in zip(tables, grids))
+        )
+
+    def _limiter(self) -> asyncio.Semaphore:
+        """当前事件循环的并发上限，信号量不能跨事件循环使用，换了事件循环时重新创建"""
+        loop = asyncio.get_running_loop()
+        if self._semaphore_loop is not loop:
+            self._semaphore = asyncio.Semaphore(self.concurrency)
+            self._semaphore_loop = loop
+        return self._semaphore
+
+    async def _sample(
+        self, messages: list[Message], stats: SegmentationStats
+    ) -> tuple[list[str], Exception | None]:
+        """
+        同时请求 samples 个回复
+        单个请求失败（网络、HTTP 错误等）只丢弃该候选，不影响其他候选与其他表格
+
+        Returns:
+            (成功的回复的原始文本, 最后一个失败请求的异常)
+        """
+        # 温度为 0 时多个候选完全相同，多候选时改用 sample_temperature；
+        # 单个候选时不传温度，兼容只接受 messages 的自定义客户端
+        options = {"temperature": self.sample_temperature} if self.samples > 1 else {}
+        started = time.perf_counter()
+        with span("ai_wait"):
+            responses = await asyncio.gather(
+                *(
+                    self.client.complete(messages, **options)
+                    for _ in range(self.samples)
+                ),
+                return_exceptions=True,
+            )
+        stats.model_seconds += time.perf_counter() - started
+        contents: list[str] = []
+        failure: Exception | None = None
+        for response in responses:
+            stats.attempts += 1
+            if isinstance(response, BaseException):
+                # 取消等非 Exception 的异常仍然向外传递
+                if not isinstance(response, Exception):
+                    raise response
+                stats.client_errors += 1
+                count("client_errors")
+                failure = response
+                continue
+            stats.prompt_tokens += response.prompt_tokens
+            stats.completion_tokens += response.completion_tokens
+            contents.append(response.content)
+        return contents, failure
+
+    def _feedback(self, error_infos: list[ErrorInfo]) -> str:
+        errors = "\n".join(f"- {error.error_msg}" for error in error_infos)
+        return FEEDBACK_TIP.format(errors=errors)
+
+
+__all__ = ["Segmenter", "parse_verifier_metas", "FEEDBACK_TIP"]
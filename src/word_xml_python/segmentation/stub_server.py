@@ -0,0 +1,122 @@
+"""本地模型桩服务
+
+在本机启动一个 OpenAI Chat Completions 兼容的 HTTP 服务，按预设规则返回回复，
+用于在测试中替代真实模型。responder 抛出异常时返回 HTTP 500，用于模拟模型服务出错:
+
+    with StubModelServer(replies=[bad_json, good_json]) as server:
+        client = OpenAISegmentationClient(server.base_url, model="stub")
+        ...
+"""
+
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable
+
+from .client import Message
+
+# 根据对话消息生成回复内容
+Responder = Callable[[list[Message]], str]
+
+
+class StubModelServer:
+    """本地模型桩服务"""
+
+    def __init__(
+        self,
+        replies: list[str] | None = None,
+        responder: Responder | None = None,
+        host: str = "127.0.0.1",
+        port: int = 0,
+    ):
+        """
+        Args:
+            replies: 依次返回的回复，用完后重复最后一条
+            responder: 自定义回复函数，优先于 replies，抛出异常时返回 HTTP 500
+            host: 监听地址
+            port: 监听端口，0 表示随机端口
+        """
+        if responder is None and not replies:
+            raise ValueError("replies 与 responder 至少需要提供一个")
+        self.replies = list(replies or [])
+        self.responder = responder
+        self.requests: list[list[Message]] = []  # 收到的所有对话消息
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._handler_class())
+        self._thread: threading.Thread | None = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def start(self) -> "StubModelServer":
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def __enter__(self) -> "StubModelServer":
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+    def _reply(self, messages: list[Message]) -> str:
+        with self._lock:
+            self.requests.append(messages)
+            count = len(self.requests)
+        if self.responder is not None:
+            return self.responder(messages)
+        return self.replies[min(count, len(self.replies)) - 1]
+
+    def _handler_class(self) -> type[BaseHTTPRequestHandler]:
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                payload = json.loads(self.rfile.read(length))
+                try:
+                    content = stub._reply(payload.get("messages", []))
+                except Exception as e:
+                    body = str(e).encode("UTF-8")
+                    self.send_response(500)
+                    self.send_header("Content-Type", "text/plain; charset=UTF-8")
+                    self.send_header("Content-Length", str(len(body)))
+                    self.end_headers()
+                    self.wfile.write(body)
+                    return
+                body = json.dumps(
+                    {
+                        "choices": [
+                            {"message": {"role": "assistant", "content": content}}
+                        ],
+                        "usage": {
+                            "prompt_tokens": sum(
+                                len(m.get("content", "")) for m in payload["messages"]
+                            ),
+                            "completion_tokens": len(content),
+                        },
+                    },
+                    ensure_ascii=False,
+                ).encode("UTF-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+
+__all__ = ["StubModelServer", "Responder"]
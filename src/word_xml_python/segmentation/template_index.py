@@ -0,0 +1,313 @@
+"""相似表格模板索引
+
+对已分割过的表格计算 MinHash 签名并建立 LSH 分桶索引。新表格与某个模板只差
+插入的一行或改名的表头时，精确指纹缓存无法命中，但可以在索引中找到最相近的
+模板，再把模板的分割结果按行对齐映射到新表格的行号上，交给 MapVerifier 确认，
+从而避免一次模型调用。
+"""
+
+import difflib
+import hashlib
+import json
+import os
+import threading
+from pathlib import Path
+
+import numpy as np
+from ..core.grid import TableGrid
+from ..models import VerifierMeta
+from ..models.segmentation import TemplateMatch
+from .cache import normalize_text
+
+# MinHash 使用的梅森素数，保证 a * x + b 不会溢出 uint64
+_MERSENNE_PRIME = (1 << 31) - 1
+
+
+def _hash32(token: str) -> int:
+    return int.from_bytes(
+        hashlib.blake2b(token.encode("UTF-8"), digest_size=4).digest(), "little"
+    )
+
+
+def _hash64(token: str) -> int:
+    return int.from_bytes(
+        hashlib.blake2b(token.encode("UTF-8"), digest_size=8).digest(),
+        "little",
+        signed=True,
+    )
+
+
+def table_row_tokens(grid: TableGrid) -> tuple[list[str], list[list[str]]]:
+    """
+    提取表格每一行的结构标记与规范化后的单元格文本
+
+    Returns:
+        (每行的结构标记, 每行各单元格的文本)
+    """
+    structures: list[str] = []
+    texts_by_row: list[list[str]] = []
+    for row_idx in range(grid.row_count):
+        row_cells = grid.row_cells(row_idx)
+        structures.append(
+            ",".join(
+                f"{grid.col_span[cell_id]}:{grid.v_merge[cell_id]}"
+                for cell_id in row_cells
+            )
+        )
+        texts_by_row.append(
+            [normalize_text(grid.text[cell_id]) for cell_id in row_cells]
+        )
+    return structures, texts_by_row
+
+
+def _shingles(structures: list[str], texts_by_row: list[list[str]]) -> set[str]:
+    """MinHash 使用的特征集合：行结构、行结构二元组、单元格文本"""
+    shingles: set[str] = set()
+    for idx, structure in enumerate(structures):
+        shingles.add(f"s:{structure}")
+        if idx > 0:
+            shingles.add(f"b:{structures[idx - 1]}>{structure}")
+    for texts in texts_by_row:
+        shingles.update(f"t:{text}" for text in texts if text)
+    return shingles
+
+
+def _row_hashes(structures: list[str], texts_by_row: list[list[str]]) -> list[int]:
+    """行对齐使用的每行哈希：结构与文本都相同才视为同一行"""
+    return [
+        _hash64(structure + "\x00" + "\x00".join(texts))
+        for structure, texts in zip(structures, texts_by_row)
+    ]
+
+
+class TemplateIndex:
+    """
+    MinHash/LSH 模板索引
+
+    签名保存在连续的 numpy 数组中，每个模板只额外保存每行的 64 位哈希和分割结果，
+    单机可容纳数十万个模板。
+    """
+
+    num_perm: int
+    bands: int
+    min_similarity: float
+
+    def __init__(
+        self,
+        num_perm: int = 64,
+        bands: int = 16,
+        min_similarity: float = 0.6,
+        seed: int = 1,
+    ):
+        """
+        Args:
+            num_perm: MinHash 签名长度
+            bands: LSH 分桶数，num_perm 必须能被整除
+            min_similarity: 接受匹配的最低相似度
+            seed: 哈希函数的随机种子，持久化后加载时必须一致
+        """
+        if num_perm % bands != 0:
+            raise ValueError("num_perm 必须能被 bands 整除")
+        self.num_perm = num_perm
+        self.bands = bands
+        self.min_similarity = min_similarity
+        self.seed = seed
+        rng = np.random.default_rng(seed)
+        self._a = rng.integers(1, _MERSENNE_PRIME, num_perm, dtype=np.uint64)
+        self._b = rng.integers(0, _MERSENNE_PRIME, num_perm, dtype=np.uint64)
+        self._signatures = np.empty((0, num_perm), dtype=np.uint32)
+        self._size = 0
+        self._row_hashes: list[np.ndarray] = []
+        self._metas: list[str] = []
+        self._buckets: list[dict[bytes, list[int]]] = [{} for _ in range(bands)]
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return self._size
+
+    def add(self, grid: TableGrid, metas: list[VerifierMeta]) -> int:
+        """
+        把通过验证的分割结果加入索引
+
+        Args:
+            grid: 表格网格
+            metas: 通过验证的分割结果
+
+        Returns:
+            模板编号
+        """
+        structures, texts_by_row = table_row_tokens(grid)
+        signature = self._signature(_shingles(structures, texts_by_row))
+        row_hashes = np.array(_row_hashes(structures, texts_by_row), dtype=np.int64)
+        raw_metas = json.dumps(
+            [meta.model_dump() for meta in metas], ensure_ascii=False
+        )
+        with self._lock:
+            return self._append(signature, row_hashes, raw_metas)
+
+    def query(self, grid: TableGrid) -> TemplateMatch | None:
+        """
+        查找最相近的模板，并把其分割结果映射到新表格的行号上
+        映射结果需要再经 MapVerifier 确认
+
+        Args:
+            grid: 表格网格
+
+        Returns:
+            匹配结果，没有足够相似的模板时为 None
+        """
+        structures, texts_by_row = table_row_tokens(grid)
+        signature = self._signature(_shingles(structures, texts_by_row))
+
+        with self._lock:
+            candidates = self._candidates(signature)
+            if not candidates:
+                return None
+            ids = np.fromiter(candidates, dtype=np.int64, count=len(candidates))
+            similarities = (self._signatures[ids] == signature).mean(axis=1)
+            best = int(np.argmax(similarities))
+            template_id = int(ids[best])
+            similarity = float(similarities[best])
+            if similarity < self.min_similarity:
+                return None
+            template_rows = self._row_hashes[template_id].tolist()
+            raw_metas = self._metas[template_id]
+
+        new_rows = _row_hashes(structures, texts_by_row)
+        metas = [VerifierMeta(**item) for item in json.loads(raw_metas)]
+        return TemplateMatch(
+            template_id=template_id,
+            similarity=similarity,
+            metas=remap_metas(metas, template_rows, new_rows),
+        )
+
+    def save(self, directory: str | os.PathLike) -> None:
+        """持久化到目录"""
+        path = Path(directory)
+        path.mkdir(parents=True, exist_ok=True)
+        with self._lock:
+            np.save(path / "signatures.npy", self._signatures[: self._size])
+            with open(path / "templates.jsonl", "w", encoding="UTF-8") as f:
+                for row_hashes, raw_metas in zip(self._row_hashes, self._metas):
+                    f.write(
+                        json.dumps(
+                            {"rows": row_hashes.tolist(), "metas": raw_metas},
+                            ensure_ascii=False,
+                        )
+                    )
+                    f.write("\n")
+            (path / "config.json").write_text(
+                json.dumps(
+                    {
+                        "num_perm": self.num_perm,
+                        "bands": self.bands,
+                        "min_similarity": self.min_similarity,
+                        "seed": self.seed,
+                    }
+                ),
+                encoding="UTF-8",
+            )
+
+    @classmethod
+    def load(cls, directory: str | os.PathLike) -> "TemplateIndex":
+        """从目录加载，LSH 分桶在加载时重建"""
+        path = Path(directory)
+        config = json.loads((path / "config.json").read_text(encoding="UTF-8"))
+        index = cls(**config)
+        signatures = np.load(path / "signatures.npy")
+        with open(path / "templates.jsonl", encoding="UTF-8") as f:
+            for signature, line in zip(signatures, f):
+                item = json.loads(line)
+                index._append(
+                    signature, np.array(item["rows"], dtype=np.int64), item["metas"]
+                )
+        return index
+
+    def _signature(self, shingles: set[str]) -> np.ndarray:
+        if not shingles:
+            return np.full(self.num_perm, _MERSENNE_PRIME, dtype=np.uint32)
+        hashes = np.fromiter(
+            (_hash32(s) for s in shingles), dtype=np.uint64, count=len(shingles)
+        )
+        permuted = (self._a[:, None] * hashes[None, :] + self._b[:, None]) % (
+            _MERSENNE_PRIME
+        )
+        return permuted.min(axis=1).astype(np.uint32)
+
+    def _band_keys(self, signature: np.ndarray) -> list[bytes]:
+        rows = self.num_perm // self.bands
+        return [
+            signature[band * rows : (band + 1) * rows].tobytes()
+            for band in range(self.bands)
+        ]
+
+    def _candidates(self, signature: np.ndarray) -> set[int]:
+        candidates: set[int] = set()
+        for bucket, key in zip(self._buckets, self._band_keys(signature)):
+            candidates.update(bucket.get(key, ()))
+        return candidates
+
+    def _append(
+        self, signature: np.ndarray, row_hashes: np.ndarray, raw_metas: str
+    ) -> int:
+        template_id = self._size
+        if template_id == len(self._signatures):
+            # 按倍数扩容，避免每次添加都复制整个数组
+            grown = np.empty((max(16, template_id * 2), self.num_perm), dtype=np.uint32)
+            grown[:template_id] = self._signatures[:template_id]
+            self._signatures = grown
+        self._signatures[template_id] = signature
+        self._size += 1
+        self._row_hashes.append(row_hashes)
+        self._metas.append(raw_metas)
+        for bucket, key in zip(self._buckets, self._band_keys(signature)):
+            bucket.setdefault(key, []).append(template_id)
+        return template_id
+
+
+def remap_metas(
+    metas: list[VerifierMeta], template_rows: list[int], new_rows: list[int]
+) -> list[VerifierMeta]:
+    """
+    把模板的分割结果映射到新表格的行号上
+
+    按行对齐两个表格：相同或一一替换的行继承模板行所属的区域，新插入的行归入
+    前一行所属的区域，被删除的模板行直接丢弃，没有剩余行的区域也一并丢弃。
+
+    Args:
+        metas: 模板的分割结果
+        template_rows: 模板每行的哈希
+        new_rows: 新表格每行的哈希
+
+    Returns:
+        映射后的分割结果（未经验证）
+    """
+    region_of_template_row: dict[int, int] = {}
+    for region_idx, meta in enumerate(metas):
+        for row_num in meta.rows:
+            region_of_template_row[row_num - 1] = region_idx
+
+    owners: list[int | None] = [None] * len(new_rows)
+    matcher = difflib.SequenceMatcher(None, template_rows, new_rows, autojunk=False)
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag in ("equal", "replace"):
+            for offset in range(min(i2 - i1, j2 - j1)):
+                owners[j1 + offset] = region_of_template_row.get(i1 + offset)
+
+    # 插入的行归入前一行的区域，开头插入的行归入之后第一个有归属的区域
+    previous = next((owner for owner in owners if owner is not None), None)
+    for idx, owner in enumerate(owners):
+        if owner is None:
+            owners[idx] = previous
+        else:
+            previous = owner
+
+    remapped: list[VerifierMeta] = []
+    for region_idx, meta in enumerate(metas):
+        rows = [idx + 1 for idx, owner in enumerate(owners) if owner == region_idx]
+        if rows:
+            remapped.append(meta.model_copy(update={"rows": rows}))
+    return remapped
+
+
+__all__ = ["TemplateIndex", "remap_metas", "table_row_tokens"]
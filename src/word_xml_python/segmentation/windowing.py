@@ -0,0 +1,88 @@
+"""大表格分窗口分割
+
+提示词超出 token 预算的表格按行拆成相互重叠的窗口分别分割。每个窗口只对
+重叠区中线以内的行拥有决定权，拼接时把各窗口的区域裁剪到自己负责的行，
+再把在窗口边界两侧相接、类型相同的区域合并为一个区域。
+"""
+
+from ..models import VerifierMeta
+from ..models.segmentation import RowWindow
+
+
+def plan_windows(row_tokens: list[int], budget: int, overlap: int) -> list[RowWindow]:
+    """
+    按每行的估算 token 数拆分窗口
+
+    Args:
+        row_tokens: 每行的估算 token 数
+        budget: 每个窗口中表格行可以使用的 token 数
+        overlap: 相邻窗口重叠的行数
+
+    Returns:
+        覆盖全部行的窗口，只有一个窗口时即为整张表
+    """
+    row_count = len(row_tokens)
+    windows: list[RowWindow] = []
+    start = 0
+    while True:
+        end = start
+        used = 0
+        # 每个窗口至少比重叠区多一行，保证向前推进
+        while end < row_count and (
+            end - start <= overlap or used + row_tokens[end] <= budget
+        ):
+            used += row_tokens[end]
+            end += 1
+        windows.append(RowWindow(start=start, end=end, own_start=0, own_end=end))
+        if end >= row_count:
+            break
+        start = end - overlap
+
+    for previous, current in zip(windows, windows[1:]):
+        boundary = (current.start + previous.end) // 2
+        previous.own_end = boundary
+        current.own_start = boundary
+    return windows
+
+
+def stitch_metas(
+    windows: list[RowWindow], window_metas: list[list[VerifierMeta]]
+) -> list[VerifierMeta]:
+    """
+    把各窗口的分割结果拼接为整张表的分割结果
+
+    Args:
+        windows: plan_windows 给出的窗口
+        window_metas: 每个窗口的分割结果，行号相对窗口从 1 开始
+
+    Returns:
+        行号相对整张表的分割结果（未经验证）
+    """
+    stitched: list[VerifierMeta] = []
+    boundary = None
+    for window, metas in zip(windows, window_metas):
+        for meta in metas:
+            rows = [
+                window.start + row_num
+                for row_num in meta.rows
+                if window.own_start < window.start + row_num <= window.own_end
+            ]
+            if not rows:
+                continue
+            previous = stitched[-1] if stitched else None
+            if (
+                previous is not None
+                and boundary is not None
+                and rows[0] == boundary + 1
+                and previous.rows[-1] == boundary
+                and previous.type == meta.type
+                and previous.split_after_column == meta.split_after_column
+            ):
+                previous.rows.extend(rows)
+                continue
+            stitched.append(meta.model_copy(update={"rows": rows}))
+        boundary = window.own_end
+    return stitched
+
+
+__all__ = ["plan_windows", "stitch_metas"]
@@ -4,16 +4,25 @@ from typing import List
 from ..models import VerifierMeta
 from lxml import etree
 from ..models import TableSplitResult
-from ..core.constants import WORD_NAMESPACES, WORD_NS_URI
+from ..core.grid import TableGrid
+from ..core.query import W_GRID_COL, W_P, W_R, W_T, W_TBL_GRID, W_TC, W_TR
+from ..core.query import child, children, own_descendants
+from ..core.metrics import span
 from .split_verifier import SplitVerifier
 
 
 class TableSplitter:
-    """表格分割器"""
+    """
+    表格分割器
+
+    不修改原表格：表格属性与列定义（tblPr、tblGrid 等非 w:tr 子元素）只复制一次
+    作为模板，每个区域只复制自己的行，分割耗时与区域大小成正比，与表格总行数无关。
+    """
 
     tblElement: _Element
     verifier_meta: List[VerifierMeta]
     _current_template_xml: _Element
+    _template: _Element | None
     _all_tr: List[_Element]
     result: List[TableSplitResult]
 
@@ -21,97 +30,121 @@ class TableSplitter:
         self,
         tblElement: _Element,
         verifier_meta: List[VerifierMeta],
+        grid: TableGrid | None = None,
     ):
+        """
+        Args:
+            tblElement: 表格元素
+            verifier_meta: 通过验证的分割结果
+            grid: 已解析的表格网格，不提供时在需要时构建
+        """
         self.tblElement = tblElement
         self.verifier_meta = verifier_meta
-        self._all_tr = self.tblElement.findall(".//w:tr", WORD_NAMESPACES)
+        self._grid = grid
+        self._template = None
+        self._all_tr = (
+            grid.rows if grid is not None else own_descendants(self.tblElement, W_TR)
+        )
         self.result = []
 
+    @property
+    def grid(self) -> TableGrid:
+        if self._grid is None:
+            self._grid = TableGrid(rows=self._all_tr)
+        return self._grid
+
     def create_template_xml(self) -> _Element:
-        tbl: _Element = deepcopy(self.tblElement)
-        for tr in tbl.findall(".//w:tr", WORD_NAMESPACES):
-            tbl.remove(tr)
+        """不含行的空表格"""
+        if self._template is None:
+            self._template = self._build_template()
+        return deepcopy(self._template)
+
+    def _build_template(self) -> _Element:
+        source = self.tblElement
+        tbl = etree.Element(source.tag, attrib=source.attrib, nsmap=source.nsmap)
+        tbl.text = source.text
+        for node in source:
+            if node.tag != W_TR:
+                tbl.append(deepcopy(node))
         return tbl
 
     def set_current_template_xml(self):
         self.current_template_xml = self.create_template_xml()
 
     def template_xml_to_str(self) -> str:
+        """序列化当前模板，仅供需要字符串的调用方使用"""
         return etree.tostring(
             self.current_template_xml, pretty_print=True, encoding="UTF-8"
         ).decode("UTF-8")
 
     def split(self) -> List[TableSplitResult]:
         verifier_meta = self.verifier_meta
-        for meta in verifier_meta:
-            self.set_current_template_xml()
-            if meta.type == "Form":
-                self._split_form(meta)
-            elif meta.type == "RepeatTable":
-                self._split_repeat_table(meta)
-            elif meta.type == "Left_RepeatTable":
-                self._split_left_repeat_table(meta)
-
-        split_verifier = SplitVerifier(self.result)
-        self.result = split_verifier.verify_and_fix()
+        with span("split"):
+            for meta in verifier_meta:
+                self.set_current_template_xml()
+                if meta.type == "Form":
+                    self._split_form(meta)
+                elif meta.type == "RepeatTable":
+                    self._split_repeat_table(meta)
+                elif meta.type == "Left_RepeatTable":
+                    self._split_left_repeat_table(meta)
+
+        with span("split_verify"):
+            split_verifier = SplitVerifier(self.result)
+            self.result = split_verifier.verify_and_fix()
 
         return self.result
 
-    def _extract_cell_text(self, tc_element: _Element) -> str:
-        texts = []
-        for t in tc_element.findall(".//w:t", WORD_NAMESPACES):
-            if t.text:
-                texts.append(t.text)
-        return "".join(texts)
-
     def _create_single_cell_table(self, text: str) -> _Element:
         tbl = self.create_template_xml()
 
-        tbl_grid = tbl.find(".//w:tblGrid", WORD_NAMESPACES)
+        tbl_grid = child(tbl, W_TBL_GRID)
         if tbl_grid is not None:
-            grid_cols = tbl_grid.findall("w:gridCol", WORD_NAMESPACES)
+            grid_cols = children(tbl_grid, W_GRID_COL)
             for grid_col in grid_cols[1:]:
                 tbl_grid.remove(grid_col)
 
         # tr -> tc -> p -> r -> t
-        tr = etree.Element(f"{{{WORD_NS_URI}}}tr")
-        tc = etree.SubElement(tr, f"{{{WORD_NS_URI}}}tc")
-        p = etree.SubElement(tc, f"{{{WORD_NS_URI}}}p")
-        r = etree.SubElement(p, f"{{{WORD_NS_URI}}}r")
-        t = etree.SubElement(r, f"{{{WORD_NS_URI}}}t")
+        tr = etree.Element(W_TR)
+        tc = etree.SubElement(tr, W_TC)
+        p = etree.SubElement(tc, W_P)
+        r = etree.SubElement(p, W_R)
+        t = etree.SubElement(r, W_T)
         t.text = text
 
         tbl.append(tr)
         return tbl
 
     def _split_form(self, meta: VerifierMeta):
+        self._append_rows(meta.rows, meta.type)
+
+    def _split_repeat_table(self, meta: VerifierMeta):
+        # 重复表只保留表头与第一行数据
+        self._append_rows(meta.rows[:2], meta.type)
+
+    def _append_rows(self, row_nums: List[int], table_type: str):
         current_template_xml = self.current_template_xml
 
-        for row_num in meta.rows:
-            tr = self._all_tr[row_num - 1]
-            current_template_xml.append(tr)
+        for row_num in row_nums:
+            current_template_xml.append(deepcopy(self._all_tr[row_num - 1]))
 
         self.result.append(
-            TableSplitResult(table_xml=self.template_xml_to_str(), table_type=meta.type)
+            TableSplitResult(element=current_template_xml, table_type=table_type)
         )
 
-    def _split_repeat_table(self, meta: VerifierMeta):
-        meta.rows = [meta.rows[0], meta.rows[1]]
-        self._split_form(meta)
-
     def _split_left_repeat_table(self, meta: VerifierMeta):
         split_after_column = (
             meta.split_after_column if meta.split_after_column is not None else 0
         )
 
-        rows_to_process = [self._all_tr[row_num - 1] for row_num in meta.rows]
+        grid = self.grid
 
         for col_idx in range(split_after_column + 1):
             col_texts = []
-            for tr in rows_to_process:
-                tcs = tr.findall(".//w:tc", WORD_NAMESPACES)
-                if col_idx < len(tcs):
-                    cell_text = self._extract_cell_text(tcs[col_idx])
+            for row_num in meta.rows:
+                row_cells = grid.row_cells(row_num - 1)
+                if col_idx < len(row_cells):
+                    cell_text = grid.text[row_cells[col_idx]]
                     if cell_text:
                         col_texts.append(cell_text)
 
@@ -119,45 +152,32 @@ class TableSplitter:
 
             single_cell_table = self._create_single_cell_table(merged_text)
             self.result.append(
-                TableSplitResult(
-                    table_xml=etree.tostring(
-                        single_cell_table, pretty_print=True, encoding="UTF-8"
-                    ).decode("UTF-8"),
-                    table_type="Form",
-                )
+                TableSplitResult(element=single_cell_table, table_type="Form")
             )
 
         right_table = self.create_template_xml()
 
         # 删除 tblGrid 中对应的 gridCol
-        tbl_grid = right_table.find(".//w:tblGrid", WORD_NAMESPACES)
+        tbl_grid = child(right_table, W_TBL_GRID)
         if tbl_grid is not None:
-            grid_cols = tbl_grid.findall("w:gridCol", WORD_NAMESPACES)
+            grid_cols = children(tbl_grid, W_GRID_COL)
             for col_idx in range(split_after_column, -1, -1):
                 if col_idx < len(grid_cols):
                     tbl_grid.remove(grid_cols[col_idx])
 
-        rows_for_repeat = (
-            rows_to_process[:2] if len(rows_to_process) >= 2 else rows_to_process
-        )
-
-        for tr in rows_for_repeat:
-            new_tr = deepcopy(tr)
-            tcs = new_tr.findall(".//w:tc", WORD_NAMESPACES)
+        for row_num in meta.rows[:2]:
+            new_tr = deepcopy(self._all_tr[row_num - 1])
+            tcs = own_descendants(new_tr, W_TC)
 
             for col_idx in range(split_after_column, -1, -1):
                 if col_idx < len(tcs):
-                    new_tr.remove(tcs[col_idx])
+                    tc = tcs[col_idx]
+                    tc.getparent().remove(tc)
 
             right_table.append(new_tr)
 
         self.result.append(
-            TableSplitResult(
-                table_xml=etree.tostring(
-                    right_table, pretty_print=True, encoding="UTF-8"
-                ).decode("UTF-8"),
-                table_type="RepeatTable",
-            )
+            TableSplitResult(element=right_table, table_type="RepeatTable")
         )
 
 
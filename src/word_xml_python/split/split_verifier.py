@@ -1,5 +1,5 @@
-from lxml import etree
-from word_xml_python.core import WORD_NAMESPACES
+from word_xml_python.core.query import W_GRID_SPAN, W_TC, W_TC_PR, W_V_MERGE
+from word_xml_python.core.query import child, own_descendants
 from ..models import TableSplitResult
 from typing import List
 
@@ -20,21 +20,17 @@ class SplitVerifier:
         return self.table_split_result
 
     def _verify_repeat_table(self, result_table: TableSplitResult):
-        table_element = etree.fromstring(result_table.table_xml.encode("UTF-8"))
+        table_element = result_table.table_element
 
-        for cell in table_element.findall(".//w:tc", WORD_NAMESPACES):
-            tc_pr = cell.find("w:tcPr", WORD_NAMESPACES)
+        for cell in own_descendants(table_element, W_TC):
+            tc_pr = child(cell, W_TC_PR)
             if tc_pr is not None:
-                v_merge = tc_pr.find("w:vMerge", WORD_NAMESPACES)
+                v_merge = child(tc_pr, W_V_MERGE)
                 if v_merge is not None:
                     tc_pr.remove(v_merge)
 
-                grid_span = tc_pr.find("w:gridSpan", WORD_NAMESPACES)
+                grid_span = child(tc_pr, W_GRID_SPAN)
                 if grid_span is not None:
                     tc_pr.remove(grid_span)
 
-        result_table.table_xml = etree.tostring(
-            table_element, pretty_print=True, encoding="UTF-8"
-        ).decode("UTF-8")
-
         return result_table
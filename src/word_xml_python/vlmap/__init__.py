@@ -1,4 +1,17 @@
-from .vl_map import Vlmap
+from .vl_map import (
+    ENCODING_COMPACT,
+    ENCODING_HTML,
+    ENCODING_VERBOSE,
+    Vlmap,
+    estimate_tokens,
+)
 from .map_verifier import MapVerifier
 
-__all__ = ["Vlmap", "MapVerifier"]
+__all__ = [
+    "Vlmap",
+    "MapVerifier",
+    "estimate_tokens",
+    "ENCODING_VERBOSE",
+    "ENCODING_COMPACT",
+    "ENCODING_HTML",
+]
@@ -1,10 +1,10 @@
-from dataclasses import asdict
 import json
 from typing import List
 from lxml import etree
+import numpy as np
 
-from word_xml_python.models import VerifierMeta, ErrorInfo
-from word_xml_python.core.constants import WORD_NAMESPACES
+from word_xml_python.models import CandidateVerification, VerifierMeta, ErrorInfo
+from word_xml_python.core.grid import TableGrid
 
 
 """
@@ -28,9 +28,41 @@ MapVerifier 校验规则汇总：
   - RepeatTable：至少 2 行（表头+数据），且第一行必须有内容
   - Left_RepeatTable：至少 2 行，且每行至少 2 列
   - Right_RepeatTable：至少 2 行，且每行至少 2 列
+
+同一个表格的多个候选结果用 verify_many 验证：每行的单元格数与是否有内容只计算一次，
+错误先记录为轻量的 _Issue，只有需要返回时才序列化 source_meta。
 """
 
 
+class _Issue:
+    """未序列化的错误，source 为整个候选（全局校验）或单个区域"""
+
+    __slots__ = ("source", "error_msg")
+
+    def __init__(self, source: List[VerifierMeta] | VerifierMeta, error_msg: str):
+        self.source = source
+        self.error_msg = error_msg
+
+    def to_error_info(self, dumped: dict[int, str]) -> ErrorInfo:
+        """
+        Args:
+            dumped: 已序列化的 source 缓存，同一个候选的全局错误只序列化一次
+        """
+        source_meta = dumped.get(id(self.source))
+        if source_meta is None:
+            if isinstance(self.source, list):
+                payload = [meta.model_dump() for meta in self.source]
+            else:
+                payload = self.source.model_dump()
+            source_meta = json.dumps(payload, ensure_ascii=False)
+            dumped[id(self.source)] = source_meta
+        return ErrorInfo(source_meta=source_meta, error_msg=self.error_msg)
+
+
+class _FailFast(Exception):
+    """fail_fast 时遇到第一个错误即停止校验"""
+
+
 class MapVerifier:
     metas: List[VerifierMeta] = []
     trs: List[etree._Element] = []
@@ -39,83 +71,169 @@ class MapVerifier:
         self,
         verifier_meta: List[VerifierMeta],
         trs: List[etree._Element],
+        grid: TableGrid | None = None,
     ):
-        if verifier_meta and isinstance(verifier_meta[0], dict):
-            self.metas = [VerifierMeta(**meta) for meta in verifier_meta]
-        else:
-            self.metas = verifier_meta
+        """
+        Args:
+            verifier_meta: AI 生成的分割结果，只使用 verify_many 时可以为空
+            trs: 表格的所有行
+            grid: 已解析的表格网格，不提供时在需要时由 trs 构建
+        """
+        self.metas = self._to_metas(verifier_meta)
         self.trs = trs
+        self._grid = grid
+        self._row_cell_counts = None
+        self._row_has_text = None
+
+    @property
+    def grid(self) -> TableGrid:
+        if self._grid is None:
+            self._grid = TableGrid(rows=self.trs)
+        return self._grid
+
+    @property
+    def row_cell_counts(self) -> np.ndarray:
+        """每行的 w:tc 数量"""
+        if self._row_cell_counts is None:
+            self._row_cell_counts = np.diff(np.asarray(self.grid.row_start))
+        return self._row_cell_counts
+
+    @property
+    def row_has_text(self) -> np.ndarray:
+        """每行是否有单元格包含 w:t"""
+        if self._row_has_text is None:
+            grid = self.grid
+            self._row_has_text = np.fromiter(
+                (grid.row_has_text(row_idx) for row_idx in range(grid.row_count)),
+                dtype=bool,
+                count=grid.row_count,
+            )
+        return self._row_has_text
+
+    def verify(self, fail_fast: bool = False) -> List[ErrorInfo]:
+        """
+        验证构造时传入的分割结果
+
+        Args:
+            fail_fast: 遇到第一个错误即停止，只返回这一个错误
+        """
+        issues = self._collect(self.metas, fail_fast)
+        dumped: dict[int, str] = {}
+        return [issue.to_error_info(dumped) for issue in issues]
+
+    def verify_many(
+        self,
+        candidates: List[List[VerifierMeta]],
+        fail_fast: bool = True,
+    ) -> CandidateVerification:
+        """
+        依次验证同一个表格的多个候选分割结果，返回第一个通过验证的候选
+
+        全部未通过时报告一个候选的完整错误：fail_fast 为 True 时每个候选遇到第一个
+        错误即停止，报告第一个候选；为 False 时完整验证每个候选，报告错误最少的。
+        只有报告的候选会生成 ErrorInfo。
+
+        Args:
+            candidates: 候选分割结果
+            fail_fast: 是否在候选遇到第一个错误时即停止对它的验证
+        """
+        failed: list[list[_Issue]] = []
+        for index, candidate in enumerate(candidates):
+            metas = self._to_metas(candidate)
+            issues = self._collect(metas, fail_fast)
+            if not issues:
+                return CandidateVerification(
+                    index=index, metas=metas, checked=index + 1
+                )
+            failed.append(issues)
+
+        if not failed:
+            return CandidateVerification()
+
+        if fail_fast:
+            index = 0
+            issues = self._collect(self._to_metas(candidates[0]), fail_fast=False)
+        else:
+            index = min(range(len(failed)), key=lambda idx: len(failed[idx]))
+            issues = failed[index]
+        dumped: dict[int, str] = {}
+        return CandidateVerification(
+            index=index,
+            errors=[issue.to_error_info(dumped) for issue in issues],
+            checked=len(failed),
+        )
+
+    @staticmethod
+    def _to_metas(verifier_meta) -> List[VerifierMeta]:
+        if verifier_meta and isinstance(verifier_meta[0], dict):
+            return [VerifierMeta(**meta) for meta in verifier_meta]
+        return verifier_meta
 
-    def verify(self) -> List[ErrorInfo]:
-        error_infos: List[ErrorInfo] = []
+    def _collect(self, metas: List[VerifierMeta], fail_fast: bool) -> List[_Issue]:
+        issues: List[_Issue] = []
+        add = issues.append
+        if fail_fast:
 
-        self._verify_trs_len(error_infos)
-        self._verify_rows_coverage(error_infos)
+            def add(issue: _Issue):
+                issues.append(issue)
+                raise _FailFast
 
-        for meta in self.metas:
-            self._verify_meta_rows(meta, error_infos)
-        return error_infos
+        try:
+            self._verify_trs_len(metas, add)
+            self._verify_rows_coverage(metas, add)
 
-    def _verify_trs_len(self, error_infos: List[ErrorInfo]):
+            for meta in metas:
+                self._verify_meta_rows(meta, add)
+        except _FailFast:
+            pass
+        return issues
+
+    def _verify_trs_len(self, metas: List[VerifierMeta], add):
         tr_len = len(self.trs)
-        meta_rows_len = sum(len(meta.rows) for meta in self.metas)
+        meta_rows_len = sum(len(meta.rows) for meta in metas)
         if tr_len != meta_rows_len:
-            error_infos.append(
-                ErrorInfo(
-                    source_meta=json.dumps(
-                        [asdict(meta) for meta in self.metas], ensure_ascii=False
-                    ),
-                    error_msg=f"生成的数据行数，与我给你提供的表格行数不一致，请检查 我提供的表格共{tr_len}行，你生成的数据共{meta_rows_len}行",
+            add(
+                _Issue(
+                    metas,
+                    f"生成的数据行数，与我给你提供的表格行数不一致，请检查 我提供的表格共{tr_len}行，你生成的数据共{meta_rows_len}行",
                 )
             )
 
-    def _verify_rows_coverage(self, error_infos: List[ErrorInfo]):
-        all_rows = []
-        for meta in self.metas:
-            all_rows.extend(meta.rows)
-
-        expected = set(range(1, len(self.trs) + 1))
-        actual = set(all_rows)
-
-        missing = expected - actual
-        if missing:
-            error_infos.append(
-                ErrorInfo(
-                    source_meta=json.dumps(
-                        [asdict(meta) for meta in self.metas], ensure_ascii=False
-                    ),
-                    error_msg=f"以下行号未被任何区域覆盖: {sorted(missing)}",
-                )
-            )
+    def _verify_rows_coverage(self, metas: List[VerifierMeta], add):
+        """
+        用行号计数检查覆盖与重复，行号可能超出范围甚至为负数，
+        先按值去重计数，不在列表上反复 count
+        """
+        all_rows = np.fromiter(
+            (row for meta in metas for row in meta.rows), dtype=np.int64
+        )
+        values, counts = np.unique(all_rows, return_counts=True)
 
-        duplicates = [r for r in all_rows if all_rows.count(r) > 1]
-        if duplicates:
-            error_infos.append(
-                ErrorInfo(
-                    source_meta=json.dumps(
-                        [asdict(meta) for meta in self.metas], ensure_ascii=False
-                    ),
-                    error_msg=f"以下行号被多个区域重复使用: {sorted(set(duplicates))}",
-                )
-            )
+        missing = np.setdiff1d(
+            np.arange(1, len(self.trs) + 1), values, assume_unique=True
+        )
+        if missing.size:
+            add(_Issue(metas, f"以下行号未被任何区域覆盖: {missing.tolist()}"))
+
+        duplicates = values[counts > 1]
+        if duplicates.size:
+            add(_Issue(metas, f"以下行号被多个区域重复使用: {duplicates.tolist()}"))
 
-    def _verify_meta_rows(self, meta: VerifierMeta, error_infos: List[ErrorInfo]):
-        if not self._verify_common_rules(meta, error_infos):
+    def _verify_meta_rows(self, meta: VerifierMeta, add):
+        if not self._verify_common_rules(meta, add):
             return
 
         type = meta.type
         if type == "Form":
-            self._verify_form_type(meta, error_infos)
+            self._verify_form_type(meta, add)
         elif type == "RepeatTable":
-            self._verify_repeat_table_type(meta, error_infos)
+            self._verify_repeat_table_type(meta, add)
         elif type == "Left_RepeatTable":
-            self._verify_left_repeat_table_type(meta, error_infos)
+            self._verify_left_repeat_table_type(meta, add)
         elif type == "Right_RepeatTable":
-            self._verify_right_repeat_table_type(meta, error_infos)
+            self._verify_right_repeat_table_type(meta, add)
 
-    def _verify_common_rules(
-        self, meta: VerifierMeta, error_infos: List[ErrorInfo]
-    ) -> bool:
+    def _verify_common_rules(self, meta: VerifierMeta, add) -> bool:
         """
         验证所有类型通用的基本规则
         1. 行数不能为0
@@ -123,132 +241,91 @@ class MapVerifier:
         3. 行号必须在有效范围内
         """
         if len(meta.rows) < 1:
-            error_infos.append(
-                ErrorInfo(
-                    source_meta=json.dumps(asdict(meta), ensure_ascii=False),
-                    error_msg=f"区域'{meta.name}'行数为0",
-                )
-            )
+            add(_Issue(meta, f"区域'{meta.name}'行数为0"))
             return False
 
         for i in range(1, len(meta.rows)):
             if meta.rows[i] != meta.rows[i - 1] + 1:
-                error_infos.append(
-                    ErrorInfo(
-                        source_meta=json.dumps(asdict(meta), ensure_ascii=False),
-                        error_msg=f"区域'{meta.name}'的行号不连续: {meta.rows}",
-                    )
-                )
+                add(_Issue(meta, f"区域'{meta.name}'的行号不连续: {meta.rows}"))
                 return False
 
-        for row_num in meta.rows:
-            row_idx = row_num - 1
-            if row_idx < 0 or row_idx >= len(self.trs):
-                error_infos.append(
-                    ErrorInfo(
-                        source_meta=json.dumps(asdict(meta), ensure_ascii=False),
-                        error_msg=f"区域'{meta.name}'的行号{row_num}超出表格范围(1-{len(self.trs)})",
-                    )
+        # 行号连续，只需检查首尾，报告第一个超出范围的行号
+        tr_len = len(self.trs)
+        row_num = None
+        if meta.rows[0] < 1:
+            row_num = meta.rows[0]
+        elif meta.rows[-1] > tr_len:
+            row_num = max(meta.rows[0], tr_len + 1)
+        if row_num is not None:
+            add(
+                _Issue(
+                    meta,
+                    f"区域'{meta.name}'的行号{row_num}超出表格范围(1-{tr_len})",
                 )
-                return False
+            )
+            return False
 
         return True
 
-    def _verify_form_type(self, meta: VerifierMeta, error_infos: List[ErrorInfo]):
+    def _verify_form_type(self, meta: VerifierMeta, add):
         """
         验证普通表单类型
         Form类型只需通过公共规则验证即可，无额外特殊要求
         """
         pass
 
-    def _verify_repeat_table_type(
-        self, meta: VerifierMeta, error_infos: List[ErrorInfo]
-    ):
+    def _verify_repeat_table_type(self, meta: VerifierMeta, add):
         """
         验证重复表类型
         1. 至少需要2行（表头+至少1行数据）
         2. 第一行必须有内容（作为表头）
         """
         if len(meta.rows) < 2:
-            error_infos.append(
-                ErrorInfo(
-                    source_meta=json.dumps(asdict(meta), ensure_ascii=False),
-                    error_msg=f"区域'{meta.name}'标记为RepeatTable，但行数<2（至少需要表头+1行数据）",
+            add(
+                _Issue(
+                    meta,
+                    f"区域'{meta.name}'标记为RepeatTable，但行数<2（至少需要表头+1行数据）",
                 )
             )
             return
 
-        first_row_idx = meta.rows[0] - 1
-        first_tr = self.trs[first_row_idx]
-        first_row_cells = first_tr.findall(".//w:tc", WORD_NAMESPACES)
-        first_row_has_content = any(
-            len(tc.findall(".//w:t", WORD_NAMESPACES)) > 0 for tc in first_row_cells
-        )
-
-        if not first_row_has_content:
-            error_infos.append(
-                ErrorInfo(
-                    source_meta=json.dumps(asdict(meta), ensure_ascii=False),
-                    error_msg=f"区域'{meta.name}'标记为RepeatTable，但第一行（第{meta.rows[0]}行）没有内容，无法作为表头",
+        if not self.row_has_text[meta.rows[0] - 1]:
+            add(
+                _Issue(
+                    meta,
+                    f"区域'{meta.name}'标记为RepeatTable，但第一行（第{meta.rows[0]}行）没有内容，无法作为表头",
                 )
             )
 
-    def _verify_left_repeat_table_type(
-        self, meta: VerifierMeta, error_infos: List[ErrorInfo]
-    ):
+    def _verify_left_repeat_table_type(self, meta: VerifierMeta, add):
         """
         验证左重复表类型
         1. 至少需要2行
         2. 每行至少需要2列才能形成左右结构
         """
-        if len(meta.rows) < 2:
-            error_infos.append(
-                ErrorInfo(
-                    source_meta=json.dumps(asdict(meta), ensure_ascii=False),
-                    error_msg=f"区域'{meta.name}'标记为Left_RepeatTable，但行数<2",
-                )
-            )
-            return
-
-        for row_num in meta.rows:
-            row_idx = row_num - 1
-            tr = self.trs[row_idx]
-            cells = tr.findall(".//w:tc", WORD_NAMESPACES)
-            if len(cells) < 2:
-                error_infos.append(
-                    ErrorInfo(
-                        source_meta=json.dumps(asdict(meta), ensure_ascii=False),
-                        error_msg=f"区域'{meta.name}'标记为Left_RepeatTable，但第{row_num}行只有{len(cells)}列，无法形成左右结构",
-                    )
-                )
-                break
+        self._verify_two_sided_type(meta, "Left_RepeatTable", add)
 
-    def _verify_right_repeat_table_type(
-        self, meta: VerifierMeta, error_infos: List[ErrorInfo]
-    ):
+    def _verify_right_repeat_table_type(self, meta: VerifierMeta, add):
         """
         验证右重复表类型
         1. 至少需要2行
         2. 每行至少需要2列才能形成左右结构
         """
+        self._verify_two_sided_type(meta, "Right_RepeatTable", add)
+
+    def _verify_two_sided_type(self, meta: VerifierMeta, type_name: str, add):
         if len(meta.rows) < 2:
-            error_infos.append(
-                ErrorInfo(
-                    source_meta=json.dumps(asdict(meta), ensure_ascii=False),
-                    error_msg=f"区域'{meta.name}'标记为Right_RepeatTable，但行数<2",
-                )
-            )
+            add(_Issue(meta, f"区域'{meta.name}'标记为{type_name}，但行数<2"))
             return
 
-        for row_num in meta.rows:
-            row_idx = row_num - 1
-            tr = self.trs[row_idx]
-            cells = tr.findall(".//w:tc", WORD_NAMESPACES)
-            if len(cells) < 2:
-                error_infos.append(
-                    ErrorInfo(
-                        source_meta=json.dumps(asdict(meta), ensure_ascii=False),
-                        error_msg=f"区域'{meta.name}'标记为Right_RepeatTable，但第{row_num}行只有{len(cells)}列，无法形成左右结构",
-                    )
+        # 通用规则保证行号连续且在范围内，可以直接切片
+        cell_counts = self.row_cell_counts[meta.rows[0] - 1 : meta.rows[-1]]
+        narrow = np.flatnonzero(cell_counts < 2)
+        if narrow.size:
+            offset = int(narrow[0])
+            add(
+                _Issue(
+                    meta,
+                    f"区域'{meta.name}'标记为{type_name}，但第{meta.rows[offset]}行只有{int(cell_counts[offset])}列，无法形成左右结构",
                 )
-                break
+            )
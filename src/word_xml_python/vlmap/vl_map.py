@@ -1,5 +1,8 @@
+import html
+
 from lxml import etree
-from ..core.constants import WORD_NAMESPACES, WORD_NS_URI
+from lxml.etree import _Element
+from ..core.grid import TableGrid, V_MERGE_CONTINUE, V_MERGE_RESTART
 
 MAP_AI_TIP = """
 上面是一个 Word 表格的可视化呈现。
@@ -52,103 +55,175 @@ MAP_AI_TIP = """
 ]只返回 JSON，不要其他解释。
 """
 
+MAP_AI_TIP_COMPACT = """
+上面是一个 Word 表格，{format}
+
+把表格分割成若干内容区域，返回 JSON 数组，每个区域包含：
+- name: 区域名称（中文描述）
+- rows: 行号数组，从 1 开始的连续整数
+- type: "Form"（字段与填写区一一对应）| "RepeatTable"（首行为表头，下方为结构相同的数据行）| "Left_RepeatTable"（左侧标题列 + 右侧重复表）| "Right_RepeatTable"（左侧重复表 + 右侧标题列）
+- reason: 判断理由
+- split_after_column: 仅 Left/Right_RepeatTable 需要，在第几列后切割（从 0 开始）
+
+所有行必须被覆盖，行号不能重复。只返回 JSON，不要其他解释。
+"""
+
+ENCODING_VERBOSE = "verbose"  # 逐行带分隔线的可视化格式
+ENCODING_COMPACT = "compact"  # 无分隔线的紧凑竖线格式
+ENCODING_HTML = "html"  # 带 rowspan/colspan 的 HTML 表格
+ENCODINGS = (ENCODING_VERBOSE, ENCODING_COMPACT, ENCODING_HTML)
+
+_ENCODING_FORMATS = {
+    ENCODING_COMPACT: "每行一条，格式为 行号|单元格|单元格…，空单元格留空，"
+    "[cN] 表示跨 N 列，[rN] 表示跨 N 行。",
+    ENCODING_HTML: "以 HTML 表格表示，tr 的 r 属性为行号，colspan/rowspan 为合并，"
+    "被纵向合并覆盖的单元格省略。",
+}
+
 TABLE_ROW_SEPARATOR_LINE = 70
 
 
+def estimate_tokens(text: str) -> int:
+    """
+    粗略估算文本的 token 数，用于控制提示词长度
+    中日韩字符按 1 个 token 计，其余字符按 4 个字符 1 个 token 计
+    """
+    cjk = sum(1 for char in text if "\u2e80" <= char <= "\u9fff" or "\uff00" <= char)
+    return cjk + (len(text) - cjk + 3) // 4
+
+
 class Vlmap:
-    table_xml_string: str
+    table_xml_string: str | bytes | None
     tree: etree.Element
+    grid: TableGrid | None
     row_span_map: dict[tuple[int, int], int]
 
-    def __init__(self, table_xml_string: str):
+    def __init__(
+        self,
+        table_xml_string: str | bytes | None = None,
+        table_element: _Element | None = None,
+        grid: TableGrid | None = None,
+    ):
+        """
+        Args:
+            table_xml_string: 表格 xml 字符串
+            table_element: 已解析的 w:tbl 元素，传入时不再解析字符串
+            grid: 已解析的表格网格，不提供时在 parse 中构建
+        """
+        if table_element is None and table_xml_string is None:
+            raise ValueError("table_xml_string 与 table_element 至少需要提供一个")
         self.table_xml_string = table_xml_string
-        self.tree = etree.fromstring(self.table_xml_string)
+        self.tree = (
+            table_element
+            if table_element is not None
+            else etree.fromstring(self.table_xml_string)
+        )
+        self.grid = grid
         self.row_span_map = {}
 
-    def parse(self) -> str:
-        vl = ""
-        trs = self.tree.findall(".//w:tr", WORD_NAMESPACES)
-        trLen = len(trs)
-
-        self._calculate_row_spans(trs)
+    def parse(self, encoding: str = ENCODING_VERBOSE) -> str:
+        """
+        Args:
+            encoding: 输出格式，verbose | compact | html
+        """
+        head, rows, tail = self.render(encoding)
+        return head + "".join(rows) + tail
+
+    def parse_and_tip(self, encoding: str = ENCODING_VERBOSE) -> str:
+        vl = self.parse(encoding)
+        return vl + "\n" + self.tip(encoding)
+
+    def tip(self, encoding: str = ENCODING_VERBOSE) -> str:
+        """与输出格式对应的分割提示词"""
+        if encoding == ENCODING_VERBOSE:
+            return MAP_AI_TIP
+        return MAP_AI_TIP_COMPACT.format(format=_ENCODING_FORMATS[encoding])
+
+    def render(self, encoding: str = ENCODING_VERBOSE) -> tuple[str, list[str], str]:
+        """
+        分别渲染表头、每一行与表尾，供按行估算长度与拆分窗口使用
+
+        Returns:
+            (表头, 每行文本, 表尾)
+        """
+        if encoding not in ENCODINGS:
+            raise ValueError(f"不支持的格式: {encoding}")
+        if self.grid is None:
+            self.grid = TableGrid(self.tree)
+        grid = self.grid
 
-        vl += self.print_table_info(trLen)
-        for row_idx, tr in enumerate(trs):
-            vl += self.print_table_row(tr, row_idx)
-        return vl
-
-    def parse_and_tip(self) -> str:
-        vl = self.parse()
-        return vl + "\n" + MAP_AI_TIP
-
-    def _calculate_row_spans(self, trs: list[etree.Element]):
-        col_merge_state = {}
+        self.row_span_map = {}
+        self._calculate_row_spans(grid)
+
+        if encoding == ENCODING_COMPACT:
+            head = f"表格行数: {grid.row_count}\n"
+            rows = [self.print_compact_row(r) for r in range(grid.row_count)]
+            return head, rows, ""
+        if encoding == ENCODING_HTML:
+            head = f"<table rows={grid.row_count}>\n"
+            rows = [self.print_html_row(r) for r in range(grid.row_count)]
+            return head, rows, "</table>\n"
+        head = self.print_table_info(grid.row_count)
+        rows = [self.print_table_row(r) for r in range(grid.row_count)]
+        return head, rows, ""
+
+    def prompt_overhead(self, encoding: str = ENCODING_VERBOSE) -> int:
+        """提示词中与表格行无关部分（表头、表尾、提示）的估算 token 数"""
+        return estimate_tokens(self.tip(encoding)) + 32
+
+    def _calculate_row_spans(self, grid: TableGrid):
+        """
+        一次正向遍历求出所有 restart 单元格的跨行数
+
+        pending 记录尚未结束的行合并，即 restart 单元格在 row_span_map 中的键
+        (行, 列)。每一行先用从该列开始的 vMerge="continue" 单元格延续这些合并，
+        没有延续的合并就此结束；再登记本行的 restart 单元格。单元格的起始列需要
+        跳过延伸到下一行的行合并，因此同时查看下一行的 continue 单元格。
+        """
+        row_span_map = self.row_span_map
+        pending: set[tuple[int, int]] = set()
+        # 每列最近一次登记的行合并，该合并延伸到下一行时本行跳过这一列
+        col_merge_state: dict[int, tuple[int, int]] = {}
+        continues = self._continue_cols(grid, 0)
+
+        for row_idx in range(grid.row_count):
+            next_continues = self._continue_cols(grid, row_idx + 1)
+            for key in list(pending):
+                if key[1] in continues:
+                    row_span_map[key] += 1
+                else:
+                    pending.discard(key)
 
-        for row_idx, tr in enumerate(trs):
-            tcs = tr.findall(".//w:tc", WORD_NAMESPACES)
             col_idx = 0
-
-            for tc in tcs:
-                while col_idx in col_merge_state and col_merge_state[col_idx] > row_idx:
+            for cell_id in grid.row_cells(row_idx):
+                while True:
+                    key = col_merge_state.get(col_idx)
+                    if key not in pending or key[1] not in next_continues:
+                        break
                     col_idx += 1
 
-                tcPr = tc.find(".//w:tcPr", WORD_NAMESPACES)
-                col_span = 1
-
-                if tcPr is not None:
-                    gridSpan = tcPr.find(".//w:gridSpan", WORD_NAMESPACES)
-                    if gridSpan is not None:
-                        col_span = int(gridSpan.get(f"{{{WORD_NS_URI}}}val", "1"))
-
-                    vMerge = tcPr.find(".//w:vMerge", WORD_NAMESPACES)
-                    if vMerge is not None:
-                        vmerge_val = vMerge.get(f"{{{WORD_NS_URI}}}val", "continue")
-
-                        if vmerge_val == "restart":
-                            row_span = self._count_row_span(trs, row_idx, col_idx)
-                            self.row_span_map[(row_idx, col_idx)] = row_span
+                col_span = grid.col_span[cell_id]
 
-                            for c in range(col_idx, col_idx + col_span):
-                                col_merge_state[c] = row_idx + row_span - 1
+                if grid.v_merge[cell_id] == V_MERGE_RESTART:
+                    key = (row_idx, col_idx)
+                    row_span_map[key] = 1
+                    pending.add(key)
+                    for c in range(col_idx, col_idx + col_span):
+                        col_merge_state[c] = key
 
                 col_idx += col_span
-
-    def _count_row_span(
-        self, trs: list[etree.Element], start_row: int, col_idx: int
-    ) -> int:
-        span = 1
-        for row_idx in range(start_row + 1, len(trs)):
-            tr = trs[row_idx]
-            tcs = tr.findall(".//w:tc", WORD_NAMESPACES)
-
-            current_col = 0
-            found = False
-
-            for tc in tcs:
-                if current_col == col_idx:
-                    tcPr = tc.find(".//w:tcPr", WORD_NAMESPACES)
-                    if tcPr is not None:
-                        vMerge = tcPr.find(".//w:vMerge", WORD_NAMESPACES)
-                        if vMerge is not None:
-                            vmerge_val = vMerge.get(f"{{{WORD_NS_URI}}}val", "continue")
-                            if vmerge_val == "continue" or vmerge_val is None:
-                                span += 1
-                                found = True
-                                break
-                    break
-
-                tcPr = tc.find(".//w:tcPr", WORD_NAMESPACES)
-                col_span = 1
-                if tcPr is not None:
-                    gridSpan = tcPr.find(".//w:gridSpan", WORD_NAMESPACES)
-                    if gridSpan is not None:
-                        col_span = int(gridSpan.get(f"{{{WORD_NS_URI}}}val", "1"))
-                current_col += col_span
-
-            if not found:
-                break
-
-        return span
+            continues = next_continues
+
+    @staticmethod
+    def _continue_cols(grid: TableGrid, row_idx: int) -> set[int]:
+        """第 row_idx 行中 vMerge="continue" 单元格的起始网格列，超出表格时为空"""
+        if row_idx >= grid.row_count:
+            return set()
+        return {
+            grid.cell_col[cell_id]
+            for cell_id in grid.row_cells(row_idx)
+            if grid.v_merge[cell_id] == V_MERGE_CONTINUE
+        }
 
     def print_table_info(self, trLen: int) -> str:
         table_info = ""
@@ -160,56 +235,71 @@ class Vlmap:
         table_info += "\n"
         return table_info
 
-    def print_table_row(self, tr: etree.Element, row_idx: int) -> str:
-        cells = []
-        col_idx = 0
-
-        for tc in tr.findall(".//w:tc", WORD_NAMESPACES):
-            cells.append(self.print_table_cell(tc, row_idx, col_idx))
-
-            tcPr = tc.find(".//w:tcPr", WORD_NAMESPACES)
-            col_span = 1
-            if tcPr is not None:
-                gridSpan = tcPr.find(".//w:gridSpan", WORD_NAMESPACES)
-                if gridSpan is not None:
-                    col_span = int(gridSpan.get(f"{{{WORD_NS_URI}}}val", "1"))
-            col_idx += col_span
+    def print_table_row(self, row_idx: int) -> str:
+        grid = self.grid
+        cells = [
+            self.print_table_cell(cell_id, row_idx, grid.cell_col[cell_id])
+            for cell_id in grid.row_cells(row_idx)
+        ]
 
         row_info = f"第{row_idx + 1}行 | " + " | ".join(cells) + " |\n"
         row_info += "-" * TABLE_ROW_SEPARATOR_LINE + "\n"
         return row_info
 
-    def print_table_cell(self, tc: etree.Element, row_idx: int, col_idx: int) -> str:
-        wts = tc.findall(".//w:t", WORD_NAMESPACES)
-
-        tcPr = tc.find(".//w:tcPr", WORD_NAMESPACES)
+    def print_table_cell(self, cell_id: int, row_idx: int, col_idx: int) -> str:
+        grid = self.grid
         merge_info = ""
 
-        if tcPr is not None:
-            gridSpan = tcPr.find(".//w:gridSpan", WORD_NAMESPACES)
-            vMerge = tcPr.find(".//w:vMerge", WORD_NAMESPACES)
-
-            col_span = 1
-            row_span = 0
-
-            if gridSpan is not None:
-                col_span = int(gridSpan.get(f"{{{WORD_NS_URI}}}val", "1"))
-
-            if vMerge is not None:
-                vmerge_val = vMerge.get(f"{{{WORD_NS_URI}}}val", "continue")
-                if vmerge_val == "restart":
-                    row_span = self.row_span_map.get((row_idx, col_idx), 1)
+        col_span, row_span = self._cell_spans(cell_id, row_idx, col_idx)
 
-            if col_span > 1 or row_span > 1:
-                merge_parts = []
-                if col_span > 1:
-                    merge_parts.append(f"跨{col_span}列")
-                if row_span > 1:
-                    merge_parts.append(f"跨{row_span}行")
-                merge_info = f"[{','.join(merge_parts)}]"
+        if col_span > 1 or row_span > 1:
+            merge_parts = []
+            if col_span > 1:
+                merge_parts.append(f"跨{col_span}列")
+            if row_span > 1:
+                merge_parts.append(f"跨{row_span}行")
+            merge_info = f"[{','.join(merge_parts)}]"
 
-        if len(wts) > 0:
-            content = "".join(wt.text or "" for wt in wts)
+        if grid.has_text[cell_id]:
+            content = grid.text[cell_id]
             return f"{content}{merge_info}" if merge_info else content
         else:
             return f"(空){merge_info}" if merge_info else "(空)"
+
+    def print_compact_row(self, row_idx: int) -> str:
+        grid = self.grid
+        cells = []
+        for cell_id in grid.row_cells(row_idx):
+            col_span, row_span = self._cell_spans(
+                cell_id, row_idx, grid.cell_col[cell_id]
+            )
+            merge_info = ""
+            if col_span > 1:
+                merge_info += f"c{col_span}"
+            if row_span > 1:
+                merge_info += f"r{row_span}"
+            cell = grid.text[cell_id]
+            cells.append(f"{cell}[{merge_info}]" if merge_info else cell)
+        return f"{row_idx + 1}|" + "|".join(cells) + "\n"
+
+    def print_html_row(self, row_idx: int) -> str:
+        grid = self.grid
+        cells = []
+        for cell_id in grid.row_cells(row_idx):
+            # 被纵向合并覆盖的单元格与 HTML 一样省略
+            if grid.merge_root[cell_id] != cell_id:
+                continue
+            attrs = ""
+            if grid.col_span[cell_id] > 1:
+                attrs += f' colspan="{grid.col_span[cell_id]}"'
+            if grid.row_span[cell_id] > 1:
+                attrs += f' rowspan="{grid.row_span[cell_id]}"'
+            cells.append(f"<td{attrs}>{html.escape(grid.text[cell_id])}</td>")
+        return f'<tr r="{row_idx + 1}">' + "".join(cells) + "</tr>\n"
+
+    def _cell_spans(self, cell_id: int, row_idx: int, col_idx: int) -> tuple[int, int]:
+        """单元格的跨列数与跨行数，非 restart 单元格的跨行数为 0"""
+        row_span = 0
+        if self.grid.v_merge[cell_id] == V_MERGE_RESTART:
+            row_span = self.row_span_map.get((row_idx, col_idx), 1)
+        return self.grid.col_span[cell_id], row_span
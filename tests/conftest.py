@@ -0,0 +1,144 @@
+"""测试用的合成表格，由 benchmarks/generator.py 生成，同时给出正确的分割结果"""
+
+import threading
+
+import pytest
+from lxml import etree
+from psycopg2.errors import QueryCanceledError
+
+from benchmarks.generator import TableSpec, build_table
+from word_xml_python.core.grid import TableGrid
+from word_xml_python.models import VerifierMeta
+
+
+class SyntheticTable:
+    """合成表格及其正确的分割结果"""
+
+    __slots__ = ("table", "grid", "metas")
+
+    def __init__(self, spec: TableSpec):
+        self.table, raw_metas = build_table(spec)
+        self.grid = TableGrid(self.table)
+        self.metas = [VerifierMeta(**meta) for meta in raw_metas]
+
+    @property
+    def rows(self) -> list[etree._Element]:
+        return self.grid.rows
+
+
+@pytest.fixture
+def synthetic():
+    """按参数生成合成表格，默认 20 行、不含左重复表"""
+
+    def make(**kwargs) -> SyntheticTable:
+        options = {"rows": 20, "cols": 4, "vmerge_density": 0.0, "seed": 1}
+        options.update(kwargs)
+        return SyntheticTable(TableSpec(**options))
+
+    return make
+
+
+class FakeCursor:
+    """记录执行的语句，fetchone 依次返回 rows 中的结果"""
+
+    def __init__(self, connection: "FakeConnection"):
+        self.connection = connection
+        self.rowcount = 1
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, sql, params=()):
+        self.connection.execute(sql)
+
+    def fetchone(self):
+        return self.connection.rows.pop(0) if self.connection.rows else (1,)
+
+    def fetchall(self):
+        rows, self.connection.rows = self.connection.rows, []
+        return rows
+
+    def copy_expert(self, sql, file):
+        self.connection.copy(sql, file)
+
+
+class FakeConnection:
+    """不连接数据库的连接，errors 中的异常在对应次数的 execute 时抛出"""
+
+    def __init__(self, pool: "FakePool"):
+        self.pool = pool
+        self.closed = 0
+        self.rows: list[tuple] = []
+        self.commits = 0
+        self.rollbacks = 0
+        self.cancelled = threading.Event()
+
+    def cursor(self):
+        return FakeCursor(self)
+
+    def execute(self, sql):
+        self.pool.statements.append(sql)
+        if self.pool.errors:
+            error = self.pool.errors.pop(0)
+            if error is not None:
+                raise error
+
+    def copy(self, sql, file):
+        """COPY TO：写出 pool.copy_chunks，pool.block_copy 时等待取消"""
+        self.execute(sql)
+        for chunk in self.pool.copy_chunks:
+            file.write(chunk)
+        if self.pool.block_copy:
+            self.cancelled.wait(timeout=5)
+            raise QueryCanceledError("canceling statement due to user request")
+
+    def cancel(self):
+        self.cancelled.set()
+
+    def commit(self):
+        self.commits += 1
+
+    def rollback(self):
+        self.rollbacks += 1
+
+
+class FakePool:
+    """与 ThreadedConnectionPool 接口相同，记录借出、归还与关闭的连接"""
+
+    def __init__(self):
+        self.idle: list[FakeConnection] = []
+        self.created = 0
+        self.discarded = 0
+        self.statements: list[str] = []
+        self.errors: list[Exception | None] = []
+        self.copy_chunks: list[bytes] = []
+        self.block_copy = False
+
+    def getconn(self) -> FakeConnection:
+        if self.idle:
+            return self.idle.pop()
+        self.created += 1
+        return FakeConnection(self)
+
+    def putconn(self, conn: FakeConnection, close: bool = False) -> None:
+        if close:
+            conn.closed = 1
+            self.discarded += 1
+        else:
+            self.idle.append(conn)
+
+    def closeall(self) -> None:
+        self.idle.clear()
+
+
+@pytest.fixture
+def fake_database():
+    """使用 FakePool 的 Database，pool 属性即为 FakePool"""
+    from word_xml_python.apis.database.database import Database
+
+    database = Database("postgresql://fake", min_connections=1, max_connections=2)
+    database._pool = FakePool()
+    return database
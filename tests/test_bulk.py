@@ -0,0 +1,96 @@
+import asyncio
+
+import pytest
+
+from word_xml_python.apis.database.bulk import (
+    CHUNK_SIZE,
+    _ChunkReader,
+    _csv_columns,
+    import_records,
+    stream_export,
+)
+
+
+def _columns(*chunks: bytes) -> list[str]:
+    return _csv_columns(_ChunkReader(chunks))
+
+
+def test_csv_header():
+    assert _columns(b"label_key,type,options\n") == ["label_key", "type", "options"]
+
+
+def test_csv_header_with_bom_and_spaces():
+    header = b"\xef\xbb\xbflabel_key, type ,hit_count\r\n"
+    assert _columns(header) == ["label_key", "type", "hit_count"]
+
+
+def test_csv_header_split_across_chunks():
+    assert _columns(b"label_", b"key,ty", b"pe\nx,y\n") == ["label_key", "type"]
+
+
+def test_header_leaves_rows_for_copy():
+    reader = _ChunkReader([b"label_key,type\n", b"a,Form\nb,RepeatTable\n"])
+    _csv_columns(reader)
+    assert reader.read() == b"a,Form\nb,RepeatTable\n"
+
+
+@pytest.mark.parametrize(
+    "header, message",
+    [
+        (b"label_key,type,colour\n", "未知的列"),
+        (b"label_key,type,type\n", "重复的列"),
+        (b"label_key, label_key ,type\n", "重复的列"),
+        (b"label_key,options\n", "缺少必需的列"),
+        (b"\n", "缺少必需的列"),
+    ],
+)
+def test_invalid_csv_header(header, message):
+    with pytest.raises(ValueError, match=message):
+        _columns(header)
+
+
+def test_import_rejects_header_before_connecting():
+    # 表头不合法时在借出连接之前报错
+    with pytest.raises(ValueError, match="重复的列"):
+        import_records(None, [b"label_key,type,label_key\n"], "csv")
+
+
+def test_import_rejects_unknown_format():
+    with pytest.raises(ValueError, match="不支持的格式"):
+        import_records(None, [], "xlsx")
+
+
+async def _read_first(db, format: str) -> bytes:
+    chunks = stream_export(db, format)
+    try:
+        return await anext(chunks)
+    finally:
+        await chunks.aclose()
+
+
+async def _read_all(db, format: str) -> bytes:
+    return b"".join([chunk async for chunk in stream_export(db, format)])
+
+
+def test_stream_export(fake_database):
+    pool = fake_database.pool
+    pool.copy_chunks = [b'{"label_key":"a\\\\b"}\n', b'{"label_key":"c"}\n']
+    data = asyncio.run(_read_all(fake_database, "ndjson"))
+    assert data == b'{"label_key":"a\\b"}\n{"label_key":"c"}\n'
+    assert (pool.created, len(pool.idle), pool.discarded) == (1, 1, 0)
+
+
+def test_cancelled_export_returns_connection(fake_database):
+    pool = fake_database.pool
+    asyncio.run(_read_all(fake_database, "csv"))
+    idle = len(pool.idle)
+
+    # 客户端读到第一个数据块后断开，COPY 等待服务器数据时被取消
+    pool.copy_chunks = [b"x" * CHUNK_SIZE]
+    pool.block_copy = True
+    assert asyncio.run(_read_first(fake_database, "csv")) == b"x" * CHUNK_SIZE
+
+    (conn,) = pool.idle
+    assert conn.cancelled.is_set()
+    assert conn.rollbacks == 1
+    assert (pool.created, len(pool.idle), pool.discarded) == (1, idle, 0)
@@ -0,0 +1,127 @@
+import pytest
+
+from word_xml_python.core.grid import TableGrid
+from word_xml_python.core.query import W_T
+from word_xml_python.segmentation import SegmentationCache, table_fingerprint
+
+
+def _set_text(table, row_idx: int, text: str) -> None:
+    """把第 row_idx 行第一个 w:t 的文本改为 text"""
+    next(table.rows[row_idx].iter(W_T)).text = text
+
+
+def _fingerprint(table) -> str:
+    return table_fingerprint(TableGrid(table.table))
+
+
+@pytest.fixture
+def cache_dir(tmp_path):
+    return tmp_path / "cache"
+
+
+def test_fingerprint_ignores_body_text(synthetic):
+    table = synthetic()
+    before = _fingerprint(table)
+    _set_text(table, 1, "已填写的内容")
+    assert _fingerprint(table) == before
+    assert _fingerprint(synthetic()) == before
+
+
+def test_fingerprint_normalizes_header_text(synthetic):
+    table = synthetic()
+    _set_text(table, 0, "Name")
+    before = _fingerprint(table)
+    _set_text(table, 0, " ｎａｍｅ ")
+    assert _fingerprint(table) == before
+    _set_text(table, 0, "Title")
+    assert _fingerprint(table) != before
+
+
+def test_fingerprint_depends_on_layout(synthetic):
+    assert _fingerprint(synthetic(seed=1)) != _fingerprint(synthetic(seed=2))
+    assert _fingerprint(synthetic(rows=20)) != _fingerprint(synthetic(rows=21))
+
+
+def test_put_and_get(synthetic):
+    table = synthetic()
+    cache = SegmentationCache()
+    fingerprint = _fingerprint(table)
+    assert cache.get(fingerprint) is None
+    cache.put(fingerprint, table.metas)
+
+    metas = cache.get(fingerprint)
+    assert metas == table.metas
+    # 取出的结果互相独立
+    metas[0].rows.append(999)
+    assert cache.get(fingerprint) == table.metas
+    assert cache.stats() == {
+        "entries": 1,
+        "hits": 2,
+        "disk_hits": 0,
+        "misses": 1,
+        "invalidations": 0,
+        "corrupted": 0,
+    }
+
+
+def test_lru_eviction(synthetic):
+    table = synthetic()
+    cache = SegmentationCache(max_entries=2)
+    cache.put("a", table.metas)
+    cache.put("b", table.metas)
+    cache.get("a")
+    cache.put("c", table.metas)
+    assert cache.get("b") is None
+    assert cache.get("a") == table.metas
+    assert cache.get("c") == table.metas
+
+
+def test_invalidate(synthetic, cache_dir):
+    table = synthetic()
+    cache = SegmentationCache(directory=cache_dir)
+    cache.put("ab12", table.metas)
+    cache.invalidate("ab12")
+    assert cache.get("ab12") is None
+    assert SegmentationCache(directory=cache_dir).get("ab12") is None
+    assert cache.stats()["invalidations"] == 1
+
+
+def test_disk_layer_survives_restart(synthetic, cache_dir):
+    table = synthetic()
+    fingerprint = _fingerprint(table)
+    SegmentationCache(directory=cache_dir).put(fingerprint, table.metas)
+    # 原子替换，不留下临时文件
+    assert [path.suffix for path in cache_dir.rglob("*")] == ["", ".json"]
+
+    cache = SegmentationCache(directory=cache_dir)
+    assert cache.get(fingerprint) == table.metas
+    assert cache.get(fingerprint) == table.metas
+    stats = cache.stats()
+    assert (stats["disk_hits"], stats["hits"]) == (1, 1)
+
+
+@pytest.mark.parametrize(
+    "content",
+    [
+        b'[{"name": "\xe8\xa1',
+        b"\xff\xfe\x00",
+        b'{"name": "x"}',
+        b"[1, 2]",
+        b'[{"name": "x"}]',
+    ],
+)
+def test_corrupted_entry_is_a_miss(synthetic, cache_dir, content):
+    table = synthetic()
+    fingerprint = _fingerprint(table)
+    SegmentationCache(directory=cache_dir).put(fingerprint, table.metas)
+    (path,) = cache_dir.rglob("*.json")
+    path.write_bytes(content)
+
+    cache = SegmentationCache(directory=cache_dir)
+    assert cache.get(fingerprint) is None
+    assert not path.exists()
+    assert cache.stats()["corrupted"] == 1
+    assert cache.stats()["misses"] == 1
+
+    cache.put(fingerprint, table.metas)
+    assert SegmentationCache(directory=cache_dir).get(fingerprint) == table.metas
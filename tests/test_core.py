@@ -0,0 +1,133 @@
+import copy
+import io
+import json
+import zipfile
+from pathlib import Path
+
+import pytest
+from lxml import etree
+
+from benchmarks.generator import DocumentSpec, TableSpec, write_docx
+from word_xml_python.core.core import Core
+from word_xml_python.core.docx_reader import iter_tables
+from word_xml_python.core.manifest import table_content_hash
+from word_xml_python.core.query import W_TBL, qn
+from word_xml_python.segmentation import Segmenter, StaticSegmentationClient
+
+# 示例文档的根节点声明了大量没有用到的命名空间
+SAMPLE_DOCS = sorted((Path(__file__).parent.parent / "word").glob("*.docx"))
+
+
+@pytest.fixture
+def docx(tmp_path):
+    """6 个结构不同的顶层表格，部分表格带有嵌套表格"""
+    path = tmp_path / "tables.docx"
+    write_docx(
+        path,
+        DocumentSpec(
+            table=TableSpec(rows=12, cols=4, vmerge_density=0.5, nested=1),
+            tables=6,
+            paragraphs=1,
+        ),
+    )
+    return path
+
+
+def _core(path, concurrency: int) -> Core:
+    # 规则分割覆盖全部表格，固定结果只在规则不适用时使用
+    segmenter = Segmenter(
+        StaticSegmentationClient("[]"),
+        max_retries=0,
+        concurrency=concurrency,
+        rule_threshold=0.0,
+    )
+    return Core(path, segmenter=segmenter)
+
+
+def _stream(path, concurrency: int) -> list:
+    return [
+        None if results is None else [result.model_dump() for result in results]
+        for results in _core(path, concurrency).start_all_by_stream()
+    ]
+
+
+def test_pipelined_matches_sequential(docx):
+    sequential = _stream(docx, concurrency=1)
+    assert len(sequential) == 12
+    assert all(results for results in sequential)
+    assert _stream(docx, concurrency=4) == sequential
+    assert _stream(docx, concurrency=64) == sequential
+
+
+@pytest.mark.parametrize("name", ["generated"] + [path.name for path in SAMPLE_DOCS])
+def test_pipelined_hashes_match_sequential(docx, name):
+    path = docx if name == "generated" else SAMPLE_DOCS[0].parent / name
+    sequential = _core(path, concurrency=1).start_incremental()
+    pipelined = _core(path, concurrency=4).start_incremental()
+    assert [entry.content_hash for entry in pipelined.tables] == [
+        entry.content_hash for entry in sequential.tables
+    ]
+    assert pipelined.results() == sequential.results()
+
+    # 一种并发设置下保存的清单在另一种设置下全部复用
+    again = _core(path, concurrency=4).start_incremental(sequential)
+    assert again.reused_count == len(sequential.tables)
+    assert again.results() == sequential.results()
+
+
+@pytest.mark.parametrize("path", SAMPLE_DOCS, ids=lambda path: path.name)
+def test_content_hash_ignores_namespace_declarations(path):
+    for table in iter_tables(path):
+        # 文档中的元素带有根节点上的全部命名空间声明，副本只声明用到的
+        assert table_content_hash(copy.deepcopy(table)) == table_content_hash(table)
+
+
+def _host_links(results) -> list:
+    return [
+        None if table is None else {(r.parent_table, r.host_cell_key) for r in table}
+        for table in results
+    ]
+
+
+def test_nested_results_link_to_host_cell(docx):
+    results = list(_core(docx, concurrency=4).start_all_by_stream())
+    # 每个顶层表格之后紧跟其嵌套表格
+    links = _host_links(results)
+    assert links[0::2] == [{(None, None)}] * 6
+    for idx in range(1, 12, 2):
+        ((parent_table, host_cell_key),) = links[idx]
+        assert parent_table == idx - 1
+        host_keys = {
+            cell.key
+            for result in results[parent_table]
+            for cell in result.cell_info_list
+        }
+        assert host_cell_key in host_keys
+
+
+def test_ndjson_cell_lines_carry_host_links(docx):
+    lines = [json.loads(line) for line in _core(docx, 1).iter_ndjson("cell")]
+    nested = [line for line in lines if line["table"] % 2]
+    assert nested and all(line["parent_table"] == line["table"] - 1 for line in nested)
+    assert all("parent_table" not in line for line in lines if line["table"] % 2 == 0)
+
+
+def test_incremental_relinks_moved_nested_tables(docx, tmp_path):
+    previous = _core(docx, concurrency=1).start_incremental()
+
+    # 在文档开头插入第一个表格的副本，原有表格的序号整体后移 2
+    with zipfile.ZipFile(docx) as archive:
+        document = etree.parse(io.BytesIO(archive.read("word/document.xml")))
+    body = document.getroot().find(qn("w:body"))
+    body.insert(0, copy.deepcopy(body.find(W_TBL)))
+    moved = tmp_path / "document.xml"
+    document.write(str(moved))
+
+    manifest = _core(moved, concurrency=1).start_incremental(previous)
+    assert manifest.reused_count == len(manifest.tables) == 14
+    results = manifest.results()
+    assert _host_links(results)[1] == _host_links(previous.results())[1]
+    assert _host_links(results)[2:] == [
+        None if links is None else {(p if p is None else p + 2, k) for p, k in links}
+        for links in _host_links(previous.results())
+    ]
@@ -0,0 +1,66 @@
+import asyncio
+
+import psycopg2
+from psycopg2.errors import UniqueViolation
+import pytest
+
+from word_xml_python.apis.database.database import Database
+
+
+def _select(cur):
+    cur.execute("SELECT 1")
+    return cur.fetchone()
+
+
+def test_commit_and_reuse(fake_database):
+    pool = fake_database.pool
+    assert asyncio.run(fake_database.fetchone("SELECT 1")) == (1,)
+    assert asyncio.run(fake_database.execute("UPDATE weight_record SET x = 1")) == 1
+    (conn,) = pool.idle
+    assert (pool.created, conn.commits, conn.rollbacks) == (1, 2, 0)
+
+
+def test_retry_before_first_statement(fake_database):
+    pool = fake_database.pool
+    pool.errors = [psycopg2.OperationalError("连接已断开")]
+    assert fake_database.run_sync(_select) == (1,)
+    # 断开的连接被丢弃，换一个新连接重试
+    assert (pool.created, pool.discarded, len(pool.idle)) == (2, 1, 1)
+    assert pool.statements == ["SELECT 1", "SELECT 1"]
+
+
+def test_no_retry_after_statement_ran(fake_database):
+    pool = fake_database.pool
+    pool.errors = [None, psycopg2.OperationalError("连接已断开")]
+
+    def work(cur):
+        cur.execute("UPDATE weight_record SET hit_count = hit_count + 1")
+        cur.execute("SELECT 1")
+
+    with pytest.raises(psycopg2.OperationalError):
+        fake_database.run_sync(work)
+    assert len(pool.statements) == 2
+    assert (pool.discarded, len(pool.idle)) == (1, 0)
+
+
+def test_second_connection_error_is_raised(fake_database):
+    pool = fake_database.pool
+    pool.errors = [psycopg2.InterfaceError("连接已关闭")] * 2
+    with pytest.raises(psycopg2.InterfaceError):
+        fake_database.run_sync(_select)
+    assert pool.discarded == 2
+
+
+def test_other_errors_roll_back(fake_database):
+    pool = fake_database.pool
+    pool.errors = [UniqueViolation("重复的键")]
+    with pytest.raises(psycopg2.IntegrityError):
+        fake_database.run_sync(_select)
+    # 语句错误不重试，连接回滚后放回连接池
+    (conn,) = pool.idle
+    assert (conn.rollbacks, conn.commits, pool.discarded) == (1, 0, 0)
+
+
+def test_pool_limits_are_validated():
+    with pytest.raises(ValueError):
+        Database("postgresql://fake", min_connections=3, max_connections=2)
@@ -0,0 +1,38 @@
+import pytest
+from lxml import etree
+
+from benchmarks.generator import DocumentSpec, TableSpec, build_document
+from word_xml_python.core.query import W_TBL
+from word_xml_python.vlmap import MapVerifier
+
+
+@pytest.mark.parametrize("vmerge_density", [0.0, 0.5, 1.0])
+@pytest.mark.parametrize("rows", [2, 7, 20])
+def test_metas_pass_verification(synthetic, vmerge_density, rows):
+    table = synthetic(rows=rows, vmerge_density=vmerge_density)
+    assert table.grid.row_count == rows
+    assert [row for meta in table.metas for row in meta.rows] == list(
+        range(1, rows + 1)
+    )
+    assert MapVerifier(table.metas, table.rows, table.grid).verify() == []
+
+
+def test_same_seed_same_table(synthetic):
+    first, second = synthetic(span_density=0.5), synthetic(span_density=0.5)
+    assert first.metas == second.metas
+    assert first.grid.col_span == second.grid.col_span
+
+
+def test_nested_tables(synthetic):
+    table = synthetic(nested=2)
+    assert sum(len(tables) for tables in table.grid.nested_tables.values()) == 2
+    assert MapVerifier(table.metas, table.rows, table.grid).verify() == []
+
+
+def test_build_document():
+    xml, metas = build_document(
+        DocumentSpec(table=TableSpec(rows=10), tables=3, paragraphs=1)
+    )
+    document = etree.fromstring(xml)
+    assert len(document.findall(f".//{W_TBL}")) == 3
+    assert metas[-1]["rows"][-1] == 10
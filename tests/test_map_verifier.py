@@ -0,0 +1,82 @@
+from word_xml_python.vlmap import MapVerifier
+
+
+def _verifier(table) -> MapVerifier:
+    return MapVerifier(verifier_meta=[], trs=table.rows, grid=table.grid)
+
+
+def _verify(table, metas):
+    return MapVerifier(verifier_meta=metas, trs=table.rows).verify()
+
+
+def _bad_candidates(table):
+    """两个未通过验证的候选，第二个的错误更少"""
+    # 两个重复表只剩表头行，最后一个表单超出表格范围
+    broken = [meta.model_copy(deep=True) for meta in table.metas]
+    broken[1].rows = broken[1].rows[:1]
+    broken[3].rows = broken[3].rows[:1]
+    broken[-1].rows = broken[-1].rows + [table.grid.row_count + 1]
+    # 漏掉最后一行
+    missing = [meta.model_copy(deep=True) for meta in table.metas]
+    missing[-1].rows = missing[-1].rows[:-1]
+    return [broken, missing]
+
+
+def test_valid_metas_pass(synthetic):
+    for vmerge_density in (0.0, 1.0):
+        table = synthetic(vmerge_density=vmerge_density)
+        assert _verify(table, table.metas) == []
+
+
+def test_first_passing_candidate(synthetic):
+    table = synthetic()
+    candidates = _bad_candidates(table) + [table.metas]
+    outcome = _verifier(table).verify_many(candidates)
+    assert outcome.index == 2
+    assert outcome.metas == table.metas
+    assert outcome.errors == []
+    assert outcome.checked == 3
+
+
+def test_stops_at_first_passing(synthetic):
+    table = synthetic()
+    candidates = [table.metas] + _bad_candidates(table)
+    outcome = _verifier(table).verify_many(candidates)
+    assert outcome.index == 0
+    assert outcome.checked == 1
+
+
+def test_fail_fast_reports_first_candidate(synthetic):
+    table = synthetic()
+    candidates = _bad_candidates(table)
+    outcome = _verifier(table).verify_many(candidates, fail_fast=True)
+    assert outcome.metas is None
+    assert outcome.index == 0
+    assert outcome.checked == 2
+    # 报告的是该候选的完整错误，与 verify 一致
+    assert outcome.errors == _verify(table, candidates[0])
+
+
+def test_full_check_reports_fewest_errors(synthetic):
+    table = synthetic()
+    candidates = _bad_candidates(table)
+    outcome = _verifier(table).verify_many(candidates, fail_fast=False)
+    assert outcome.metas is None
+    assert outcome.index == 1
+    assert outcome.errors == _verify(table, candidates[1])
+    assert len(outcome.errors) < len(_verify(table, candidates[0]))
+
+
+def test_accepts_dicts(synthetic):
+    table = synthetic()
+    candidate = [meta.model_dump() for meta in table.metas]
+    outcome = _verifier(table).verify_many([candidate])
+    assert outcome.metas == table.metas
+
+
+def test_no_candidates(synthetic):
+    table = synthetic()
+    outcome = _verifier(table).verify_many([])
+    assert outcome.index is None
+    assert outcome.metas is None
+    assert outcome.checked == 0
@@ -0,0 +1,49 @@
+import psycopg2
+import pytest
+from fastapi.testclient import TestClient
+
+from word_xml_python.apis import main
+from word_xml_python.apis.database import database as database_module
+from word_xml_python.core.metrics import InMemorySink, set_sink
+
+
+@pytest.fixture
+def client(fake_database, monkeypatch):
+    monkeypatch.setenv("DATABASE_MIGRATE_ON_STARTUP", "0")
+    monkeypatch.setattr(database_module, "_db_instance", fake_database)
+    previous = set_sink(None)
+    try:
+        with TestClient(main.app) as client:
+            yield client
+    finally:
+        set_sink(previous)
+
+
+def test_metrics_contain_http_and_database(client):
+    assert client.get("/health").json() == {"status": "ok", "database": True}
+    body = client.get("/metrics").text
+    assert (
+        'word_xml_http_requests_total{method="GET",path="/health",status="200"} 1'
+        in (body)
+    )
+    assert 'word_xml_db_query_seconds_count{status="ok"} 1' in body
+    # API 不运行 Core，没有阶段指标
+    assert "stage_seconds" not in body
+
+
+def test_database_retry_is_counted(fake_database):
+    sink = InMemorySink()
+    previous = set_sink(sink)
+    try:
+        fake_database.pool.errors = [psycopg2.OperationalError("连接已断开")]
+
+        def work(cur):
+            cur.execute("SELECT 1")
+            return cur.fetchone()
+
+        assert fake_database.run_sync(work) == (1,)
+    finally:
+        set_sink(previous)
+    assert sink.counter("db_retries") == 1
+    assert sink.histogram("db_query_seconds", (("status", "ok"),))[0] == 1
+    assert fake_database.pool.discarded == 1
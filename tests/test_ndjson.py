@@ -0,0 +1,84 @@
+import io
+import json
+
+import pytest
+
+from word_xml_python.core.metrics import InMemorySink, set_sink
+from word_xml_python.exporters import iter_ndjson, write_ndjson
+from word_xml_python.models.records import (
+    CellRecord,
+    ExtractorRecord,
+    ParagraphRecord,
+    RunRecord,
+)
+
+
+def _record(table_type: str, *texts: str) -> ExtractorRecord:
+    cells = [
+        CellRecord(f"1-{idx}", body=[ParagraphRecord({}, [RunRecord(body=text)])])
+        for idx, text in enumerate(texts, start=1)
+    ]
+    return ExtractorRecord(table_type, len(texts), 1, cells)
+
+
+def _results() -> list:
+    return [[_record("Form", "姓名", "张三"), _record("RepeatTable", "日期")], None]
+
+
+def _unconsumed():
+    raise AssertionError("不应开始迭代结果")
+    yield
+
+
+def test_region_lines():
+    lines = [json.loads(line) for line in iter_ndjson(_results())]
+    assert [(line["table"], line["region"]) for line in lines] == [
+        (0, 0),
+        (0, 1),
+        (1, None),
+    ]
+    assert lines[0]["result"]["table_type"] == "Form"
+    assert lines[-1] == {"table": 1, "region": None, "ok": False}
+
+
+def test_cell_lines():
+    lines = [json.loads(line) for line in iter_ndjson(_results(), "cell")]
+    assert [line.get("table_type") for line in lines] == [
+        "Form",
+        "Form",
+        "RepeatTable",
+        None,
+    ]
+    assert lines[1]["cell"]["body"][0]["rList"][0]["body"] == "张三"
+    assert "parent_table" not in lines[0]
+
+
+def test_model_and_record_lines_match():
+    records = _results()
+    models = [
+        None if results is None else [record.to_model() for record in results]
+        for results in records
+    ]
+    for granularity in ("region", "cell"):
+        assert list(iter_ndjson(models, granularity)) == list(
+            iter_ndjson(records, granularity)
+        )
+
+
+def test_unknown_granularity_raises_on_call():
+    # 调用时立即报错，不需要开始迭代，也不会消费结果
+    with pytest.raises(ValueError):
+        iter_ndjson(_unconsumed(), "table")
+    with pytest.raises(ValueError):
+        write_ndjson(_unconsumed(), io.StringIO(), "table")
+
+
+def test_serialized_bytes_counted():
+    sink = InMemorySink()
+    previous = set_sink(sink)
+    try:
+        fp = io.StringIO()
+        assert write_ndjson(_results(), fp, "cell") == 4
+    finally:
+        set_sink(previous)
+    assert sink.counter("serialized_bytes") == len(fp.getvalue().encode())
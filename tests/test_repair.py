@@ -0,0 +1,125 @@
+from word_xml_python.segmentation.repair import (
+    REPAIR_CLIP_RANGE,
+    REPAIR_DROP_REGION,
+    REPAIR_DROP_ROWS,
+    REPAIR_EXTEND_RANGE,
+    REPAIR_FILL_GAP,
+    REPAIR_INSERT_FORM,
+    repair_metas,
+)
+from word_xml_python.vlmap import MapVerifier
+
+
+def _copy(metas):
+    return [meta.model_copy(deep=True) for meta in metas]
+
+
+def _kinds(actions):
+    return [action.kind for action in actions]
+
+
+def _passes(table, metas) -> bool:
+    return not MapVerifier(metas, table.rows, table.grid).verify()
+
+
+def test_valid_metas_unchanged(synthetic):
+    table = synthetic()
+    metas, actions = repair_metas(table.metas, table.grid)
+    assert actions == []
+    assert metas == table.metas
+
+
+def test_input_not_modified(synthetic):
+    table = synthetic()
+    bad = _copy(table.metas)
+    bad[-1].rows = bad[-1].rows[:-1]
+    before = _copy(bad)
+    repair_metas(bad, table.grid)
+    assert bad == before
+
+
+def test_missing_last_row(synthetic):
+    table = synthetic()
+    bad = _copy(table.metas)
+    bad[-1].rows = bad[-1].rows[:-1]
+    metas, actions = repair_metas(bad, table.grid)
+    assert _kinds(actions) == [REPAIR_EXTEND_RANGE]
+    assert actions[0].rows == 1
+    assert metas == table.metas
+    assert _passes(table, metas)
+
+
+def test_gap_inside_region(synthetic):
+    table = synthetic()
+    bad = _copy(table.metas)
+    bad[0].rows = [1, 3]
+    metas, actions = repair_metas(bad, table.grid)
+    assert _kinds(actions) == [REPAIR_FILL_GAP]
+    assert actions[0].rows == 1
+    assert metas == table.metas
+
+
+def test_overlap_clips_before_header(synthetic):
+    table = synthetic()
+    bad = _copy(table.metas)
+    # 表单多占了重复表的表头行，重复表以表头开始，裁剪表单的末尾
+    bad[0].rows = bad[0].rows + [bad[1].rows[0]]
+    metas, actions = repair_metas(bad, table.grid)
+    assert _kinds(actions) == [REPAIR_CLIP_RANGE]
+    assert actions[0].region == bad[0].name
+    assert metas == table.metas
+
+
+def test_duplicate_rows_not_counted(synthetic):
+    table = synthetic()
+    bad = _copy(table.metas)
+    bad[0].rows = bad[0].rows * 3
+    metas, actions = repair_metas(bad, table.grid, max_rows=0)
+    assert _kinds(actions) == [REPAIR_DROP_ROWS]
+    assert actions[0].rows == 0
+    assert metas == table.metas
+
+
+def test_out_of_range_region_exceeds_bound(synthetic):
+    table = synthetic()
+    bad = _copy(table.metas)
+    last_rows = len(bad[-1].rows)
+    bad[-1].rows = [999]
+    metas, actions = repair_metas(bad, table.grid)
+    assert metas is None
+    assert _kinds(actions) == [
+        REPAIR_DROP_ROWS,
+        REPAIR_DROP_REGION,
+        REPAIR_EXTEND_RANGE,
+    ]
+    assert sum(action.rows for action in actions) == 1 + last_rows
+
+
+def test_bound_is_total_rows(synthetic):
+    table = synthetic()
+    bad = _copy(table.metas)
+    bad[0].rows = [1, 3]
+    bad[-1].rows = bad[-1].rows[:-2]
+    metas, actions = repair_metas(bad, table.grid, max_rows=2)
+    assert metas is None
+    assert sum(action.rows for action in actions) == 3
+
+    metas, actions = repair_metas(bad, table.grid, max_rows=3)
+    assert metas == table.metas
+
+
+def test_unbounded(synthetic):
+    table = synthetic()
+    bad = _copy(table.metas)
+    bad[-1].rows = bad[-1].rows[:1]
+    metas, _ = repair_metas(bad, table.grid, max_rows=None)
+    assert metas == table.metas
+
+
+def test_insert_form_is_structural(synthetic):
+    table = synthetic()
+    # 去掉开头的表单后第一个区域是重复表，只能插入新的表单区域
+    bad = _copy(table.metas[1:])
+    metas, actions = repair_metas(bad, table.grid, max_rows=None)
+    assert metas is None
+    assert REPAIR_INSERT_FORM in _kinds(actions)
@@ -0,0 +1,163 @@
+import asyncio
+import json
+import threading
+
+import pytest
+
+from word_xml_python.segmentation import (
+    OpenAISegmentationClient,
+    Segmenter,
+    StubModelServer,
+    parse_verifier_metas,
+)
+
+
+def _reply(metas) -> str:
+    return json.dumps(
+        [meta.model_dump(exclude_none=True) for meta in metas], ensure_ascii=False
+    )
+
+
+def _segment(server: StubModelServer, table, **kwargs):
+    client = OpenAISegmentationClient(server.base_url, model="stub", timeout=10)
+    segmenter = Segmenter(client, **kwargs)
+    return asyncio.run(segmenter.segment(table.table))
+
+
+def _failing_first(count: int, reply: str):
+    """前 count 次调用返回 HTTP 500，之后返回 reply"""
+    calls = 0
+    lock = threading.Lock()
+
+    def responder(messages):
+        nonlocal calls
+        with lock:
+            calls += 1
+            failed = calls <= count
+        if failed:
+            raise RuntimeError("模型服务不可用")
+        return reply
+
+    return responder
+
+
+def test_valid_reply(synthetic):
+    table = synthetic()
+    with StubModelServer(replies=[_reply(table.metas)]) as server:
+        result = _segment(server, table)
+    assert result.metas == table.metas
+    assert result.errors == []
+    assert result.stats.attempts == 1
+    assert not result.repaired
+
+
+def test_reply_with_code_fence(synthetic):
+    table = synthetic()
+    reply = f"分割结果如下：\n```json\n{_reply(table.metas)}\n```"
+    with StubModelServer(replies=[reply]) as server:
+        result = _segment(server, table)
+    assert result.metas == table.metas
+
+
+@pytest.mark.parametrize(
+    "bad_reply", ["抱歉，无法分割", "[{", "[1, 2]", '[{"name": "缺少字段"}]']
+)
+def test_unparsable_reply_is_fed_back(synthetic, bad_reply):
+    table = synthetic()
+    with StubModelServer(replies=[bad_reply, _reply(table.metas)]) as server:
+        result = _segment(server, table)
+        requests = server.requests
+    assert result.metas == table.metas
+    assert result.stats.attempts == 2
+    retry = requests[1]
+    assert retry[1] == {"role": "assistant", "content": bad_reply}
+    assert "返回内容不是合法的分割结果" in retry[2]["content"]
+
+
+def test_verification_errors_are_fed_back(synthetic):
+    table = synthetic()
+    # 漏掉第一个重复表，它的行没有被任何区域覆盖
+    bad = table.metas[:1] + table.metas[2:]
+    with StubModelServer(replies=[_reply(bad), _reply(table.metas)]) as server:
+        result = _segment(server, table, repair=False)
+        requests = server.requests
+    assert result.metas == table.metas
+    assert result.stats.attempts == 2
+    assert "没有通过校验" in requests[1][2]["content"]
+
+
+def test_retries_exhausted(synthetic):
+    table = synthetic()
+    with StubModelServer(replies=["[]"]) as server:
+        result = _segment(server, table, max_retries=2)
+    assert result.metas is None
+    assert result.errors
+    assert result.stats.attempts == 3
+    assert result.stats.failures == 1
+
+
+def test_client_error_is_retried(synthetic):
+    table = synthetic()
+    responder = _failing_first(1, _reply(table.metas))
+    with StubModelServer(responder=responder) as server:
+        result = _segment(server, table)
+        requests = server.requests
+    assert result.metas == table.metas
+    assert result.stats.attempts == 2
+    assert result.stats.client_errors == 1
+    # 失败的请求没有回复可以反馈，原样重试
+    assert requests[1] == requests[0]
+
+
+def test_client_errors_exhaust_retries(synthetic):
+    table = synthetic()
+    responder = _failing_first(10, "[]")
+    with StubModelServer(responder=responder) as server:
+        result = _segment(server, table, max_retries=1)
+    assert result.metas is None
+    assert result.stats.client_errors == 2
+    assert result.errors[0].error_msg.startswith("模型调用失败")
+
+
+def test_failed_sample_keeps_other_candidates(synthetic):
+    table = synthetic()
+    responder = _failing_first(1, _reply(table.metas))
+    with StubModelServer(responder=responder) as server:
+        result = _segment(server, table, samples=3)
+    assert result.metas == table.metas
+    assert result.stats.attempts == 3
+    assert result.stats.client_errors == 1
+
+
+def test_samples_require_positive_temperature():
+    with pytest.raises(ValueError):
+        Segmenter(client=None, samples=2, sample_temperature=0)
+    Segmenter(client=None, samples=1, sample_temperature=0)
+
+
+def test_small_deviation_is_repaired(synthetic):
+    table = synthetic()
+    bad = [meta.model_copy() for meta in table.metas]
+    bad[-1].rows = bad[-1].rows[:-1]
+    with StubModelServer(replies=[_reply(bad)]) as server:
+        result = _segment(server, table)
+    assert result.metas == table.metas
+    assert result.stats.attempts == 1
+    assert result.repaired
+    assert [action.kind for action in result.repairs] == ["extend_range"]
+
+
+def test_large_deviation_goes_back_to_model(synthetic):
+    table = synthetic()
+    bad = [meta.model_copy() for meta in table.metas]
+    bad[-1].rows = [999]
+    with StubModelServer(replies=[_reply(bad), _reply(table.metas)]) as server:
+        result = _segment(server, table)
+    assert result.metas == table.metas
+    assert result.stats.attempts == 2
+    assert not result.repaired
+
+
+def test_parse_rejects_non_objects():
+    with pytest.raises(ValueError, match="第2个区域不是 JSON 对象"):
+        parse_verifier_metas('[{"name": "a", "rows": [1], "type": "Form"}, 1]')
@@ -0,0 +1,43 @@
+from word_xml_python.core.query import W_TBL
+from word_xml_python.core.table_tree import build_table_tree
+from word_xml_python.vlmap import MapVerifier
+
+
+def test_nested_tables_are_separate_nodes(synthetic):
+    table = synthetic(nested=2)
+    root = build_table_tree(table.table)
+    nodes = list(root.walk())
+    assert len(nodes) == 3
+    assert [node.depth for node in nodes] == [0, 1, 1]
+    assert all(node.parent is root for node in nodes[1:])
+    assert [node.element for node in nodes[1:]] == list(table.table.iter(W_TBL))[1:]
+
+    # 外层表格只包含自己的行，嵌套表格不影响其分割结果
+    assert root.grid.row_count == 20
+    assert MapVerifier(table.metas, root.grid.rows, root.grid).verify() == []
+    for node in nodes[1:]:
+        assert node.grid.row_count == 2
+
+
+def test_host_key_points_at_host_cell(synthetic):
+    root = build_table_tree(synthetic(nested=2).table)
+    grid = root.grid
+    for node in root.children:
+        host = node.host_cell
+        # 宿主单元格的 w:tc 包含该嵌套表格
+        assert node.element.getparent() is grid.cells[host]
+        row_idx, cell_idx = map(int, node.host_key.split("-"))
+        assert grid.row_start[row_idx] + cell_idx == host
+    assert root.host_cell is None and root.host_key is None
+
+
+def test_doubly_nested(synthetic):
+    table = synthetic(nested=1)
+    inner = build_table_tree(table.table).children[0]
+    cell = inner.grid.cells[0]
+    cell.insert(1, synthetic(rows=2, cols=2).table)
+
+    nodes = list(build_table_tree(table.table).walk())
+    assert [node.depth for node in nodes] == [0, 1, 2]
+    assert nodes[2].parent.element is inner.element
+    assert nodes[2].host_key == "0-0"
@@ -0,0 +1,107 @@
+import asyncio
+import copy
+
+from word_xml_python.core.grid import TableGrid
+from word_xml_python.models import VerifierMeta
+from word_xml_python.segmentation import (
+    Segmenter,
+    StaticSegmentationClient,
+    TemplateIndex,
+    remap_metas,
+)
+from word_xml_python.vlmap import MapVerifier
+
+
+def _insert_copy(table, row_idx: int) -> TableGrid:
+    """在第 row_idx 行之后插入该行的副本，模拟同一模板多出一行数据行"""
+    row = table.rows[row_idx]
+    row.addnext(copy.deepcopy(row))
+    return TableGrid(table.table)
+
+
+def _meta(name: str, rows: list[int], type: str = "Form") -> VerifierMeta:
+    return VerifierMeta(name=name, rows=rows, type=type, reason="")
+
+
+def test_same_table(synthetic):
+    table = synthetic()
+    index = TemplateIndex()
+    assert index.add(table.grid, table.metas) == 0
+    match = index.query(synthetic().grid)
+    assert match.template_id == 0
+    assert match.similarity == 1.0
+    assert match.metas == table.metas
+
+
+def test_inserted_row_is_remapped(synthetic):
+    template = synthetic()
+    index = TemplateIndex()
+    index.add(template.grid, template.metas)
+
+    table = synthetic()
+    repeat = template.metas[1]
+    grid = _insert_copy(table, repeat.rows[-1] - 1)
+    match = index.query(grid)
+    assert match is not None
+    assert match.metas[1].rows == repeat.rows + [repeat.rows[-1] + 1]
+    assert match.metas[-1].rows[-1] == grid.row_count
+    assert MapVerifier(match.metas, grid.rows, grid).verify() == []
+
+
+def test_unrelated_table(synthetic):
+    index = TemplateIndex()
+    table = synthetic()
+    index.add(table.grid, table.metas)
+    assert index.query(synthetic(cols=9, rows=40, seed=7).grid) is None
+
+
+def test_best_of_several_templates(synthetic):
+    index = TemplateIndex()
+    for seed in (3, 4, 5):
+        table = synthetic(seed=seed, span_density=0.6)
+        index.add(table.grid, table.metas)
+    assert len(index) == 3
+    match = index.query(synthetic(seed=4, span_density=0.6).grid)
+    assert match.template_id == 1
+
+
+def test_save_and_load(synthetic, tmp_path):
+    index = TemplateIndex(num_perm=32, bands=8)
+    for seed in (1, 2):
+        table = synthetic(seed=seed)
+        index.add(table.grid, table.metas)
+    index.save(tmp_path)
+
+    loaded = TemplateIndex.load(tmp_path)
+    assert (loaded.num_perm, loaded.bands, len(loaded)) == (32, 8, 2)
+    query = synthetic(seed=2).grid
+    assert loaded.query(query) == index.query(query)
+
+
+def test_remap_deleted_and_leading_rows():
+    metas = [_meta("表单", [1, 2]), _meta("重复表", [3, 4, 5], "RepeatTable")]
+    # 删除模板第 2 行，开头插入一行
+    remapped = remap_metas(metas, [10, 20, 30, 40, 50], [99, 10, 30, 40, 50])
+    assert [meta.rows for meta in remapped] == [[1, 2], [3, 4, 5]]
+
+    # 区域的所有行都被删除时整个区域丢弃
+    remapped = remap_metas(metas, [10, 20, 30, 40, 50], [30, 40, 50])
+    assert [meta.name for meta in remapped] == ["重复表"]
+
+
+def test_segmenter_uses_template(synthetic):
+    template = synthetic()
+    index = TemplateIndex()
+    segmenter = Segmenter(
+        StaticSegmentationClient(template.metas), template_index=index
+    )
+    first = asyncio.run(segmenter.segment(template.table))
+    assert (first.source, first.stats.attempts) == ("model", 1)
+    assert len(index) == 1
+
+    table = synthetic()
+    grid = _insert_copy(table, template.metas[1].rows[-1] - 1)
+    second = asyncio.run(segmenter.segment(table.table, grid))
+    assert (second.source, second.stats.attempts) == ("template", 0)
+    assert second.stats.template_hits == 1
+    assert MapVerifier(second.metas, grid.rows, grid).verify() == []
@@ -0,0 +1,105 @@
+from pathlib import Path
+
+import pytest
+from lxml import etree
+
+from benchmarks.vlmap_scaling import BaselineVlmap
+from benchmarks.vlmap_scaling import build_table as build_label_table
+from word_xml_python.core.table_tree import build_table_tree
+from word_xml_python.vlmap import Vlmap, estimate_tokens
+
+FIXTURES = Path(__file__).parent / "fixtures"
+
+
+def _fixture_table() -> etree._Element:
+    """带纵向合并标签列、横向合并与嵌套表格的表格"""
+    return etree.parse(FIXTURES / "vlmap_table.xml").getroot()
+
+
+def _golden(name: str) -> str:
+    return (FIXTURES / name).read_text(encoding="UTF-8")
+
+
+def test_verbose_golden():
+    # 嵌套表格不计入外层表格，其余部分与线性渲染之前的输出逐字节一致
+    assert Vlmap(table_element=_fixture_table()).parse() == _golden(
+        "vlmap_table.verbose.txt"
+    )
+
+
+def test_nested_table_golden():
+    nodes = list(build_table_tree(_fixture_table()).walk())
+    assert len(nodes) == 2
+    assert Vlmap(table_element=nodes[1].element).parse() == _golden(
+        "vlmap_nested.verbose.txt"
+    )
+
+
+def test_parse_from_string():
+    xml = (FIXTURES / "vlmap_table.xml").read_bytes()
+    assert Vlmap(table_xml_string=xml).parse() == _golden("vlmap_table.verbose.txt")
+
+
+def test_matches_baseline_on_fixture():
+    table = _fixture_table()
+    assert (
+        Vlmap(table_element=table).parse() == BaselineVlmap(table_element=table).parse()
+    )
+
+
+@pytest.mark.parametrize("rows", [1, 4, 5, 6, 10, 101])
+def test_matches_baseline_on_label_columns(rows):
+    table = build_label_table(rows)
+    assert (
+        Vlmap(table_element=table).parse() == BaselineVlmap(table_element=table).parse()
+    )
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_matches_baseline_on_synthetic(synthetic, seed):
+    table = synthetic(rows=40, vmerge_density=0.5, span_density=0.4, seed=seed)
+    vlmap = Vlmap(table_element=table.table, grid=table.grid)
+    baseline = BaselineVlmap(table_element=table.table, grid=table.grid)
+    assert vlmap.parse() == baseline.parse()
+    assert vlmap.row_span_map == baseline.row_span_map
+
+
+def test_label_column_spans():
+    vlmap = Vlmap(table_element=build_label_table(12))
+    vlmap.parse()
+    # 每 5 行一个标签区块，最后一个区块只剩 2 行
+    assert vlmap.row_span_map == {(0, 0): 5, (5, 0): 5, (10, 0): 2}
+
+
+@pytest.mark.parametrize("encoding", ["compact", "html"])
+def test_compact_encodings_golden(encoding):
+    assert Vlmap(table_element=_fixture_table()).parse(encoding) == _golden(
+        f"vlmap_table.{encoding}.txt"
+    )
+
+
+@pytest.mark.parametrize("encoding", ["verbose", "compact", "html"])
+def test_render_parts(encoding):
+    vlmap = Vlmap(table_element=_fixture_table())
+    head, rows, tail = vlmap.render(encoding)
+    assert len(rows) == 8
+    assert head + "".join(rows) + tail == vlmap.parse(encoding)
+    assert vlmap.parse_and_tip(encoding).endswith(vlmap.tip(encoding))
+
+
+def test_compact_is_smaller():
+    vlmap = Vlmap(table_element=_fixture_table())
+    verbose = estimate_tokens(vlmap.parse("verbose"))
+    assert estimate_tokens(vlmap.parse("compact")) < verbose / 2
+
+
+def test_unknown_encoding():
+    with pytest.raises(ValueError):
+        Vlmap(table_element=_fixture_table()).render("markdown")
+
+
+def test_estimate_tokens():
+    assert estimate_tokens("") == 0
+    assert estimate_tokens("表格") == 2
+    assert estimate_tokens("abcdefgh") == 2
+    assert estimate_tokens("ａｂ") == 2
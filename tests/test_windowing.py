@@ -0,0 +1,134 @@
+import asyncio
+import json
+import re
+
+import pytest
+
+from word_xml_python.models import VerifierMeta
+from word_xml_python.models.segmentation import SegmentationResponse
+from word_xml_python.segmentation import (
+    SegmentationClient,
+    Segmenter,
+    plan_windows,
+    stitch_metas,
+)
+from word_xml_python.vlmap import MapVerifier
+
+
+def _window_metas(window, metas: list[VerifierMeta]) -> list[VerifierMeta]:
+    """整张表的分割结果裁剪到窗口内，行号改为相对窗口，模拟模型对窗口的回复"""
+    clipped = []
+    for meta in metas:
+        rows = [
+            row_num - window.start
+            for row_num in meta.rows
+            if window.start < row_num <= window.end
+        ]
+        if rows:
+            clipped.append(meta.model_copy(update={"rows": rows}))
+    return clipped
+
+
+def test_single_window_within_budget():
+    windows = plan_windows([10] * 5, budget=100, overlap=2)
+    assert len(windows) == 1
+    window = windows[0]
+    assert (window.start, window.end, window.own_start, window.own_end) == (0, 5, 0, 5)
+
+
+@pytest.mark.parametrize("overlap", [0, 2, 3])
+def test_windows_cover_all_rows(overlap):
+    row_tokens = [10, 30, 5, 50, 20, 10, 40, 10, 10, 25, 15, 30]
+    windows = plan_windows(row_tokens, budget=60, overlap=overlap)
+    assert len(windows) > 1
+    assert windows[0].start == 0
+    assert windows[-1].end == len(row_tokens)
+    for previous, current in zip(windows, windows[1:]):
+        assert current.start == previous.end - overlap
+        assert current.start > previous.start
+        # 相邻窗口负责的行首尾相接，位于重叠区内
+        assert previous.own_end == current.own_start
+        assert current.start <= current.own_start <= previous.end
+    assert windows[0].own_start == 0
+    assert windows[-1].own_end == len(row_tokens)
+
+
+def test_window_over_budget_row():
+    # 单行超出预算时窗口仍然向前推进
+    windows = plan_windows([10, 500, 10, 10], budget=50, overlap=1)
+    assert windows[-1].end == 4
+    assert all(window.end - window.start > 1 for window in windows)
+
+
+@pytest.mark.parametrize("vmerge_density", [0.0, 1.0])
+@pytest.mark.parametrize("overlap", [1, 3])
+def test_stitch_restores_table_metas(synthetic, vmerge_density, overlap):
+    table = synthetic(rows=40, vmerge_density=vmerge_density)
+    windows = plan_windows([10] * table.grid.row_count, budget=80, overlap=overlap)
+    assert len(windows) > 2
+
+    stitched = stitch_metas(
+        windows, [_window_metas(window, table.metas) for window in windows]
+    )
+    assert [(meta.type, meta.rows) for meta in stitched] == [
+        (meta.type, meta.rows) for meta in table.metas
+    ]
+    assert not MapVerifier(stitched, table.rows, table.grid).verify()
+
+
+def test_stitch_ignores_rows_outside_owned_range():
+    windows = plan_windows([10] * 10, budget=60, overlap=2)
+    assert len(windows) == 2
+    first, second = windows
+    form = VerifierMeta(name="表单", rows=[], type="Form", reason="")
+    repeat = VerifierMeta(name="重复表", rows=[], type="RepeatTable", reason="")
+    # 两个窗口对重叠区的判断不同，只采用各自负责的行
+    stitched = stitch_metas(
+        windows,
+        [
+            [form.model_copy(update={"rows": list(range(1, first.end + 1))})],
+            [
+                form.model_copy(update={"rows": [1]}),
+                repeat.model_copy(
+                    update={"rows": list(range(2, second.end - second.start + 1))}
+                ),
+            ],
+        ],
+    )
+    boundary = first.own_end
+    assert [meta.type for meta in stitched] == ["Form", "RepeatTable"]
+    assert stitched[0].rows == list(range(1, boundary + 1))
+    assert stitched[1].rows == list(range(boundary + 1, 11))
+
+
+class _FormClient(SegmentationClient):
+    """把提示词中的全部行回复为一个表单区域，并记录每次提示词的行数"""
+
+    def __init__(self):
+        self.row_counts: list[int] = []
+
+    async def complete(self, messages, temperature=None):
+        row_count = int(re.search(r"表格行数: (\d+)", messages[-1]["content"])[1])
+        self.row_counts.append(row_count)
+        meta = {"name": "表单", "rows": list(range(1, row_count + 1))}
+        return SegmentationResponse(
+            content=json.dumps([meta | {"type": "Form", "reason": ""}])
+        )
+
+
+def test_segmenter_splits_large_table(synthetic):
+    table = synthetic(rows=60)
+    client = _FormClient()
+    segmenter = Segmenter(client, max_retries=0, window_tokens=600, window_overlap=2)
+    result = asyncio.run(segmenter.segment(table.table))
+    assert result.stats.windows == len(client.row_counts) > 1
+    assert all(count < 60 for count in client.row_counts)
+    assert [meta.rows for meta in result.metas] == [list(range(1, 61))]
+
+
+def test_segmenter_within_budget_uses_one_prompt(synthetic):
+    client = _FormClient()
+    segmenter = Segmenter(client, max_retries=0, window_tokens=100_000)
+    result = asyncio.run(segmenter.segment(synthetic(rows=60).table))
+    assert client.row_counts == [60]
+    assert result.stats.windows == 0